@@ -0,0 +1,163 @@
+"""
+Measure JSON API throughput per process for cached, uncached and conditional
+requests.
+
+A temporary database is filled with synthetic analyses; each endpoint is
+then requested through the WSGI handler (the full middleware stack, no
+network) for --seconds. "304" scenarios send the ETag of the previous
+response, as a polling dashboard would, and should be answered without a
+database query. Run from the project_news directory:
+
+    python -m benchmarks.bench_api --videos 20000 --channels 50
+    python -m benchmarks.bench_api --cache locmem
+"""
+import argparse
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+from urllib.parse import unquote
+
+os.environ.setdefault("YOUTUBE_API_KEYS", "fake-key")
+os.environ.setdefault("METRICS_DIR", "")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project_news.settings")
+os.environ["EMBEDDINGS_ENABLED"] = "0"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from benchmarks.fakes import WORDS  # noqa: E402
+
+
+def setup(workdir, cache):
+    settings.DATABASES["default"]["NAME"] = os.path.join(workdir, "bench.sqlite3")
+    settings.ALLOWED_HOSTS = ["testserver"]
+    settings.CACHES["api"] = (
+        {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"} if cache == "locmem"
+        else {**settings.CACHES["api"], "LOCATION": os.path.join(workdir, "cache")}
+    )
+    call_command("migrate", verbosity=0)
+
+
+def populate(videos, channels, seed=0):
+    from news_analysis.pipeline import build_analysis, save_analyses, video_url_for
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    rows = []
+    for i in range(videos):
+        video_id = f"api{i:08d}"
+        bias = {label: rng.random() for label in ("left", "center", "right", "biased", "neutral")}
+        rows.append(build_analysis(
+            video_id,
+            video_url_for(video_id),
+            {
+                "title": " ".join(rng.choice(WORDS) for _ in range(6)),
+                "channel_title": f"Channel {i % channels}",
+                "published_at": (now - timedelta(hours=i)).isoformat(),
+                "view_count": rng.randint(0, 10 ** 6),
+            },
+            " ".join(rng.choice(WORDS) for _ in range(200)),
+            {"label": rng.choice(["POSITIVE", "NEUTRAL", "NEGATIVE"]), "score": rng.uniform(-1, 1)},
+            bias,
+        ))
+        if len(rows) == 1000:
+            save_analyses(rows)
+            rows = []
+    save_analyses(rows)
+
+
+class Requester:
+    """Calls the WSGI application the way a server worker would."""
+
+    def __init__(self):
+        self.handler = WSGIHandler()
+
+    def get(self, path, **headers):
+        path_info, _, query = path.partition("?")
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": unquote(path_info), "QUERY_STRING": query,
+            "SERVER_NAME": "testserver", "SERVER_PORT": "80", "HTTP_HOST": "testserver",
+            "wsgi.input": io.BytesIO(), "wsgi.url_scheme": "http", **headers,
+        }
+        status = {}
+
+        def start_response(line, response_headers):
+            status["code"] = int(line.split()[0])
+            status["headers"] = dict(response_headers)
+
+        response = self.handler(environ, start_response)
+        body = b"".join(response)
+        response.close()
+        return status["code"], status["headers"], body
+
+
+def measure(requester, name, path, seconds, revalidate=False):
+    code, headers, body = requester.get(path)
+    assert code == 200, (path, code, body[:200])
+    extra = {"HTTP_IF_NONE_MATCH": headers["ETag"]} if revalidate else {}
+    expected = 304 if revalidate else 200
+
+    queries = []
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        requester.get(path, **extra)
+    count, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        code, _, body = requester.get(path, **extra)
+        assert code == expected, (path, code)
+        count += 1
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<28} {count / elapsed:>8.0f} req/s  {elapsed / count * 1000:6.2f} ms  "
+        f"{len(queries)} queries  {len(body):>7} bytes"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, default=5000)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time spent on each scenario.")
+    parser.add_argument("--cache", choices=["file", "locmem"], default="file",
+                        help="Cache backend: the default shared file cache or per-process memory.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup(workdir, args.cache)
+        started = time.perf_counter()
+        populate(args.videos, args.channels)
+        print(f"Stored {args.videos} analyses in {time.perf_counter() - started:.1f}s")
+
+        requester = Requester()
+        deep = "/api/videos/?limit=50"
+        for _ in range(args.videos // 100):  # halfway through the table
+            deep = json.loads(requester.get(deep)[2])["next"] or deep
+        scenarios = [
+            ("aggregates", "/api/aggregates/", False),
+            ("channel detail", "/api/channels/Channel%201/", False),
+            ("channel list", "/api/channels/", False),
+            ("videos, cached page", "/api/videos/?channel=Channel%201", False),
+            ("videos, deep page", deep, False),
+            ("videos, deep page 304", deep, True),
+            # Pages with transcripts are never cached: database + decompression.
+            ("videos with caption_text", deep.replace("?", "?fields=video_id,caption_text&"), False),
+            ("aggregates 304", "/api/aggregates/", True),
+            ("video detail 304", "/api/videos/api00000042/", True),
+        ]
+        for name, path, revalidate in scenarios:
+            measure(requester, name, path, args.seconds, revalidate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compare bias classifier backends: throughput, memory and drift from PyTorch.
+
+Each backend scores the same synthetic transcripts; the report shows
+documents/sec, resident memory after loading, and the score drift against
+the fp32 PyTorch reference. Run from the project_news directory:
+
+    python -m benchmarks.bench_backends --backends pytorch,pytorch-int8,onnx,onnx-int8
+"""
+import argparse
+import os
+import time
+
+# Measure the models, not the inference cache (which also caches windows).
+os.environ.setdefault("INFERENCE_CACHE_ENABLED", "0")
+
+from benchmarks.fakes import synthetic_segments
+from news_analysis.utils import bias_utils, model_registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", default="pytorch,pytorch-int8,onnx,onnx-int8")
+    parser.add_argument("--docs", type=int, default=8)
+    parser.add_argument("--minutes", type=float, default=5,
+                        help="Length of each synthetic transcript.")
+    args = parser.parse_args()
+
+    texts = [
+        " ".join(s["text"] for s in synthetic_segments(args.minutes, seed=i))
+        for i in range(args.docs)
+    ]
+
+    print(f"{'backend':>13} {'load_s':>7} {'docs/s':>8} {'rss_mb':>8} {'max_diff':>9} {'top_agree':>9}")
+    for backend in args.backends.split(","):
+        rss_before = model_registry.memory_usage()["rss_mb"]
+        started = time.perf_counter()
+        try:
+            bias_utils.get_classifier(backend)
+        except ImportError as e:
+            print(f"{backend:>13} skipped: {e}")
+            continue
+        load_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        bias_utils._score_documents(
+            texts, bias_utils.CANDIDATE_LABELS, bias_utils.BATCH_SIZE, backend=backend)
+        docs_per_sec = len(texts) / (time.perf_counter() - started)
+        rss = model_registry.memory_usage()["rss_mb"] - rss_before
+
+        parity = bias_utils.check_parity(backend, texts)
+        print(f"{backend:>13} {load_s:>7.1f} {docs_per_sec:>8.2f} {rss:>8.1f} "
+              f"{parity['max_abs_diff']:>9} {parity['top_label_agreement']:>9}")
+        if backend != "pytorch":
+            model_registry.unload(f"bias-classifier:{backend}")
+
+
+if __name__ == "__main__":
+    main()
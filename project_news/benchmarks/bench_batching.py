@@ -0,0 +1,83 @@
+"""
+Measure the bias micro-batcher's throughput and latency across settings.
+
+Concurrent clients each submit documents to a MicroBatcher wrapping the bias
+scorer; every (max batch size, max wait) combination is reported with
+documents/sec and p50/p99 latency. Run from the project_news directory:
+
+    python -m benchmarks.bench_batching --clients 16 --requests 8
+    python -m benchmarks.bench_batching --simulate   # no model, synthetic cost
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Measure the models, not the inference cache (which also caches windows).
+os.environ.setdefault("INFERENCE_CACHE_ENABLED", "0")
+
+from benchmarks.fakes import synthetic_segments
+from news_analysis.utils.batching import MicroBatcher
+
+
+def simulated_scorer(overhead, per_item):
+    """Stand-in for a forward pass: fixed cost per call plus a cost per document."""
+    def score(texts):
+        time.sleep(overhead + per_item * len(texts))
+        return [{} for _ in texts]
+    return score
+
+
+def run(batch_fn, texts, clients, requests, max_batch, max_wait_ms):
+    batcher = MicroBatcher(batch_fn, max_batch_size=max_batch, max_wait=max_wait_ms / 1000)
+
+    def client(offset):
+        for i in range(requests):
+            batcher.submit(texts[(offset + i) % len(texts)]).result()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+    stats = batcher.stats()
+    stats["docs_per_sec"] = round(stats["requests"] / elapsed, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=4, help="Documents per client.")
+    parser.add_argument("--minutes", type=float, default=2,
+                        help="Length of each synthetic transcript.")
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--waits-ms", default="0,10,50")
+    parser.add_argument("--simulate", action="store_true",
+                        help="Use a synthetic cost model instead of the real classifier.")
+    args = parser.parse_args()
+
+    texts = [
+        " ".join(s["text"] for s in synthetic_segments(args.minutes, seed=i))
+        for i in range(32)
+    ]
+    if args.simulate:
+        batch_fn = simulated_scorer(overhead=0.05, per_item=0.01)
+    else:
+        from news_analysis.utils import bias_utils
+        bias_utils.get_classifier()  # load outside the timed region
+        batch_fn = lambda batch: bias_utils._score_documents(  # noqa: E731
+            batch, bias_utils.CANDIDATE_LABELS, bias_utils.BATCH_SIZE)
+
+    print(f"{'batch':>5} {'wait_ms':>7} {'docs/s':>8} {'mean_bs':>7} {'p50_ms':>8} {'p99_ms':>8}")
+    for max_batch, wait_ms in itertools.product(
+        [int(b) for b in args.batch_sizes.split(",")],
+        [float(w) for w in args.waits_ms.split(",")],
+    ):
+        stats = run(batch_fn, texts, args.clients, args.requests, max_batch, wait_ms)
+        print(f"{max_batch:>5} {wait_ms:>7.0f} {stats['docs_per_sec']:>8} "
+              f"{stats['mean_batch_size']:>7} {stats['p50_ms']:>8} {stats['p99_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
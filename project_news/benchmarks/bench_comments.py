@@ -0,0 +1,76 @@
+"""
+Measure comment analysis on one video: throughput, peak memory and API calls.
+
+Comments come from the fake YouTube client, so no quota is spent. Peak
+memory is traced with tracemalloc (Python allocations only) and should stay
+flat as --comments grows, since only one page and one batch are held at a
+time. Run from the project_news directory:
+
+    python -m benchmarks.bench_comments --comments 1000,20000
+    python -m benchmarks.bench_comments --comments 1000,20000 --simulate   # no model weights
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("YOUTUBE_API_KEYS", "fake-key")
+os.environ.setdefault("METRICS_DIR", "")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project_news.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from benchmarks.fakes import FakeYouTubeClient, fake_backends  # noqa: E402
+from news_analysis.comments import score_comment_stream  # noqa: E402
+from news_analysis.utils import sentiment_utils  # noqa: E402
+from news_analysis.utils.youtube_utils import comments_quota_cost, iter_comments  # noqa: E402
+
+
+def simulated_scores(texts, batch_size=None):
+    """Stand-in for score_short_texts: a keyword rule instead of the model."""
+    return [
+        {"label": "NEGATIVE", "score": -0.8} if ("garbage" in text or "Terrible" in text)
+        else {"label": "POSITIVE", "score": 0.7} if ("Great" in text or "Finally" in text)
+        else {"label": "NEUTRAL", "score": 0.0}
+        for text in texts
+    ]
+
+
+def run(comments, batch_size):
+    youtube = FakeYouTubeClient(latency=0, comments_per_video=comments)
+    with fake_backends(youtube):
+        tracemalloc.start()
+        started = time.perf_counter()
+        aggregate = score_comment_stream(iter_comments("benchvideo01", max_comments=comments), batch_size)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    calls = sum(1 for name, _ in youtube.calls if name == "_comment_threads")
+    print(
+        f"{comments:>7} comments  {aggregate.count / elapsed:>9.0f}/s  peak {peak / 2**20:6.2f} MB  "
+        f"{calls} API calls (budget {comments_quota_cost(comments)})  mean {aggregate.mean:+.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", default="1000,5000,20000", help="Comment counts to test.")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--simulate", action="store_true",
+                        help="Replace the sentiment model with a keyword rule.")
+    args = parser.parse_args()
+
+    if args.simulate:
+        sentiment_utils.score_short_texts = simulated_scores
+    else:
+        sentiment_utils.score_short_texts(["warm up"])  # load outside the measurement
+
+    for comments in [int(n) for n in args.comments.split(",")]:
+        run(comments, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
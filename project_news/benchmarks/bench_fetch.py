@@ -0,0 +1,59 @@
+"""
+Compare sequential and concurrent fetch_video_data latency against the fakes.
+
+Run from the project_news directory:
+
+    python -m benchmarks.bench_fetch --runs 5 --metadata-latency 0.2 --transcript-latency 0.6
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("YOUTUBE_API_KEYS", "fake-key")
+
+from benchmarks.fakes import FakeTranscriptApi, FakeYouTubeClient, fake_backends  # noqa: E402
+from news_analysis.utils import youtube_utils  # noqa: E402
+
+
+def fetch_sequential(video_url):
+    video_id = youtube_utils.extract_video_id(video_url)
+    return {
+        "video_id": video_id,
+        "metadata": youtube_utils.fetch_video_metadata(video_id),
+        "transcript": youtube_utils.fetch_transcript(video_id),
+    }
+
+
+def _time(func, runs):
+    samples = []
+    for i in range(runs):
+        started = time.perf_counter()
+        func(f"https://www.youtube.com/watch?v=bench{i}")
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--metadata-latency", type=float, default=0.2,
+                        help="Latency of each fake Data API call.")
+    parser.add_argument("--transcript-latency", type=float, default=0.6)
+    args = parser.parse_args()
+
+    with fake_backends(
+        FakeYouTubeClient(latency=args.metadata_latency),
+        FakeTranscriptApi(latency=args.transcript_latency),
+    ):
+        for name, func in (
+            ("sequential", fetch_sequential),
+            ("concurrent", youtube_utils.fetch_video_data),
+        ):
+            samples = _time(func, args.runs)
+            print(f"{name:>10}: median {statistics.median(samples):.3f}s  "
+                  f"max {max(samples):.3f}s over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+End-to-end pipeline benchmark: fetch, bias, sentiment and database write.
+
+Each video goes through fetch_video_data (fake YouTube and transcript APIs),
+analyze_bias, the sentiment scorer (the LLM path against a local stub
+inference server, or the local model) and save_analyses on a throwaway
+SQLite database. Transcripts are 1 to 60 minutes long. The report shows
+per-stage latency percentiles, videos/sec and peak RSS. --save writes it as
+a JSON baseline; --compare checks the run against one and exits non-zero on
+a regression. Run from the project_news directory:
+
+    python -m benchmarks.bench_pipeline --save baseline.json
+    python -m benchmarks.bench_pipeline --compare baseline.json
+    python -m benchmarks.bench_pipeline --simulate   # synthetic bias cost, no model weights
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+STAGES = ("fetch", "bias", "sentiment", "write", "total")
+
+# ingest writes from its main thread only; SQLite would reject concurrent
+# writers, so worker threads take turns here.
+_write_lock = threading.Lock()
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def setup_environment(args):
+    """Configure settings for an offline run; must happen before Django is set up."""
+    os.environ.setdefault("YOUTUBE_API_KEYS", "fake-key")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project_news.settings")
+    # Measure the models, not the inference cache.
+    os.environ["INFERENCE_CACHE_ENABLED"] = "0"
+    os.environ["EMBEDDINGS_ENABLED"] = "1" if args.embeddings else "0"
+    os.environ["SENTIMENT_BACKEND"] = args.sentiment
+    os.environ.setdefault("METRICS_DIR", "")  # keep benchmark runs out of the shared metrics
+    os.environ.setdefault("TRANSCRIPT_CACHE_DIR", "")  # always measure the transcript fetch
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    # A fresh database per run, so writes never collide with earlier runs.
+    settings.DATABASES["default"]["NAME"] = os.path.join(args.workdir, "bench.sqlite3")
+    settings.EMBEDDING_DIR = os.path.join(args.workdir, "embeddings")
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def simulated_bias(per_1k_words):
+    """Stand-in for analyze_bias whose cost grows with transcript length."""
+    from news_analysis.utils.bias_utils import CANDIDATE_LABELS
+
+    def analyze_bias(text):
+        time.sleep(per_1k_words * len(text.split()) / 1000)
+        return {label: 1 / len(CANDIDATE_LABELS) for label in CANDIDATE_LABELS}
+    return analyze_bias
+
+
+def run_video(video_id, analyze_bias):
+    from news_analysis.pipeline import build_analysis, save_analyses, video_url_for
+    from news_analysis.utils.sentiment_utils import score_sentiment
+    from news_analysis.utils.youtube_utils import fetch_video_data
+
+    timings = {}
+    started = time.perf_counter()
+    data = fetch_video_data(video_url_for(video_id))
+    timings["fetch"] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    bias = analyze_bias(data["transcript"])
+    timings["bias"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    sentiment = score_sentiment(data["transcript"])
+    timings["sentiment"] = time.perf_counter() - mark
+
+    row = build_analysis(video_id, video_url_for(video_id), data["metadata"], data["transcript"], sentiment, bias)
+    with _write_lock:
+        mark = time.perf_counter()
+        save_analyses([row])
+        timings["write"] = time.perf_counter() - mark
+    timings["total"] = time.perf_counter() - started
+    return timings
+
+
+def summarize(samples):
+    from news_analysis.utils.batching import percentile
+
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p90_ms": round(percentile(samples, 90) * 1000, 1),
+        "p99_ms": round(percentile(samples, 99) * 1000, 1),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0,
+    }
+
+
+def run(args):
+    from benchmarks.fakes import (
+        FakeTranscriptApi, FakeYouTubeClient, StubInferenceServer, fake_backends, fake_inference,
+    )
+    from news_analysis.utils import bias_utils
+
+    lengths = [int(m) for m in args.minutes.split(",")]
+    # Video IDs encode the transcript length: "b" + minutes + index.
+    video_ids = [f"b{minutes:02d}{i:04d}" for minutes in lengths for i in range(args.videos)]
+    transcripts = FakeTranscriptApi(latency=args.transcript_latency, minutes=lambda video_id: int(video_id[1:3]))
+    youtube = FakeYouTubeClient(latency=args.api_latency)
+
+    if args.simulate:
+        analyze_bias = simulated_bias(args.bias_ms_per_1k_words / 1000)
+    else:
+        analyze_bias = bias_utils.analyze_bias
+        bias_utils.get_classifier()  # load outside the timed region
+
+    results = {}
+    with fake_backends(youtube, transcripts), StubInferenceServer(latency=args.llm_latency) as server, \
+            fake_inference(server):
+        # One untimed video warms imports, connections and lazily loaded models.
+        run_video("b010warm", analyze_bias)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as pool:
+            for video_id, timings in zip(video_ids, pool.map(lambda v: run_video(v, analyze_bias), video_ids)):
+                results[video_id] = timings
+        elapsed = time.perf_counter() - started
+
+    by_length = {}
+    for minutes in lengths:
+        rows = [t for video_id, t in results.items() if int(video_id[1:3]) == minutes]
+        by_length[f"{minutes}min"] = {stage: summarize([t[stage] for t in rows])["p50_ms"] for stage in STAGES}
+
+    return {
+        "meta": {
+            "git": git_revision(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "args": {k: v for k, v in vars(args).items() if k not in ("save", "compare", "workdir")},
+        "videos": len(results),
+        "videos_per_sec": round(len(results) / elapsed, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {stage: summarize([t[stage] for t in results.values()]) for stage in STAGES},
+        "by_length_p50_ms": by_length,
+    }
+
+
+def print_report(report):
+    print(f"{report['videos']} videos, {report['videos_per_sec']} videos/s, peak RSS {report['peak_rss_mb']} MB")
+    print(f"{'stage':>10} {'p50_ms':>9} {'p90_ms':>9} {'p99_ms':>9} {'mean_ms':>9}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:>10} {stats['p50_ms']:>9} {stats['p90_ms']:>9} {stats['p99_ms']:>9} {stats['mean_ms']:>9}")
+    print(f"{'length':>10} " + " ".join(f"{stage:>9}" for stage in STAGES) + "  (p50 ms)")
+    for length, stats in report["by_length_p50_ms"].items():
+        print(f"{length:>10} " + " ".join(f"{stats[stage]:>9}" for stage in STAGES))
+
+
+def compare(report, baseline, tolerance):
+    """Print changes against a baseline; return the list of regressions."""
+    checks = [
+        (f"{stage} {metric}", baseline["stages"][stage][metric], report["stages"][stage][metric], True)
+        for stage in STAGES if stage in baseline["stages"]
+        for metric in ("p50_ms", "p99_ms")
+    ]
+    checks.append(("videos/s", baseline["videos_per_sec"], report["videos_per_sec"], False))
+    checks.append(("peak RSS MB", baseline["peak_rss_mb"], report["peak_rss_mb"], True))
+
+    print(f"\nvs baseline {baseline['meta'].get('git')} ({baseline['meta'].get('date')}), "
+          f"tolerance {tolerance:.0%}")
+    regressions = []
+    for name, before, after, lower_is_better in checks:
+        change = (after - before) / before if before else 0.0
+        worse = change > tolerance if lower_is_better else change < -tolerance
+        if worse:
+            regressions.append(name)
+        print(f"{name:>18} {before:>10} -> {after:>10} {change:>+8.1%}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", default="1,5,15,30,60", help="Transcript lengths to test.")
+    parser.add_argument("--videos", type=int, default=3, help="Videos per transcript length.")
+    parser.add_argument("--workers", type=int, default=1, help="Videos processed concurrently.")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Fake YouTube API latency (s).")
+    parser.add_argument("--transcript-latency", type=float, default=0.2, help="Fake transcript latency (s).")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub inference server latency (s).")
+    parser.add_argument("--sentiment", choices=["llm", "local"], default="llm",
+                        help="llm uses the stub inference server; local needs the model weights.")
+    parser.add_argument("--embeddings", action="store_true", help="Also embed transcripts on write.")
+    parser.add_argument("--simulate", action="store_true",
+                        help="Replace the bias model with a synthetic cost per 1k words.")
+    parser.add_argument("--bias-ms-per-1k-words", type=float, default=40)
+    parser.add_argument("--save", help="Write the report to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative change counted as a regression.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-pipeline-") as workdir:
+        args.workdir = workdir
+        setup_environment(args)
+        report = run(args)
+
+    print_report(report)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(f"\n{len(regressions)} regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure the embedding index: build time and query latency, brute force vs IVF.
+
+Random unit vectors stand in for transcript embeddings (no model needed), so
+the numbers isolate the vector store. Clustered data makes IVF recall
+realistic: vectors are drawn around --clusters random centres. Run from the
+project_news directory:
+
+    python -m benchmarks.bench_similarity --videos 100000
+    python -m benchmarks.bench_similarity --videos 100000 --dtype float32 --nprobe 4,8,16
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from news_analysis.utils.batching import percentile
+from news_analysis.utils.vector_store import VectorStore, normalize
+
+
+def synthetic_vectors(count, dim, clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = normalize(rng.standard_normal((clusters, dim)))
+    noise = rng.standard_normal((count, dim)).astype(np.float32) * 0.03
+    return normalize(centres[rng.integers(clusters, size=count)] + noise)
+
+
+def time_queries(store, queries, k, nprobe):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append([pk for pk, _ in store.search(query, k=k, nprobe=nprobe)])
+        latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dtype", default="float16", choices=["float16", "float32"])
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=1000, help="Vectors per add() call.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="8,32")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.videos, args.dim, args.clusters)
+    queries = synthetic_vectors(args.queries, args.dim, args.clusters, seed=1)
+    path = tempfile.mkdtemp(prefix="bench-similarity-")
+    try:
+        store = VectorStore(path, args.dim, dtype=args.dtype)
+        started = time.perf_counter()
+        for start in range(0, args.videos, args.batch):
+            store.add(np.arange(start, min(args.videos, start + args.batch)), vectors[start:start + args.batch])
+        add_seconds = time.perf_counter() - started
+        size_mb = (args.videos * args.dim * np.dtype(args.dtype).itemsize) / 2**20
+        print(f"add {args.videos} x {args.dim} {args.dtype}: {add_seconds:.2f}s "
+              f"({args.videos / add_seconds:.0f} vectors/s, {size_mb:.0f} MB of vectors)")
+
+        print(f"{'index':>12} {'p50_ms':>8} {'p99_ms':>8} {'qps':>8} {'recall@k':>8}")
+        latencies, exact = time_queries(store, queries, args.k, nprobe=None)
+        print(f"{'brute force':>12} {percentile(latencies, 50) * 1000:>8.2f} "
+              f"{percentile(latencies, 99) * 1000:>8.2f} {len(latencies) / sum(latencies):>8.0f} {1.0:>8.3f}")
+
+        started = time.perf_counter()
+        nlist = store.build_ivf()
+        print(f"build_ivf: {nlist} lists in {time.perf_counter() - started:.2f}s")
+        for nprobe in [int(n) for n in args.nprobe.split(",")]:
+            latencies, approx = time_queries(store, queries, args.k, nprobe=nprobe)
+            recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(approx, exact)])
+            print(f"{f'ivf/{nprobe}':>12} {percentile(latencies, 50) * 1000:>8.2f} "
+                  f"{percentile(latencies, 99) * 1000:>8.2f} {len(latencies) / sum(latencies):>8.0f} {recall:>8.3f}")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the cost of a video's timeline with scoring its chunked transcript.
+
+For synthetic transcripts of several lengths, times analyze_bias_many on the
+joined text (the document score) against analyze_bias_passages on its time
+windows (the timeline), with the inference cache off so both run the model.
+The timeline should take about as long as the document, not one model call
+per segment. Run from the project_news directory:
+
+    python -m benchmarks.bench_timeline --minutes 5,20,60
+"""
+import argparse
+import os
+import time
+
+os.environ["INFERENCE_CACHE_ENABLED"] = "0"
+os.environ.setdefault("YOUTUBE_API_KEYS", "fake-key")
+os.environ.setdefault("METRICS_DIR", "")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project_news.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from benchmarks.fakes import synthetic_segments  # noqa: E402
+from news_analysis.timeline import group_windows  # noqa: E402
+from news_analysis.utils import bias_utils  # noqa: E402
+from news_analysis.utils.youtube_utils import join_segments  # noqa: E402
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def run(minutes, seconds):
+    segments = synthetic_segments(minutes, seed=minutes)
+    width, windows = group_windows(segments, seconds)
+    document = timed(bias_utils.analyze_bias_many, [join_segments(segments)])
+    timeline = timed(bias_utils.analyze_bias_passages, [text for _, text in windows])
+    print(
+        f"{minutes:>4} min  {len(segments):>5} segments  {len(windows):>4} windows of {width:>4.0f}s  "
+        f"document {document:6.2f}s  timeline {timeline:6.2f}s  ({timeline / document:.2f}x)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", default="5,20,60", help="Transcript lengths to test.")
+    parser.add_argument("--window-seconds", type=float, default=None,
+                        help="Window width (default TIMELINE_WINDOW_SECONDS).")
+    args = parser.parse_args()
+
+    bias_utils.analyze_bias_passages(["warm up"])  # load outside the measurement
+    for minutes in [int(n) for n in args.minutes.split(",")]:
+        run(minutes, args.window_seconds)
+
+
+if __name__ == "__main__":
+    main()
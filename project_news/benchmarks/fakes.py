@@ -0,0 +1,234 @@
+"""
+Offline stand-ins for the YouTube Data API, the transcript API and the
+Hugging Face Inference API.
+
+The fakes return responses shaped like the real services after a configurable
+delay, so fetch paths can be exercised and benchmarked without network access
+or API quota. Use ``fake_backends()`` to swap them into youtube_utils and
+``fake_inference()`` to point the inference client at a StubInferenceServer.
+"""
+import contextlib
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "government policy election senator economy tax families report "
+    "president vote congress border health climate market inflation "
+    "minister parliament court ruling campaign debate the a of and to"
+).split()
+
+COMMENT_PHRASES = (
+    "Great reporting, thank you for covering this",
+    "This is biased garbage and you know it",
+    "Interesting, I had not heard about that",
+    "Terrible interview, the host kept interrupting",
+    "Finally someone explains it clearly",
+    "Who else is watching this in 2025?",
+)
+
+
+def synthetic_segments(minutes, seed=0, seconds_per_segment=3.0, words_per_segment=8):
+    """Build a transcript segment list covering roughly ``minutes`` of speech."""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    while start < minutes * 60:
+        segments.append({
+            "text": " ".join(rng.choice(WORDS) for _ in range(words_per_segment)),
+            "start": round(start, 2),
+            "duration": seconds_per_segment,
+        })
+        start += seconds_per_segment
+    return segments
+
+
+class _Request:
+    def __init__(self, latency, response):
+        self._latency = latency
+        self._response = response
+
+    def execute(self, **kwargs):
+        time.sleep(self._latency)
+        return self._response
+
+
+class _Resource:
+    def __init__(self, client, handler):
+        self._client = client
+        self._handler = handler
+
+    def list(self, **params):
+        self._client.calls.append((self._handler.__name__, params))
+        return _Request(self._client.latency, self._handler(**params))
+
+
+class FakeYouTubeClient:
+    """Mimics the resource/request/execute chain of a googleapiclient client."""
+
+    def __init__(self, latency=0.2, comments_per_video=10, videos_per_playlist=120):
+        self.latency = latency
+        self.comments_per_video = comments_per_video
+        self.videos_per_playlist = videos_per_playlist
+        self.calls = []
+
+    def videos(self):
+        return _Resource(self, self._videos)
+
+    def commentThreads(self):
+        return _Resource(self, self._comment_threads)
+
+    def channels(self):
+        return _Resource(self, self._channels)
+
+    def playlistItems(self):
+        return _Resource(self, self._playlist_items)
+
+    def _channels(self, id, **params):
+        return {"items": [
+            {"contentDetails": {"relatedPlaylists": {"uploads": f"UU{id}"}}}
+        ]}
+
+    def _playlist_items(self, playlistId, maxResults=5, pageToken=None, **params):
+        start = int(pageToken or 0)
+        end = min(start + maxResults, self.videos_per_playlist)
+        response = {"items": [
+            {"contentDetails": {"videoId": f"{playlistId[-6:]}{i:05d}"}}
+            for i in range(start, end)
+        ]}
+        if end < self.videos_per_playlist:
+            response["nextPageToken"] = str(end)
+        return response
+
+    def _videos(self, id, **params):
+        return {"items": [
+            {
+                "id": video_id,
+                "snippet": {
+                    "title": f"Fake video {video_id}",
+                    "channelTitle": f"Fake Channel {len(video_id) % 5}",
+                    "publishedAt": "2025-01-01T00:00:00Z",
+                },
+                "statistics": {"viewCount": "1000", "likeCount": "10"},
+            }
+            for video_id in id.split(",") if video_id
+        ]}
+
+    def _comment_threads(self, videoId, maxResults=20, pageToken=None, **params):
+        start = int(pageToken or 0)
+        end = min(start + maxResults, self.comments_per_video)
+        response = {"items": [
+            {"snippet": {"topLevelComment": {"snippet": {
+                "textDisplay": f"{COMMENT_PHRASES[i % len(COMMENT_PHRASES)]} (comment {i} on {videoId})",
+                "likeCount": i % 7,
+            }}}}
+            for i in range(start, end)
+        ]}
+        if end < self.comments_per_video:
+            response["nextPageToken"] = str(end)
+        return response
+
+
+class FakeTranscriptApi:
+    """
+    Mimics ``YouTubeTranscriptApi.get_transcript``.
+
+    ``minutes`` is a fixed transcript length or a callable mapping a video ID
+    to one, so a run can mix short and long videos.
+    """
+
+    def __init__(self, latency=0.5, minutes=10):
+        self.latency = latency
+        self.minutes = minutes
+
+    def get_transcript(self, video_id, languages=("en",)):
+        time.sleep(self.latency)
+        minutes = self.minutes(video_id) if callable(self.minutes) else self.minutes
+        return synthetic_segments(minutes, seed=zlib.crc32(video_id.encode()))
+
+
+@contextlib.contextmanager
+def fake_backends(youtube=None, transcripts=None):
+    """Patch youtube_utils to use the given (or default) fakes."""
+    from news_analysis.utils import youtube_utils
+    from news_analysis.utils.youtube_quota import QuotaScheduler
+
+    youtube = youtube or FakeYouTubeClient()
+    transcripts = transcripts or FakeTranscriptApi()
+    saved = (youtube_utils._client_for_key, youtube_utils.YouTubeTranscriptApi, youtube_utils.quota_scheduler)
+    youtube_utils._client_for_key = lambda key: youtube
+    youtube_utils.YouTubeTranscriptApi = transcripts
+    # Fake calls must not be charged to the real keys' shared usage.
+    youtube_utils.quota_scheduler = QuotaScheduler(youtube_utils.API_KEYS_LIST)
+    try:
+        yield youtube, transcripts
+    finally:
+        (youtube_utils._client_for_key, youtube_utils.YouTubeTranscriptApi,
+         youtube_utils.quota_scheduler) = saved
+
+
+class StubInferenceServer:
+    """
+    Local HTTP server that answers POST /models/<name> like the Hugging Face
+    Inference API (a text-generation response), after ``latency`` seconds.
+
+    Use as a context manager; ``url_template`` has the same shape as
+    inference_client.HF_INFERENCE_URL.
+    """
+
+    def __init__(self, latency=0.3, status=200, generated_text="Sentiment: neutral"):
+        self.latency = latency
+        self.status = status
+        self.generated_text = generated_text
+        self.requests = 0
+        self._server = None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests += 1
+                time.sleep(stub.latency)
+                body = json.dumps([{"generated_text": stub.generated_text}]).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url_template(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/models/{{model}}"
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextlib.contextmanager
+def fake_inference(server):
+    """Point the shared inference client at a running StubInferenceServer."""
+    from news_analysis.utils import inference_client
+
+    saved = inference_client.HF_INFERENCE_URL
+    inference_client.HF_INFERENCE_URL = server.url_template
+    try:
+        yield server
+    finally:
+        inference_client.HF_INFERENCE_URL = saved
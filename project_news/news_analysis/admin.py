@@ -1,20 +1,23 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.html import format_html
-from import_export.admin import ExportMixin
-from .models import VideoAnalysis
+from .export import DEFAULT_COLUMNS, FORMATS, iter_rows, stream_csv
+from .models import AnalysisJob, ChannelStats, CommentSentiment, VideoAnalysis, VideoTimeline
 
 
 @admin.register(VideoAnalysis)
-class VideoAnalysisAdmin(ExportMixin, admin.ModelAdmin):
+class VideoAnalysisAdmin(admin.ModelAdmin):
     list_display = (
         'channel_name',
         'video_title',
         'bias_colored_bar',
         'published_at',
     )
-    list_filter = ('channel_name', 'published_at')
+    list_filter = ('channel_name', 'published_at', 'analysis_version')
     search_fields = ('video_title', 'channel_name')
     ordering = ('-published_at',)
+    actions = ('export_csv',)
     readonly_fields = (
         'channel_name',
         'video_title',
@@ -29,6 +32,8 @@ class VideoAnalysisAdmin(ExportMixin, admin.ModelAdmin):
         'bias_right',
         'bias_biased',
         'bias_neutral',
+        'analysis_version',
+        'analyzed_at',
         'caption_text',
     )
 
@@ -44,6 +49,9 @@ class VideoAnalysisAdmin(ExportMixin, admin.ModelAdmin):
         ('Bias Scores', {
             'fields': ('bias_left', 'bias_center', 'bias_right', 'bias_biased', 'bias_neutral')
         }),
+        ('Versioning', {
+            'fields': ('analysis_version', 'analyzed_at')
+        }),
         ('Transcript', {
             'classes': ('collapse',),
             'fields': ('caption_text',)
@@ -68,3 +76,64 @@ class VideoAnalysisAdmin(ExportMixin, admin.ModelAdmin):
         """)
 
     bias_colored_bar.short_description = "Bias (L / C / R)"
+
+    @admin.action(description="Export selected analyses as CSV")
+    def export_csv(self, request, queryset):
+        """
+        Stream the selected rows as CSV, reading them in chunks. For filtered
+        or full exports in other formats use the /export/ view or the
+        export_analyses command.
+        """
+        content_type, extension = FORMATS['csv']
+        rows = iter_rows(queryset.order_by('published_at', 'id'), DEFAULT_COLUMNS)
+        response = StreamingHttpResponse(stream_csv(rows, DEFAULT_COLUMNS), content_type=content_type)
+        filename = f"analyses-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'video_id', 'status', 'attempts', 'worker', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('video_id',)
+    ordering = ('-created_at',)
+    readonly_fields = ('result', 'error', 'attempts', 'worker', 'started_at', 'heartbeat_at', 'finished_at')
+
+
+@admin.register(ChannelStats)
+class ChannelStatsAdmin(admin.ModelAdmin):
+    list_display = ('channel_name', 'video_count', 'last_published_at', 'updated_at')
+    search_fields = ('channel_name',)
+    ordering = ('channel_name',)
+
+    def has_add_permission(self, request):
+        # Maintained by the analysis pipeline (and rebuild_channel_stats)
+        return False
+
+
+@admin.register(CommentSentiment)
+class CommentSentimentAdmin(admin.ModelAdmin):
+    list_display = ('video', 'comment_count', 'mean_score', 'like_weighted_score', 'truncated', 'analyzed_at')
+    list_filter = ('truncated',)
+    search_fields = ('video__video_title', 'video__video_id')
+    list_select_related = ('video',)
+    readonly_fields = [field.name for field in CommentSentiment._meta.fields]
+
+    def has_add_permission(self, request):
+        # Written by the analysis pipeline (and analyze_comments)
+        return False
+
+
+@admin.register(VideoTimeline)
+class VideoTimelineAdmin(admin.ModelAdmin):
+    list_display = ('video', 'window_count', 'window_seconds', 'analysis_version', 'updated_at')
+    list_filter = ('analysis_version',)
+    search_fields = ('video__video_title', 'video__video_id')
+    list_select_related = ('video',)
+    exclude = ('data',)
+    readonly_fields = ('video', 'window_count', 'window_seconds', 'analysis_version', 'updated_at')
+
+    def has_add_permission(self, request):
+        # Written by the analysis pipeline (and build_timelines)
+        return False
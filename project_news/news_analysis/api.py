@@ -0,0 +1,258 @@
+"""
+Read-only JSON API for analyses, channels and aggregates.
+
+Every response carries an ETag and Last-Modified and answers conditional GETs
+with 304. Both come from per-channel "versions" kept in the "api" cache
+(see api_cache): the time a channel's data last changed, bumped by
+invalidate_channels() when analyses are written (record_analyses) or
+refreshed. A conditional request therefore costs a few cache reads and no
+database query. Channel and
+aggregate bodies are cached under keys that include those versions, so a
+write to one channel leaves the cached data of every other channel valid.
+"""
+import base64
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Sum
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from .api_cache import (
+    ANY_CHANNEL, EPOCH, cache_key, cache_seconds, channel_versions, digest, get_cache, video_versions, versions,
+)
+from .export import COLUMNS, DEFAULT_COLUMNS, export_queryset, iter_rows, parse_date_filter
+from .models import ChannelStats, VideoAnalysis
+from .utils import metrics
+from .utils.config import get_setting
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+STAT_FIELDS = (
+    "channel_name", "video_count", "positive_count", "negative_count", "neutral_count",
+    "last_published_at", "updated_at",
+)
+SUM_FIELDS = (
+    "video_count", "positive_count", "negative_count", "neutral_count", "sum_sentiment_score",
+) + tuple(f"sum_{field}" for field in ChannelStats.BIAS_FIELDS)
+
+RESPONSES = metrics.counter(
+    "api_responses_total", "API responses by endpoint and result (hit, miss, not_modified)."
+)
+
+
+# -- responses ---------------------------------------------------------------
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _respond(request, endpoint, scope_versions, build, cached=False):
+    """
+    Answer a GET whose body only changes with ``scope_versions``.
+
+    Returns 304 when the client's ETag or Last-Modified is current; otherwise
+    the JSON of build(), taken from the cache when ``cached``.
+    """
+    etag = quote_etag(digest(request.get_full_path(), *map(repr, scope_versions))[:20])
+    last_modified = int(max(scope_versions))
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        RESPONSES.inc(endpoint=endpoint, result="not_modified")
+    else:
+        body = get_cache().get(cache_key("body", etag)) if cached else None
+        RESPONSES.inc(endpoint=endpoint, result="hit" if body is not None else "miss")
+        if body is None:
+            body = json.dumps(build(), cls=DjangoJSONEncoder)
+            if cached:
+                get_cache().set(cache_key("body", etag), body, timeout=cache_seconds())
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=int(get_setting("API_MAX_AGE", 0)))
+    return response
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def _fields(request):
+    """Selected video fields; caption_text only when asked for."""
+    fields = [field.strip() for field in request.GET.get("fields", "").split(",") if field.strip()]
+    unknown = [field for field in fields if field not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields or list(DEFAULT_COLUMNS)
+
+
+def _encode_cursor(*values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def _next_url(request, cursor):
+    query = request.GET.copy()
+    query["cursor"] = cursor
+    return f"{request.path}?{query.urlencode()}"
+
+
+def _channel_stats(stats):
+    data = {field: getattr(stats, field) for field in STAT_FIELDS}
+    for field in ChannelStats.BIAS_FIELDS + ("sentiment_score",):
+        data[f"avg_{field}"] = round(getattr(stats, f"avg_{field}"), 4)
+    return data
+
+
+# -- views -------------------------------------------------------------------
+
+@require_GET
+def videos(request):
+    """
+    Analyses, newest first, in pages of ``limit`` (50, at most 500).
+
+    Query parameters: fields (comma separated; caption_text is only included
+    when listed), channel (repeatable), since and until (YYYY-MM-DD,
+    inclusive), cursor (the "next" link of the previous page). Pages are
+    keyset-paginated on (published_at, id), so deep pages cost the same as
+    the first.
+    """
+    try:
+        fields, limit = _fields(request), _limit(request)
+        since, until = parse_date_filter(request.GET.get("since")), parse_date_filter(request.GET.get("until"))
+        cursor = _decode_cursor(request.GET["cursor"]) if request.GET.get("cursor") else None
+        if cursor is not None and not (
+            isinstance(cursor, list) and len(cursor) == 2
+            and isinstance(cursor[1], int) and parse_datetime(str(cursor[0]))
+        ):
+            raise ValueError("Invalid cursor")
+    except ValueError as e:
+        return _error(str(e))
+    channels = request.GET.getlist("channel")
+
+    def build():
+        queryset = export_queryset(channels, since, until).order_by("-published_at", "-id")
+        if cursor is not None:
+            published_at, last_id = parse_datetime(cursor[0]), cursor[1]
+            queryset = queryset.filter(published_at__lte=published_at).exclude(
+                published_at=published_at, id__gte=last_id
+            )
+        columns = list(dict.fromkeys(fields + ["published_at", "id"]))
+        rows = list(iter_rows(queryset[:limit + 1], columns))
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            # isoformat() keeps the microseconds DjangoJSONEncoder would drop.
+            next_cursor = _encode_cursor(rows[-1]["published_at"].isoformat(), rows[-1]["id"])
+        return {
+            "results": [{field: row[field] for field in fields} for row in rows],
+            "next": _next_url(request, next_cursor) if next_cursor else None,
+        }
+
+    scope = channel_versions(channels[0]) if len(channels) == 1 else versions(ANY_CHANNEL)
+    # Pages with transcripts can be megabytes; those are not cached.
+    return _respond(request, "videos", scope, build, cached="caption_text" not in fields)
+
+
+@require_GET
+def video_detail(request, video_id):
+    """One analysis; ``fields`` as for the list."""
+    try:
+        fields = _fields(request)
+    except ValueError as e:
+        return _error(str(e))
+    scope = video_versions(video_id)
+    if scope is None:
+        return _error("Video not found", status=404)
+
+    def build():
+        row = next(iter_rows(VideoAnalysis.objects.filter(video_id=video_id), fields), None)
+        if row is None:
+            # Deleted since its channel was cached.
+            raise Http404("Video not found")
+        return row
+
+    try:
+        return _respond(request, "video", scope, build, cached="caption_text" not in fields)
+    except Http404 as e:
+        return _error(str(e), status=404)
+
+
+@require_GET
+def channels(request):
+    """Channel statistics by name, in pages of ``limit``, with a name cursor."""
+    try:
+        limit = _limit(request)
+        after = _decode_cursor(request.GET["cursor"]) if request.GET.get("cursor") else None
+        if after is not None and not (isinstance(after, list) and len(after) == 1 and isinstance(after[0], str)):
+            raise ValueError("Invalid cursor")
+    except ValueError as e:
+        return _error(str(e))
+
+    def build():
+        queryset = ChannelStats.objects.order_by("channel_name")
+        if after is not None:
+            queryset = queryset.filter(channel_name__gt=after[0])
+        rows = list(queryset[:limit + 1])
+        next_cursor = _encode_cursor(rows[limit - 1].channel_name) if len(rows) > limit else None
+        return {
+            "results": [_channel_stats(stats) for stats in rows[:limit]],
+            "next": _next_url(request, next_cursor) if next_cursor else None,
+        }
+
+    return _respond(request, "channels", versions(EPOCH, ANY_CHANNEL), build, cached=True)
+
+
+@require_GET
+def channel_detail(request, channel_name):
+    """Statistics of one channel, cached until the channel changes."""
+    def build():
+        stats = ChannelStats.objects.filter(channel_name=channel_name).first()
+        if stats is None:
+            raise Http404("Channel not found")
+        return _channel_stats(stats)
+
+    try:
+        return _respond(request, "channel", channel_versions(channel_name), build, cached=True)
+    except Http404 as e:
+        return _error(str(e), status=404)
+
+
+@require_GET
+def aggregates(request):
+    """Totals and averages over all channels, from the channel statistics."""
+    def build():
+        totals = ChannelStats.objects.aggregate(
+            channel_count=Count("id"),
+            last_published_at=Max("last_published_at"),
+            **{field: Sum(field) for field in SUM_FIELDS},
+        )
+        video_count = totals["video_count"] or 0
+        data = {
+            "channel_count": totals["channel_count"],
+            "video_count": video_count,
+            "positive_count": totals["positive_count"] or 0,
+            "negative_count": totals["negative_count"] or 0,
+            "neutral_count": totals["neutral_count"] or 0,
+            "last_published_at": totals["last_published_at"],
+        }
+        for field in ChannelStats.BIAS_FIELDS + ("sentiment_score",):
+            total = totals[f"sum_{field}"] or 0.0
+            data[f"avg_{field}"] = round(total / video_count, 4) if video_count else 0.0
+        return data
+
+    return _respond(request, "aggregates", versions(EPOCH, ANY_CHANNEL), build, cached=True)
@@ -0,0 +1,102 @@
+"""
+Versions of the data behind the JSON API (news_analysis.api), kept in the
+"api" Django cache (settings.CACHES).
+
+A version is the time a channel's data last changed. invalidate_channels()
+bumps it when analyses are written (stats.record_analyses) or refreshed, and
+invalidate_all() when every channel changes at once. API responses derive
+their ETag, Last-Modified and cached bodies from these versions, so writers
+only need this module, not the views.
+"""
+import hashlib
+import time
+
+from django.core.cache import caches
+
+from .models import VideoAnalysis
+from .utils.config import get_setting
+
+CACHE_ALIAS = "api"
+
+# Version of data that spans channels (lists, aggregates); bumped on every write.
+ANY_CHANNEL = "*"
+# Bumped when every channel changes at once (rebuild_channel_stats).
+EPOCH = "epoch"
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def cache_seconds():
+    return int(get_setting("API_CACHE_SECONDS", 300))
+
+
+def digest(*parts):
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def cache_key(*parts):
+    # Hashed: channel names may contain spaces and other characters memcached rejects.
+    return "api:" + digest(*parts)
+
+
+def versions(*scopes):
+    """
+    Last-change times of ``scopes`` (channel names, ANY_CHANNEL, EPOCH).
+
+    Versions are stored without a timeout, so an ETag stays the same for as
+    long as the data does. A version missing from the cache (never set, or
+    evicted) starts at the current time: that changes the ETag once, but
+    never brings back one that was valid for older data. Changes made
+    without invalidate_channels() (manual SQL) need invalidate_all().
+    """
+    cache = get_cache()
+    keys = [cache_key("version", scope) for scope in scopes]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        # Another process may have added its own time first; use the stored one.
+        found.update(cache.get_many(missing))
+        return [found.get(key, now) for key in keys]
+    return [found[key] for key in keys]
+
+
+def invalidate_channels(channel_names):
+    """Mark the data of these channels (and everything spanning channels) as changed."""
+    now = time.time()
+    scopes = set(channel_names) | {ANY_CHANNEL}
+    get_cache().set_many({cache_key("version", scope): now for scope in scopes}, timeout=None)
+
+
+def invalidate_all():
+    """Mark every channel as changed."""
+    now = time.time()
+    get_cache().set_many({cache_key("version", scope): now for scope in (EPOCH, ANY_CHANNEL)}, timeout=None)
+
+
+def channel_versions(channel_name):
+    """Versions that a response scoped to one channel depends on."""
+    return versions(EPOCH, channel_name)
+
+
+def video_versions(video_id):
+    """
+    Versions that a response about one video depends on (its channel's), or
+    None when the video is not stored.
+
+    The video's channel is remembered in the cache for API_CACHE_SECONDS, so
+    for a known video this costs cache reads only.
+    """
+    cache = get_cache()
+    key = cache_key("channel of", video_id)
+    channel = cache.get(key)
+    if channel is None:
+        channel = VideoAnalysis.objects.filter(video_id=video_id).values_list("channel_name", flat=True).first()
+        if channel is None:
+            return None
+        cache.set(key, channel, timeout=cache_seconds())
+    return channel_versions(channel)
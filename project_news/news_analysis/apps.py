@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class NewsAnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news_analysis'
+
+    def ready(self):
+        from .utils import metrics
+
+        metrics.start_flusher()
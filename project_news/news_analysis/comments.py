@@ -0,0 +1,138 @@
+import math
+from itertools import islice
+
+from django.utils import timezone
+
+from .models import CommentSentiment
+from .utils import metrics
+from .utils.config import get_setting
+
+COMMENT_BATCH_SIZE = 64
+
+SCORED = metrics.counter("comments_scored_total", "Comments scored for sentiment.")
+
+
+def comments_enabled():
+    """Whether analyze_video and manage.py ingest also score comments (COMMENT_ANALYSIS_ENABLED)."""
+    return str(get_setting("COMMENT_ANALYSIS_ENABLED", "1")) not in ("0", "False", "false")
+
+
+def max_comments():
+    from .utils.youtube_utils import COMMENTS_MAX
+
+    return int(get_setting("COMMENT_ANALYSIS_MAX", COMMENTS_MAX))
+
+
+class CommentAggregate:
+    """
+    Running totals over scored comments: label counts, mean/stddev of the
+    polarity score, a like-weighted mean and a score histogram. Memory use
+    does not depend on how many comments are added.
+    """
+
+    def __init__(self, bins=CommentSentiment.SCORE_BINS):
+        self.count = 0
+        self.labels = {"POSITIVE": 0, "NEUTRAL": 0, "NEGATIVE": 0}
+        self.score_sum = 0.0
+        self.score_sq_sum = 0.0
+        self.weight_sum = 0
+        self.weighted_score_sum = 0.0
+        self.histogram = [0] * bins
+
+    def add(self, comments, results):
+        bins = len(self.histogram)
+        for comment, result in zip(comments, results):
+            score = result["score"]
+            weight = 1 + comment.get("like_count", 0)
+            self.count += 1
+            self.labels[result["label"]] += 1
+            self.score_sum += score
+            self.score_sq_sum += score * score
+            self.weight_sum += weight
+            self.weighted_score_sum += score * weight
+            self.histogram[min(bins - 1, max(0, int((score + 1) / 2 * bins)))] += 1
+
+    @property
+    def mean(self):
+        return self.score_sum / self.count if self.count else 0.0
+
+    @property
+    def stddev(self):
+        if not self.count:
+            return 0.0
+        return math.sqrt(max(0.0, self.score_sq_sum / self.count - self.mean ** 2))
+
+    @property
+    def like_weighted_mean(self):
+        return self.weighted_score_sum / self.weight_sum if self.weight_sum else 0.0
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def score_comment_stream(comments, batch_size=COMMENT_BATCH_SIZE, aggregate=None):
+    """
+    Score an iterable of {"text", "like_count"} comments batch by batch and
+    add them to ``aggregate`` (a new CommentAggregate by default).
+    """
+    from .utils.sentiment_utils import score_short_texts
+
+    if aggregate is None:
+        aggregate = CommentAggregate()
+    for batch in _batches(comments, batch_size):
+        aggregate.add(batch, score_short_texts([comment["text"] for comment in batch], batch_size))
+        SCORED.inc(len(batch))
+    return aggregate
+
+
+def _error_reason(error):
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, HttpError) and b"commentsDisabled" in error.content:
+        return "Comments are disabled for this video."
+    return f"{type(error).__name__}: {error}"[:200]
+
+
+def analyze_comments(analysis, limit=None, batch_size=COMMENT_BATCH_SIZE):
+    """
+    Read up to ``limit`` (COMMENT_ANALYSIS_MAX) top-level comments of a
+    stored video page by page, score them in batches with the local
+    sentiment classifier and store the distribution as its CommentSentiment.
+
+    Spends at most comments_quota_cost(limit) YouTube API units. If reading
+    fails part-way (e.g. comments are disabled, quota ran out), what was
+    scored so far is stored together with the error.
+    """
+    from .utils.youtube_utils import iter_comments
+
+    limit = max_comments() if limit is None else limit
+    comments = iter_comments(analysis.video_id, max_comments=limit)
+    error = ""
+    aggregate = CommentAggregate()
+    with metrics.stage_timer("comments"):
+        try:
+            score_comment_stream(comments, batch_size, aggregate)
+        except Exception as e:
+            error = _error_reason(e)
+
+    result, _ = CommentSentiment.objects.update_or_create(
+        video=analysis,
+        defaults={
+            "comment_count": aggregate.count,
+            "positive_count": aggregate.labels["POSITIVE"],
+            "neutral_count": aggregate.labels["NEUTRAL"],
+            "negative_count": aggregate.labels["NEGATIVE"],
+            "mean_score": round(aggregate.mean, 4),
+            "score_stddev": round(aggregate.stddev, 4),
+            "like_weighted_score": round(aggregate.like_weighted_mean, 4),
+            "score_histogram": aggregate.histogram,
+            "max_comments": limit,
+            "truncated": aggregate.count >= limit,
+            "error": error,
+            "analyzed_at": timezone.now(),
+        },
+    )
+    return result
@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import VideoAnalysis
+from .utils.compression import decompress_text
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Columns exported when none are selected. caption_text can be requested
+# explicitly; it is decompressed row by row.
+DEFAULT_COLUMNS = [
+    field.name for field in VideoAnalysis._meta.concrete_fields if field.name != "transcript"
+]
+COLUMNS = DEFAULT_COLUMNS + ["caption_text"]
+
+CHUNK_SIZE = 2000
+
+
+def parse_columns(value):
+    """Parse a comma separated column list, defaulting to DEFAULT_COLUMNS."""
+    columns = [column.strip() for column in (value or "").split(",") if column.strip()]
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return columns or list(DEFAULT_COLUMNS)
+
+
+def parse_date_filter(value):
+    """
+    Parse a since/until date (YYYY-MM-DD); None when empty.
+
+    Raises:
+        ValueError: For malformed or impossible dates (e.g. 2024-02-30).
+    """
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+    return parsed
+
+
+def export_queryset(channels=None, since=None, until=None):
+    """
+    Rows to export, oldest first. ``since`` and ``until`` are dates and both
+    inclusive; ``channels`` is a list of channel names.
+    """
+    queryset = VideoAnalysis.objects.order_by("published_at", "id")
+    if channels:
+        queryset = queryset.filter(channel_name__in=channels)
+    # Compare against datetimes (not published_at__date) so the index is used.
+    if since:
+        queryset = queryset.filter(published_at__gte=timezone.make_aware(datetime.combine(since, time.min)))
+    if until:
+        queryset = queryset.filter(
+            published_at__lt=timezone.make_aware(datetime.combine(until + timedelta(days=1), time.min))
+        )
+    return queryset
+
+
+def iter_rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Yield one dict per row with only ``columns``, reading chunk_size rows at a time."""
+    fields = [column for column in columns if column != "caption_text"]
+    with_text = "caption_text" in columns
+    if with_text:
+        fields += ["transcript__data", "transcript__codec"]
+    for row in queryset.values(*fields).iterator(chunk_size=chunk_size):
+        if with_text:
+            data, codec = row.pop("transcript__data"), row.pop("transcript__codec")
+            row["caption_text"] = decompress_text(data, codec) if data is not None else ""
+        yield {column: row[column] for column in columns}
+
+
+def stream_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_jsonl(rows, columns):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def _arrow_type(pa, column):
+    if column == "caption_text":
+        return pa.string()
+    field = VideoAnalysis._meta.get_field(column)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pa.int64()
+    return pa.string()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects bytes until they are taken."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(rows, columns, row_group_size=CHUNK_SIZE):
+    """Yield a Parquet file as bytes, one row group of row_group_size rows at a time."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+
+    schema = pa.schema([(column, _arrow_type(pa, column)) for column in columns])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        batch = {column: [] for column in columns}
+        size = 0
+        for row in rows:
+            for column in columns:
+                batch[column].append(row[column])
+            size += 1
+            if size == row_group_size:
+                writer.write_table(pa.table(batch, schema=schema))
+                batch = {column: [] for column in columns}
+                size = 0
+                yield sink.take()
+        if size:
+            writer.write_table(pa.table(batch, schema=schema))
+    yield sink.take()
+
+
+STREAMS = {"csv": stream_csv, "jsonl": stream_jsonl, "parquet": stream_parquet}
+
+
+def stream_export(format, columns=None, channels=None, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield an export of VideoAnalysis rows in ``format`` ("csv", "jsonl" or
+    "parquet") as str (csv, jsonl) or bytes (parquet) chunks.
+
+    Rows are read with a server-side iterator, so memory use does not grow
+    with the number of rows.
+    """
+    if format not in STREAMS:
+        raise ValueError(f"Unknown export format '{format}'; choose from {', '.join(STREAMS)}")
+    columns = columns or list(DEFAULT_COLUMNS)
+    rows = iter_rows(export_queryset(channels, since, until), columns, chunk_size)
+    return STREAMS[format](rows, columns)
@@ -1,10 +1,10 @@
-import requests
 import os
 from dotenv import load_dotenv
 
+from .utils.inference_client import get_inference_client, model_url
+
 load_dotenv()
-API_URL = "https://api-inference.huggingface.co/models/google/flan-t5-small"
-headers = {"Authorization": f"Bearer {os.getenv('HF_API_TOKEN')}"}
+API_URL = model_url("google/flan-t5-small")
 
 def query_flant5(prompt):
     payload = {
@@ -12,9 +12,8 @@ def query_flant5(prompt):
         "parameters": {"temperature": 0.7},
         "options": {"wait_for_model": True},
     }
-    response = requests.post(API_URL, headers=headers, json=payload)
-    
     try:
+        response = get_inference_client().post(API_URL, payload, token=os.getenv('HF_API_TOKEN'))
         return response.json()[0]['generated_text']
-    except (KeyError, IndexError):
+    except Exception:
         return "Error: No output from model."
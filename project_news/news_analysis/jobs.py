@@ -0,0 +1,186 @@
+"""
+Database-backed queue of video analysis jobs.
+
+The Streamlit app submits jobs and polls them; ``manage.py run_analysis_worker``
+processes run them, so inference never happens inside a UI request and
+concurrent users do not fight over the same in-process model.
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import AnalysisJob, VideoAnalysis
+from .pipeline import AnalysisError, analyze_video
+from .utils import metrics
+from .utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+JOBS = metrics.counter("analysis_jobs_total", "Analysis jobs finished, by status.")
+
+
+def heartbeat_seconds():
+    """How often a worker refreshes the heartbeat of its running job (ANALYSIS_JOB_HEARTBEAT_SECONDS)."""
+    return float(get_setting("ANALYSIS_JOB_HEARTBEAT_SECONDS", 30))
+
+
+def submit_job(video_id, video_url):
+    """
+    Queue an analysis for a video, or return the job already covering it.
+
+    A queued, running or finished job for the same video is reused, so
+    repeated submissions collapse into a single job. Only a failed job is
+    replaced by a fresh one.
+    """
+    job = (
+        AnalysisJob.objects
+        .filter(video_id=video_id)
+        .exclude(status=AnalysisJob.FAILED)
+        .order_by('-created_at')
+        .first()
+    )
+    if job:
+        return job
+    if VideoAnalysis.objects.filter(video_id=video_id).exists():
+        # Already analysed outside the queue (ingest, older UI versions).
+        return AnalysisJob.objects.create(
+            video_id=video_id, video_url=video_url, status=AnalysisJob.DONE,
+            finished_at=timezone.now(),
+        )
+    try:
+        with transaction.atomic():
+            return AnalysisJob.objects.create(video_id=video_id, video_url=video_url)
+    except IntegrityError:
+        # Lost a race with another submitter; the partial unique constraint
+        # guarantees their job is the active one.
+        return AnalysisJob.objects.get(
+            video_id=video_id, status__in=AnalysisJob.ACTIVE_STATUSES
+        )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker):
+    """
+    Atomically move the oldest queued job to running and return it.
+
+    Claiming is a conditional UPDATE, so two workers can never take the same
+    job, even on SQLite. Returns None when the queue is empty.
+    """
+    while True:
+        job = (
+            AnalysisJob.objects
+            .filter(status=AnalysisJob.QUEUED)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = AnalysisJob.objects.filter(pk=job.pk, status=AnalysisJob.QUEUED).update(
+            status=AnalysisJob.RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def _owned(job):
+    """
+    The job's row while this run of it still counts.
+
+    Every claim increments attempts, so once a stale job has been requeued
+    and claimed again the original worker no longer matches.
+    """
+    return AnalysisJob.objects.filter(
+        pk=job.pk, attempts=job.attempts, status__in=AnalysisJob.ACTIVE_STATUSES
+    )
+
+
+def heartbeat(job):
+    """Refresh a running job's heartbeat. Returns False once the job belongs to another run."""
+    return bool(_owned(job).update(heartbeat_at=timezone.now()))
+
+
+def _beat(job, stop, interval):
+    try:
+        while not stop.wait(interval):
+            try:
+                if not heartbeat(job):
+                    return
+            except DatabaseError as e:
+                # e.g. SQLite busy; the next beat tries again.
+                logger.warning("Could not refresh the heartbeat of job %s: %s", job.pk, e)
+    finally:
+        connection.close()
+
+
+def run_job(job):
+    """
+    Run a claimed job and record its outcome.
+
+    A background thread keeps the job's heartbeat fresh meanwhile. If the job
+    was requeued and claimed by another worker anyway, the outcome is left
+    to that worker (the analysis itself is stored either way).
+    """
+    stop = threading.Event()
+    beat = threading.Thread(
+        target=_beat, args=(job, stop, heartbeat_seconds()), name=f"job-{job.pk}-heartbeat", daemon=True
+    )
+    beat.start()
+    try:
+        analysis = analyze_video(job.video_id, job.video_url)
+    except AnalysisError as e:
+        job.status, job.error = AnalysisJob.FAILED, str(e)
+    except Exception as e:
+        job.status, job.error = AnalysisJob.FAILED, f"{type(e).__name__}: {e}"
+    else:
+        job.status, job.result = AnalysisJob.DONE, {"analysis_id": analysis.pk}
+    finally:
+        stop.set()
+        beat.join()
+    job.finished_at = timezone.now()
+    if not _owned(job).update(
+        status=job.status, error=job.error, result=job.result, finished_at=job.finished_at
+    ):
+        logger.warning("Job %s was taken over by another worker; not recording this run", job.pk)
+        job.refresh_from_db()
+        return job
+    JOBS.inc(status=job.status)
+    return job
+
+
+def requeue_stale_jobs(stale_after=timedelta(minutes=5), max_attempts=3):
+    """
+    Requeue running jobs whose worker stopped sending heartbeats (it died
+    mid-run); fail them after max_attempts.
+
+    ``stale_after`` must be well above ANALYSIS_JOB_HEARTBEAT_SECONDS. Long
+    analyses are safe: their worker keeps the heartbeat fresh.
+
+    Returns:
+        int: Number of jobs requeued.
+    """
+    cutoff = timezone.now() - stale_after
+    stale = AnalysisJob.objects.filter(status=AnalysisJob.RUNNING).filter(
+        # Jobs claimed before heartbeats were recorded fall back to started_at.
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at=None, started_at__lt=cutoff)
+    )
+    stale.filter(attempts__gte=max_attempts).update(
+        status=AnalysisJob.FAILED,
+        error="Worker did not finish the job.",
+        finished_at=timezone.now(),
+    )
+    return stale.filter(attempts__lt=max_attempts).update(status=AnalysisJob.QUEUED, worker="")
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from news_analysis.comments import analyze_comments, max_comments
+from news_analysis.models import VideoAnalysis
+
+
+class Command(BaseCommand):
+    help = (
+        "Score the comments of stored videos and store per-video sentiment "
+        "distributions. Videos that already have one are skipped unless --refresh."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-comments', type=int, default=None,
+                            help='Comments read per video (default COMMENT_ANALYSIS_MAX).')
+        parser.add_argument('--channel', help='Only videos of this channel name.')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many videos.')
+        parser.add_argument('--refresh', action='store_true',
+                            help='Also re-score videos whose comments were analysed before.')
+        parser.add_argument('--batch-size', type=int, default=64, help='Comments per model batch.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many videos would be read and the quota cost.')
+
+    def handle(self, *args, **options):
+        from news_analysis.utils.youtube_utils import comments_quota_cost, quota_scheduler
+
+        limit = options['max_comments'] or max_comments()
+        cost = comments_quota_cost(limit)
+        videos = VideoAnalysis.objects.order_by('-view_count', 'id')
+        if options['channel']:
+            videos = videos.filter(channel_name=options['channel'])
+        if not options['refresh']:
+            videos = videos.filter(comment_sentiment=None)
+        if options['limit']:
+            videos = videos[:options['limit']]
+
+        total = videos.count()
+        self.stdout.write(
+            f"{total} videos, up to {limit} comments each: at most {cost} quota units per video, "
+            f"{cost * total} in total ({quota_scheduler.remaining()} left today)."
+        )
+        if options['dry_run']:
+            return
+
+        started = time.monotonic()
+        done = comments = 0
+        for analysis in videos.only('id', 'video_id').iterator(chunk_size=100):
+            if quota_scheduler.remaining() < cost:
+                self.stdout.write("Not enough YouTube quota left for another video; stopping.")
+                break
+            result = analyze_comments(analysis, limit=limit, batch_size=options['batch_size'])
+            done += 1
+            comments += result.comment_count
+            if result.error:
+                self.stdout.write(f"  {analysis.video_id}: {result.error}")
+            if done % 10 == 0:
+                self.stdout.write(f"  {done}/{total} videos, {comments} comments")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {comments} comments on {done} videos in {elapsed:.1f}s"
+        ))
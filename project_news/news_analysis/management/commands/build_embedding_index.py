@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from news_analysis.models import VideoAnalysis
+from news_analysis.similarity import get_vector_store, index_analyses
+
+
+class Command(BaseCommand):
+    help = (
+        "Embed stored transcripts into the similarity index. Only videos not yet "
+        "in the index are embedded unless --rebuild is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Clear the index first.')
+        parser.add_argument('--batch-size', type=int, default=64)
+        parser.add_argument('--ivf', action='store_true',
+                            help='Cluster the index into inverted lists for faster approximate search.')
+        parser.add_argument('--nlist', type=int, default=None,
+                            help='Number of inverted lists (default 4 * sqrt(videos)).')
+
+    def handle(self, *args, **options):
+        store = get_vector_store()
+        if options['rebuild']:
+            store.clear()
+
+        indexed = set(store.ids().tolist())
+
+        started = time.monotonic()
+        added = 0
+        batch = []
+        rows = (
+            VideoAnalysis.objects.exclude(transcript=None)
+            .select_related('transcript')
+            .only('id', 'transcript')
+            .order_by('id')
+        )
+        for analysis in rows.iterator(chunk_size=options['batch_size']):
+            if analysis.pk in indexed:
+                continue
+            batch.append(analysis)
+            if len(batch) == options['batch_size']:
+                index_analyses(batch)
+                added += len(batch)
+                batch = []
+                self.stdout.write(f"  embedded {added} videos, {added / (time.monotonic() - started):.1f}/s")
+        index_analyses(batch)
+        added += len(batch)
+
+        if options['ivf']:
+            nlist = store.build_ivf(options['nlist'])
+            self.stdout.write(f"Built {nlist} inverted lists.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Embedded {added} videos in {time.monotonic() - started:.1f}s; the index holds {len(store)}."
+        ))
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from news_analysis.models import VideoAnalysis
+from news_analysis.versioning import analysis_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Build bias/sentiment timelines for stored videos from their timed "
+        "transcript segments (read from the transcript cache, downloaded when "
+        "missing). Videos that already have a current timeline are skipped "
+        "unless --all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Rebuild every timeline, not only missing or outdated ones.')
+        parser.add_argument('--channel', help='Only videos of this channel name.')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many videos.')
+        parser.add_argument('--batch-size', type=int, default=8,
+                            help='Videos whose windows are scored in one pass.')
+
+    def handle(self, *args, **options):
+        from news_analysis.timeline import build_timelines
+        from news_analysis.utils.youtube_utils import fetch_transcript_segments
+
+        videos = VideoAnalysis.objects.order_by('-published_at', 'id')
+        if options['channel']:
+            videos = videos.filter(channel_name=options['channel'])
+        if not options['all']:
+            videos = videos.exclude(timeline__analysis_version=analysis_version())
+        if options['limit']:
+            videos = videos[:options['limit']]
+
+        total = videos.count()
+        self.stdout.write(f"{total} videos to build timelines for.")
+        started = time.monotonic()
+        built = missing = 0
+        pending = []
+
+        def flush():
+            nonlocal built
+            built += len(build_timelines(pending))
+            pending.clear()
+            self.stdout.write(f"  {built}/{total} timelines")
+
+        for analysis in videos.only('id', 'video_id').iterator(chunk_size=100):
+            try:
+                segments = fetch_transcript_segments(analysis.video_id)
+            except Exception as e:
+                self.stderr.write(f"  {analysis.video_id}: {e}")
+                segments = None
+            if not segments:
+                missing += 1
+                continue
+            pending.append((analysis, segments))
+            if len(pending) >= options['batch_size']:
+                flush()
+        if pending:
+            flush()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {built} timelines in {time.monotonic() - started:.1f}s "
+            f"({missing} videos without transcript segments)."
+        ))
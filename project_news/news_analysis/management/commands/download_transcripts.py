@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Download transcripts of channels, playlists or a file of video URLs into "
+        "the transcript cache, rate limited. Cached videos are skipped, so an "
+        "interrupted run can simply be started again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channel', action='append', default=[], metavar='CHANNEL_ID',
+                            help='Channel ID whose uploads to download (repeatable).')
+        parser.add_argument('--playlist', action='append', default=[], metavar='PLAYLIST_ID',
+                            help='Playlist ID to download (repeatable).')
+        parser.add_argument('--urls-file', help='File with one YouTube video URL per line.')
+        parser.add_argument('--max-videos', type=int, default=None,
+                            help='Maximum videos to take from each channel or playlist.')
+        parser.add_argument('--language', action='append', default=[],
+                            help='Transcript language, in order of preference (default: en).')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent downloads.')
+        parser.add_argument('--rate', type=float, default=None,
+                            help='Maximum downloads per second (default YOUTUBE_TRANSCRIPT_RATE).')
+        parser.add_argument('--burst', type=int, default=None,
+                            help='Downloads allowed back to back before --rate applies.')
+
+    def handle(self, *args, **options):
+        if not (options['channel'] or options['playlist'] or options['urls_file']):
+            raise CommandError('Give at least one --channel, --playlist or --urls-file.')
+
+        from news_analysis.utils import youtube_utils
+        from news_analysis.utils.rate_limit import TokenBucket
+
+        if options['rate'] is not None or options['burst'] is not None:
+            youtube_utils.transcript_rate_limiter = TokenBucket(
+                youtube_utils.TRANSCRIPT_RATE if options['rate'] is None else options['rate'],
+                options['burst'] or youtube_utils.TRANSCRIPT_BURST,
+            )
+
+        video_ids = []
+        for channel_id in options['channel']:
+            video_ids += youtube_utils.fetch_channel_video_ids(channel_id, max_videos=options['max_videos'])
+        for playlist_id in options['playlist']:
+            video_ids += youtube_utils.fetch_playlist_video_ids(playlist_id, max_videos=options['max_videos'])
+        if options['urls_file']:
+            with open(options['urls_file']) as f:
+                video_ids += [
+                    video_id for video_id in (youtube_utils.extract_video_id(line.strip()) for line in f)
+                    if video_id
+                ]
+        video_ids = list(dict.fromkeys(video_ids))
+        self.stdout.write(f"{len(video_ids)} videos to check.")
+
+        started = time.monotonic()
+        finished = 0
+
+        def progress(video_id, status):
+            nonlocal finished
+            finished += 1
+            if status == 'failed':
+                self.stderr.write(f"  {video_id}: failed")
+            if finished % 50 == 0:
+                rate = finished / (time.monotonic() - started)
+                self.stdout.write(f"  {finished}/{len(video_ids)} ({rate:.1f} videos/s)")
+
+        try:
+            counts = youtube_utils.download_transcripts(
+                video_ids,
+                languages=tuple(options['language']) or ("en",),
+                workers=options['workers'],
+                on_result=progress,
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['downloaded']} downloaded, {counts['cached']} already cached, "
+            f"{counts['missing']} without transcript, {counts['failed']} failed "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
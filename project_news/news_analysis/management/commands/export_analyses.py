@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news_analysis.export import CHUNK_SIZE, COLUMNS, FORMATS, parse_columns, parse_date_filter, stream_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream VideoAnalysis rows to CSV, JSONL or Parquet. Rows are read in "
+        "chunks, so memory use stays flat however large the table is."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument(
+            '--output', '-o',
+            help='File to write. Defaults to stdout (csv and jsonl only).',
+        )
+        parser.add_argument(
+            '--columns',
+            help=f"Comma separated columns to export, from: {', '.join(COLUMNS)}.",
+        )
+        parser.add_argument(
+            '--channel', action='append',
+            help='Only export this channel (repeat for several).',
+        )
+        parser.add_argument('--since', help='First published date to include (YYYY-MM-DD).')
+        parser.add_argument('--until', help='Last published date to include (YYYY-MM-DD).')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            columns = parse_columns(options['columns'])
+            since, until = parse_date_filter(options['since']), parse_date_filter(options['until'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        binary = options['format'] == 'parquet'
+        if binary and not options['output']:
+            raise CommandError("Parquet export needs --output.")
+
+        chunks = stream_export(
+            options['format'],
+            columns=columns,
+            channels=options['channel'],
+            since=since,
+            until=until,
+            chunk_size=options['chunk_size'],
+        )
+        if options['output']:
+            mode = 'wb' if binary else 'w'
+            with open(options['output'], mode, **({} if binary else {'encoding': 'utf-8', 'newline': ''})) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}."))
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
@@ -0,0 +1,242 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news_analysis.comments import analyze_comments, comments_enabled
+from news_analysis.pipeline import (
+    AnalysisError, build_analysis, check_duplicate, existing_video_ids, reused_scores, save_analyses, save_timelines,
+    video_url_for,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill VideoAnalysis rows for whole channels, playlists or a file of "
+        "video URLs. Already-analysed videos are skipped, so an interrupted run "
+        "can simply be started again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channel', action='append', default=[], metavar='CHANNEL_ID',
+                            help='Channel ID to ingest (repeatable).')
+        parser.add_argument('--playlist', action='append', default=[], metavar='PLAYLIST_ID',
+                            help='Playlist ID to ingest (repeatable).')
+        parser.add_argument('--urls-file', help='File with one YouTube video URL per line.')
+        parser.add_argument('--max-videos', type=int, default=None,
+                            help='Maximum videos to take from each channel or playlist.')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent fetch/sentiment workers.')
+        parser.add_argument('--batch-size', type=int, default=16,
+                            help='Videos per bias-inference batch and bulk insert.')
+        parser.add_argument('--state-file', default='.ingest_state.json',
+                            help='Where resolved video IDs and failures are checkpointed.')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Retry videos that failed in a previous run.')
+
+    def handle(self, *args, **options):
+        if not (options['channel'] or options['playlist'] or options['urls_file']):
+            raise CommandError('Give at least one --channel, --playlist or --urls-file.')
+
+        self.state_file = options['state_file']
+        self.state = self._load_state()
+
+        video_ids = self._resolve_sources(options)
+        done = existing_video_ids(video_ids)
+        failed = {} if options['retry_failed'] else self.state['failed']
+        todo = [v for v in video_ids if v not in done and v not in failed]
+        self.stdout.write(
+            f"{len(video_ids)} videos found, {len(done)} already analysed, "
+            f"{len(video_ids) - len(done) - len(todo)} previously failed, {len(todo)} to ingest."
+        )
+        if todo:
+            self._ingest(todo, options['workers'], options['batch_size'])
+
+    # -- sources -------------------------------------------------------------
+
+    def _resolve_sources(self, options):
+        # Imported here so the command module loads without API keys configured.
+        from news_analysis.utils.youtube_utils import (
+            extract_video_id, fetch_channel_video_ids, fetch_playlist_video_ids,
+        )
+
+        sources = [('channel', c, fetch_channel_video_ids) for c in options['channel']]
+        sources += [('playlist', p, fetch_playlist_video_ids) for p in options['playlist']]
+
+        video_ids = []
+        for kind, source_id, resolve in sources:
+            key = f"{kind}:{source_id}"
+            # Listing a channel costs quota, so resolved IDs are checkpointed.
+            if key not in self.state['sources']:
+                self.state['sources'][key] = resolve(source_id, max_videos=options['max_videos'])
+                self._save_state()
+            video_ids += self.state['sources'][key]
+
+        if options['urls_file']:
+            with open(options['urls_file']) as f:
+                for line in f:
+                    video_id = extract_video_id(line.strip()) if line.strip() else None
+                    if video_id:
+                        video_ids.append(video_id)
+
+        # Keep first occurrence order, drop duplicates across sources.
+        return list(dict.fromkeys(video_ids))
+
+    # -- pipeline ------------------------------------------------------------
+
+    def _with_metadata(self, video_ids):
+        """
+        Yield (video_id, metadata, error), fetching metadata 50 IDs per API
+        call. metadata is None when the batch call failed (fetch_video_data
+        then looks the video up itself); error is set for videos that
+        videos.list did not return.
+        """
+        from news_analysis.utils.youtube_utils import VIDEOS_PER_REQUEST, fetch_video_metadata_many
+
+        for start in range(0, len(video_ids), VIDEOS_PER_REQUEST):
+            batch = video_ids[start:start + VIDEOS_PER_REQUEST]
+            try:
+                metadata = fetch_video_metadata_many(batch)
+            except Exception as e:
+                # Fall back to per-video lookups inside fetch_video_data.
+                self.stderr.write(f"Batched metadata fetch failed: {e}")
+                metadata = None
+            for video_id in batch:
+                if metadata is None or video_id in metadata:
+                    yield video_id, metadata and metadata[video_id], None
+                else:
+                    # videos.list leaves out private, deleted and unknown videos.
+                    yield video_id, None, "video not found (private, deleted or unavailable)"
+
+    @staticmethod
+    def _fetch(video_id, metadata):
+        from news_analysis.utils.sentiment_utils import score_sentiment
+        from news_analysis.utils.youtube_utils import fetch_video_data
+
+        data = fetch_video_data(video_url_for(video_id), metadata=metadata)
+        if data and not data.get("metadata"):
+            # Stored with placeholders it would never be fetched again; --retry-failed will.
+            raise AnalysisError("video details could not be fetched")
+        if data and data.get("transcript"):
+            # Near-duplicates (re-uploads, syndicated clips) skip inference.
+            data["duplicate"], data["embedding"] = check_duplicate(data["transcript"])
+            if data["duplicate"]:
+                data["sentiment"], data["bias"] = reused_scores(data["duplicate"])
+            else:
+                # Concurrent calls are batched by the sentiment micro-batcher.
+                data["sentiment"] = score_sentiment(data["transcript"])
+        return data
+
+    def _ingest(self, video_ids, workers, batch_size):
+        started = time.monotonic()
+        saved = failed = 0
+        pending = []
+        queue = self._with_metadata(video_ids)
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as pool:
+            while True:
+                # Keep a bounded number of fetches in flight.
+                while len(in_flight) < workers * 2:
+                    video_id, metadata, error = next(queue, (None, None, None))
+                    if video_id is None:
+                        break
+                    if error:
+                        self.state['failed'][video_id] = error
+                        failed += 1
+                        continue
+                    in_flight[pool.submit(self._fetch, video_id, metadata)] = video_id
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    video_id = in_flight.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        data, reason = None, str(e)
+                    else:
+                        reason = "no transcript available"
+                    if data and data.get("transcript"):
+                        pending.append(data)
+                    else:
+                        self.state['failed'][video_id] = reason
+                        failed += 1
+
+                if len(pending) >= batch_size or (not in_flight and pending):
+                    saved += self._flush(pending)
+                    pending = []
+                    self._save_state()
+                    elapsed = time.monotonic() - started
+                    processed = saved + failed
+                    self.stdout.write(
+                        f"[{processed}/{len(video_ids)}] saved {saved}, failed {failed}, "
+                        f"{processed / elapsed:.2f} videos/s"
+                    )
+
+        self._save_state()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {saved} videos in {elapsed:.1f}s ({failed} failed)."
+        ))
+
+        from news_analysis.utils.youtube_utils import quota_scheduler
+        for key, usage in quota_scheduler.usage_stats().items():
+            self.stdout.write(f"  quota {key}: {usage['used']} used, {usage['remaining']} left")
+
+    def _flush(self, batch):
+        from news_analysis.utils.bias_utils import analyze_bias_many
+
+        to_score = [data for data in batch if not data.get("bias")]
+        if to_score:
+            for data, bias in zip(to_score, analyze_bias_many([data["transcript"] for data in to_score])):
+                data["bias"] = bias
+        rows = []
+        for data in batch:
+            row = build_analysis(
+                data["video_id"],
+                video_url_for(data["video_id"]),
+                data.get("metadata"),
+                data["transcript"],
+                data.get("sentiment") or {},
+                data["bias"],
+                version=data["duplicate"].analysis_version if data.get("duplicate") else None,
+            )
+            row.embedding = data.get("embedding")
+            rows.append(row)
+        saved = save_analyses(rows)
+        # Near-duplicates reused stored scores; they get no timeline here
+        # (manage.py build_timelines can add one).
+        segments = {data["video_id"]: data.get("segments") for data in batch if not data.get("duplicate")}
+        save_timelines([(row, segments.get(row.video_id)) for row in saved])
+        if comments_enabled():
+            for row in saved:
+                try:
+                    analyze_comments(row)
+                except Exception as e:
+                    # The analysis is stored; manage.py analyze_comments can retry.
+                    self.stderr.write(f"Comment analysis of {row.video_id} failed: {e}")
+        for data in batch:
+            self.state['failed'].pop(data["video_id"], None)
+        return len(saved)
+
+    # -- checkpoint ----------------------------------------------------------
+
+    def _load_state(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as f:
+                state = json.load(f)
+        else:
+            state = {}
+        state.setdefault('sources', {})
+        state.setdefault('failed', {})
+        return state
+
+    def _save_state(self):
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_file)
@@ -0,0 +1,88 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from news_analysis.models import VideoAnalysis
+from news_analysis.pipeline import rescore_analyses, stale_analyses
+from news_analysis.versioning import analysis_config, analysis_version
+
+PRIORITIES = {
+    'views': ('-view_count', 'id'),
+    'recent': ('-published_at', 'id'),
+    'oldest': ('analyzed_at', 'id'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-score analyses produced by an older model, label or prompt "
+        "configuration, in prioritized, rate-limited batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--priority', choices=sorted(PRIORITIES), default='views',
+                            help='Which stale videos go first (default: most viewed).')
+        parser.add_argument('--channel', help='Only re-analyse videos of this channel name.')
+        parser.add_argument('--batch-size', type=int, default=16)
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Stop after this many videos.')
+        parser.add_argument('--rate', type=float, default=0,
+                            help='Maximum videos per minute (0 = as fast as possible).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows are stale, per version.')
+
+    def handle(self, *args, **options):
+        version = analysis_version()
+        stale = stale_analyses(version)
+        if options['channel']:
+            stale = stale.filter(channel_name=options['channel'])
+
+        self.stdout.write(f"Current analysis version: {version}")
+        if options['dry_run']:
+            self.stdout.write(str(analysis_config()))
+            counts = stale.values('analysis_version').annotate(n=Count('id')).order_by('-n')
+            for row in counts:
+                self.stdout.write(f"  {row['analysis_version'] or '(unversioned)'}: {row['n']} stale")
+            missing = VideoAnalysis.objects.filter(transcript=None).count()
+            if missing:
+                self.stdout.write(f"  {missing} rows have no transcript and cannot be re-scored")
+            return
+
+        ordering = PRIORITIES[options['priority']]
+        limit = options['limit']
+        batch_size = options['batch_size']
+        # Minimum seconds per batch to stay under --rate videos per minute.
+        min_batch_seconds = 60 * batch_size / options['rate'] if options['rate'] else 0
+
+        started = time.monotonic()
+        done = 0
+        skipped = set()
+        while limit is None or done < limit:
+            size = batch_size if limit is None else min(batch_size, limit - done)
+            # Re-query every batch: rescored rows drop out of the stale set.
+            ids = list(
+                stale.exclude(id__in=skipped).order_by(*ordering).values_list('id', flat=True)[:size]
+            )
+            if not ids:
+                break
+            batch_started = time.monotonic()
+            batch = VideoAnalysis.objects.select_related('transcript').filter(id__in=ids)
+            updated = rescore_analyses(batch)
+            # Rows that could not be re-scored (e.g. LLM errors) are not retried this run.
+            if updated < len(ids):
+                skipped.update(
+                    VideoAnalysis.objects.filter(id__in=ids).exclude(analysis_version=version)
+                    .values_list('id', flat=True)
+                )
+            done += len(ids)
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"  re-analysed {done} videos ({len(skipped)} skipped), {done / elapsed * 60:.0f}/min")
+            pause = min_batch_seconds - (time.monotonic() - batch_started)
+            if pause > 0:
+                time.sleep(pause)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-analysed {done - len(skipped)} videos in {time.monotonic() - started:.1f}s."
+        ))
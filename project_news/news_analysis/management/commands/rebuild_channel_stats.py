@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news_analysis.stats import rebuild_channel_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-channel statistics table from all VideoAnalysis rows."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            channels = rebuild_channel_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {channels} channels."))
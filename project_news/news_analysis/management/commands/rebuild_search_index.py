@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news_analysis.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from all VideoAnalysis rows."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            count = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} videos with {type(backend).__name__}."
+        ))
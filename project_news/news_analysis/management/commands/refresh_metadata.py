@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from news_analysis.api_cache import invalidate_channels
+from news_analysis.models import VideoAnalysis
+from news_analysis.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh title and view count of stored analyses from the YouTube API, "
+        "50 videos per videos.list request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channel', help='Only refresh videos of this channel name.')
+
+    def handle(self, *args, **options):
+        from news_analysis.utils.youtube_utils import VIDEOS_PER_REQUEST, fetch_video_metadata_many
+
+        videos = VideoAnalysis.objects.only(
+            'id', 'video_id', 'video_title', 'view_count', 'channel_name', 'transcript'
+        )
+        if options['channel']:
+            videos = videos.filter(channel_name=options['channel'])
+
+        started = time.monotonic()
+        updated = requests = 0
+        batch = []
+        for video in videos.iterator(chunk_size=VIDEOS_PER_REQUEST):
+            batch.append(video)
+            if len(batch) == VIDEOS_PER_REQUEST:
+                updated += self._refresh(batch, fetch_video_metadata_many)
+                requests += 1
+                batch = []
+        if batch:
+            updated += self._refresh(batch, fetch_video_metadata_many)
+            requests += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {updated} videos with {requests} API requests "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
+
+    @staticmethod
+    def _refresh(batch, fetch_video_metadata_many):
+        metadata = fetch_video_metadata_many([video.video_id for video in batch])
+        changed = []
+        for video in batch:
+            meta = metadata.get(video.video_id)
+            if not meta:
+                continue
+            video.video_title = meta.get("title", video.video_title)
+            try:
+                video.view_count = int(meta.get("view_count"))
+            except (TypeError, ValueError):
+                pass
+            changed.append(video)
+        VideoAnalysis.objects.bulk_update(changed, ['video_title', 'view_count'])
+        # Titles may have changed; transcripts already in the index are skipped.
+        get_search_backend().index(changed)
+        invalidate_channels({video.channel_name for video in changed})
+        return len(changed)
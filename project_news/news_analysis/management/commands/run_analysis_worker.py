@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from news_analysis.jobs import claim_next_job, requeue_stale_jobs, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued video analysis jobs. Start several workers to run jobs "
+        "in parallel; each loads the models once and keeps them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit as soon as the queue is empty.')
+        parser.add_argument('--max-jobs', type=int, default=None,
+                            help='Exit after this many jobs.')
+        parser.add_argument('--stale-minutes', type=int, default=5,
+                            help='Requeue running jobs without a heartbeat for this long (crashed workers).')
+        parser.add_argument('--warmup', action='store_true',
+                            help='Load the models the current settings use before taking the first job.')
+
+    def handle(self, *args, **options):
+        name = worker_name()
+        if options['warmup']:
+            from news_analysis.utils import model_registry
+            model_registry.warmup()
+
+        self.stdout.write(f"Worker {name} started.")
+        processed = 0
+        while options['max_jobs'] is None or processed < options['max_jobs']:
+            requeued = requeue_stale_jobs(timedelta(minutes=options['stale_minutes']))
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale jobs.")
+
+            job = claim_next_job(name)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.monotonic()
+            job = run_job(job)
+            processed += 1
+            self.stdout.write(
+                f"Job {job.pk} ({job.video_id}) {job.status} in "
+                f"{time.monotonic() - started:.1f}s" + (f": {job.error}" if job.error else "")
+            )
+        self.stdout.write(f"Worker {name} processed {processed} jobs.")
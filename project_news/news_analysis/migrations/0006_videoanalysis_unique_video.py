@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-17 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_analysis', '0005_videoanalysis_video_url'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='videoanalysis',
+            name='video_id',
+            field=models.CharField(default='Unknown ID', max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='videoanalysis',
+            name='video_url',
+            field=models.URLField(default='www.youtube.com', max_length=500, unique=True),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.21 on 2026-10-17 00:57
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def populate_channel_stats(apps, schema_editor):
+    VideoAnalysis = apps.get_model('news_analysis', 'VideoAnalysis')
+    ChannelStats = apps.get_model('news_analysis', 'ChannelStats')
+    bias_fields = ('bias_left', 'bias_center', 'bias_right', 'bias_biased', 'bias_neutral')
+    annotations = {f'sum_{field}': Sum(field) for field in bias_fields}
+    annotations.update({
+        'video_count': Count('id'),
+        'sum_sentiment_score': Sum('sentiment_score'),
+        'positive_count': Count('id', filter=Q(sentiment_label__icontains='positive')),
+        'negative_count': Count('id', filter=Q(sentiment_label__icontains='negative')),
+        'neutral_count': Count('id', filter=Q(sentiment_label__icontains='neutral')),
+        'last_published_at': Max('published_at'),
+    })
+    rows = VideoAnalysis.objects.values('channel_name').annotate(**annotations).order_by()
+    ChannelStats.objects.bulk_create([ChannelStats(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_analysis', '0007_analysisjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_name', models.CharField(max_length=200, unique=True)),
+                ('video_count', models.PositiveIntegerField(default=0)),
+                ('sum_bias_left', models.FloatField(default=0.0)),
+                ('sum_bias_center', models.FloatField(default=0.0)),
+                ('sum_bias_right', models.FloatField(default=0.0)),
+                ('sum_bias_biased', models.FloatField(default=0.0)),
+                ('sum_bias_neutral', models.FloatField(default=0.0)),
+                ('sum_sentiment_score', models.FloatField(default=0.0)),
+                ('positive_count', models.PositiveIntegerField(default=0)),
+                ('negative_count', models.PositiveIntegerField(default=0)),
+                ('neutral_count', models.PositiveIntegerField(default=0)),
+                ('last_published_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'channel stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='videoanalysis',
+            index=models.Index(fields=['channel_name', '-published_at'], name='video_channel_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videoanalysis',
+            index=models.Index(fields=['published_at'], name='video_published_idx'),
+        ),
+        migrations.RunPython(populate_channel_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.21 on 2026-10-17 02:10
+
+import hashlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from news_analysis.utils.compression import DEFAULT_CODEC, compress_text, decompress_text
+
+
+def move_captions_to_transcripts(apps, schema_editor):
+    VideoAnalysis = apps.get_model('news_analysis', 'VideoAnalysis')
+    Transcript = apps.get_model('news_analysis', 'Transcript')
+    by_hash = {}
+    rows = VideoAnalysis.objects.exclude(caption_text='').only('id', 'caption_text')
+    for row in rows.iterator(chunk_size=200):
+        content_hash = hashlib.sha256(row.caption_text.encode('utf-8')).hexdigest()
+        if content_hash not in by_hash:
+            by_hash[content_hash] = Transcript.objects.create(
+                content_hash=content_hash,
+                codec=DEFAULT_CODEC,
+                data=compress_text(row.caption_text, DEFAULT_CODEC),
+                length=len(row.caption_text),
+            ).pk
+        VideoAnalysis.objects.filter(pk=row.pk).update(transcript_id=by_hash[content_hash])
+
+
+def move_transcripts_to_captions(apps, schema_editor):
+    VideoAnalysis = apps.get_model('news_analysis', 'VideoAnalysis')
+    Transcript = apps.get_model('news_analysis', 'Transcript')
+    for transcript in Transcript.objects.iterator(chunk_size=200):
+        VideoAnalysis.objects.filter(transcript_id=transcript.pk).update(
+            caption_text=decompress_text(transcript.data, transcript.codec)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_analysis', '0008_channelstats_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transcript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('codec', models.CharField(default='zlib', max_length=10)),
+                ('data', models.BinaryField()),
+                ('length', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='videoanalysis',
+            name='transcript',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='videos', to='news_analysis.transcript'),
+        ),
+        migrations.RunPython(move_captions_to_transcripts, move_transcripts_to_captions),
+        migrations.RemoveField(
+            model_name='videoanalysis',
+            name='caption_text',
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.21 on 2026-10-17 02:40
+
+from django.db import migrations
+
+from news_analysis.utils.compression import decompress_text
+
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only; other databases use news_analysis.search.SimpleSearchBackend.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    VideoAnalysis = apps.get_model('news_analysis', 'VideoAnalysis')
+    Transcript = apps.get_model('news_analysis', 'Transcript')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS news_analysis_search_meta USING fts5(title, channel, {TOKENIZE})"
+        )
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS news_analysis_search_text USING fts5(transcript, content = '', {TOKENIZE})"
+        )
+        cursor.executemany(
+            "INSERT INTO news_analysis_search_meta (rowid, title, channel) VALUES (%s, %s, %s)",
+            VideoAnalysis.objects.values_list('id', 'video_title', 'channel_name'),
+        )
+        for transcript in Transcript.objects.iterator(chunk_size=200):
+            cursor.execute(
+                "INSERT INTO news_analysis_search_text (rowid, transcript) VALUES (%s, %s)",
+                [transcript.pk, decompress_text(transcript.data, transcript.codec)],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS news_analysis_search_meta")
+        cursor.execute("DROP TABLE IF EXISTS news_analysis_search_text")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_analysis', '0009_transcript'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.21 on 2026-10-17 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_analysis', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoanalysis',
+            name='analysis_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='videoanalysis',
+            name='analyzed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='videoanalysis',
+            index=models.Index(fields=['analysis_version'], name='video_analysis_version_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.21 on 2026-10-17 01:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_analysis', '0011_analysis_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentSentiment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('positive_count', models.PositiveIntegerField(default=0)),
+                ('neutral_count', models.PositiveIntegerField(default=0)),
+                ('negative_count', models.PositiveIntegerField(default=0)),
+                ('mean_score', models.FloatField(default=0.0)),
+                ('score_stddev', models.FloatField(default=0.0)),
+                ('like_weighted_score', models.FloatField(default=0.0)),
+                ('score_histogram', models.JSONField(default=list)),
+                ('max_comments', models.PositiveIntegerField(default=0)),
+                ('truncated', models.BooleanField(default=False)),
+                ('error', models.CharField(blank=True, default='', max_length=200)),
+                ('analyzed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('video', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='comment_sentiment', to='news_analysis.videoanalysis')),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.21 on 2026-10-17 01:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_analysis', '0012_comment_sentiment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoTimeline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_seconds', models.FloatField()),
+                ('window_count', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+                ('analysis_version', models.CharField(blank=True, default='', max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('video', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to='news_analysis.videoanalysis')),
+            ],
+        ),
+    ]
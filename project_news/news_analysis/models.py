@@ -1,14 +1,79 @@
+import hashlib
+
 from django.db import models
 from django.utils import timezone
 
+from .utils.compression import DEFAULT_CODEC, compress_text, decompress_text
+
+
+class Transcript(models.Model):
+    """
+    Compressed transcript text, addressed by the SHA-256 of its content so
+    identical transcripts (re-uploads, syndicated clips) are stored once.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    codec = models.CharField(max_length=10, default="zlib")
+    data = models.BinaryField()
+    length = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Transcript {self.content_hash[:12]} ({self.length} chars)"
+
+    @property
+    def text(self):
+        # Decompressed once per instance, on first access.
+        if not hasattr(self, "_text"):
+            self._text = decompress_text(self.data, self.codec)
+        return self._text
+
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def store_many(cls, texts):
+        """
+        Return a saved Transcript for each text, inserting only new content.
+
+        Uses one lookup and at most one bulk insert for the whole list.
+        """
+        hashes = [cls.hash_text(text) for text in texts]
+        found = {t.content_hash: t for t in cls.objects.filter(content_hash__in=set(hashes)).only("id", "content_hash")}
+        missing = {}
+        for content_hash, text in zip(hashes, texts):
+            if content_hash not in found and content_hash not in missing:
+                missing[content_hash] = cls(
+                    content_hash=content_hash,
+                    codec=DEFAULT_CODEC,
+                    data=compress_text(text, DEFAULT_CODEC),
+                    length=len(text),
+                )
+        if missing:
+            cls.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            found.update(
+                (t.content_hash, t)
+                for t in cls.objects.filter(content_hash__in=list(missing)).only("id", "content_hash")
+            )
+        return [found[content_hash] for content_hash in hashes]
+
+    @classmethod
+    def store(cls, text):
+        return cls.store_many([text])[0]
+
+
 class VideoAnalysis(models.Model):
     video_title = models.CharField(max_length=300, default="Untitled")
     video_id = models.CharField(max_length=100, default="Unknown ID", unique=True)
     video_url = models.URLField(max_length=500, default="www.youtube.com", unique=True)
-    channel_name = models.CharField(max_length=200, default="Unknown Channel", unique=True)
+    channel_name = models.CharField(max_length=200, default="Unknown Channel")
     published_at = models.DateTimeField(default=timezone.now)
     view_count = models.PositiveBigIntegerField(default=0)
-    caption_text = models.TextField(default="")
+    # Transcripts live compressed in their own table and are only loaded
+    # when caption_text / caption_preview() is used.
+    transcript = models.ForeignKey(
+        Transcript, null=True, blank=True, on_delete=models.SET_NULL, related_name="videos"
+    )
     sentiment_label = models.CharField(max_length=50, default="NEUTRAL")
     sentiment_score = models.FloatField(default=0.0)
     bias_left = models.FloatField(default=0.0)
@@ -16,7 +81,225 @@ class VideoAnalysis(models.Model):
     bias_right = models.FloatField(default=0.0)
     bias_biased = models.FloatField(default=0.0)
     bias_neutral = models.FloatField(default=0.0)
+    # Hash of the model/label/prompt configuration that produced the scores
+    # (see news_analysis.versioning); rows with another version are stale.
+    analysis_version = models.CharField(max_length=32, default="", blank=True)
+    analyzed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["analysis_version"], name="video_analysis_version_idx"),
+            # Serves both channel_name lookups and the per-channel listing
+            # ordered by newest first.
+            models.Index(fields=["channel_name", "-published_at"], name="video_channel_published_idx"),
+            models.Index(fields=["published_at"], name="video_published_idx"),
+        ]
+
+    # Text assigned through caption_text that is not stored as a Transcript yet
+    _pending_caption_text = None
+
     def __str__(self):
         return f"{self.channel_name}, {self.video_title}, {self.video_id}"
+
+    @property
+    def caption_text(self):
+        if self._pending_caption_text is not None:
+            return self._pending_caption_text
+        return self.transcript.text if self.transcript_id else ""
+
+    @caption_text.setter
+    def caption_text(self, value):
+        self._pending_caption_text = value or ""
+
+    def caption_preview(self, length=500):
+        text = self.caption_text
+        return text[:length] + "..." if len(text) > length else text
+
+    @classmethod
+    def attach_transcripts(cls, analyses):
+        """Store pending caption texts of unsaved analyses in one batch (for bulk_create)."""
+        pending = [a for a in analyses if a._pending_caption_text]
+        for analysis, transcript in zip(
+            pending, Transcript.store_many([a._pending_caption_text for a in pending])
+        ):
+            transcript._text = analysis._pending_caption_text
+            analysis.transcript = transcript
+            analysis._pending_caption_text = None
+
+    def save(self, *args, **kwargs):
+        if self._pending_caption_text is not None:
+            text = self._pending_caption_text
+            self.transcript = Transcript.store(text) if text else None
+            if self.transcript:
+                self.transcript._text = text
+            self._pending_caption_text = None
+        super().save(*args, **kwargs)
+
+
+class CommentSentiment(models.Model):
+    """
+    Sentiment of a video's comments, aggregated while they stream in; no
+    comment text is stored.
+    """
+    # score_histogram counts comment polarity scores in SCORE_BINS equal
+    # bins over [-1, 1].
+    SCORE_BINS = 10
+
+    video = models.OneToOneField(
+        VideoAnalysis, on_delete=models.CASCADE, related_name="comment_sentiment"
+    )
+    comment_count = models.PositiveIntegerField(default=0)
+    positive_count = models.PositiveIntegerField(default=0)
+    neutral_count = models.PositiveIntegerField(default=0)
+    negative_count = models.PositiveIntegerField(default=0)
+    mean_score = models.FloatField(default=0.0)
+    score_stddev = models.FloatField(default=0.0)
+    # Mean score with each comment weighted by 1 + its like count
+    like_weighted_score = models.FloatField(default=0.0)
+    score_histogram = models.JSONField(default=list)
+    # Cap in force when the comments were read; truncated means it was reached.
+    max_comments = models.PositiveIntegerField(default=0)
+    truncated = models.BooleanField(default=False)
+    error = models.CharField(max_length=200, blank=True, default="")
+    analyzed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Comments on {self.video_id} ({self.comment_count})"
+
+
+class VideoTimeline(models.Model):
+    """
+    Bias and sentiment over the course of a video: one row per transcript
+    time window, stored as a little-endian float32 matrix with COLUMNS.
+    """
+    COLUMNS = ("start", "left", "center", "right", "biased", "neutral", "sentiment")
+
+    video = models.OneToOneField(
+        VideoAnalysis, on_delete=models.CASCADE, related_name="timeline"
+    )
+    # Windows are widened for long videos, so this can exceed the setting.
+    window_seconds = models.FloatField()
+    window_count = models.PositiveIntegerField(default=0)
+    data = models.BinaryField()
+    analysis_version = models.CharField(max_length=32, default="", blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Timeline of {self.video_id} ({self.window_count} windows)"
+
+    @property
+    def array(self):
+        """The windows as a (window_count, len(COLUMNS)) float32 array."""
+        import numpy as np
+
+        return np.frombuffer(bytes(self.data), dtype="<f4").reshape(-1, len(self.COLUMNS))
+
+    @classmethod
+    def pack(cls, rows):
+        """Encode [[start, left, center, right, biased, neutral, sentiment], ...] for ``data``."""
+        import numpy as np
+
+        return np.asarray(rows, dtype="<f4").reshape(-1, len(cls.COLUMNS)).tobytes()
+
+    def columns(self):
+        """{column: [value per window]}, e.g. for charts."""
+        return dict(zip(self.COLUMNS, self.array.T.tolist()))
+
+
+class ChannelStats(models.Model):
+    """
+    Running per-channel totals, updated as analyses are written so channel
+    pages never aggregate over VideoAnalysis rows.
+    """
+    BIAS_FIELDS = ("bias_left", "bias_center", "bias_right", "bias_biased", "bias_neutral")
+
+    channel_name = models.CharField(max_length=200, unique=True)
+    video_count = models.PositiveIntegerField(default=0)
+    sum_bias_left = models.FloatField(default=0.0)
+    sum_bias_center = models.FloatField(default=0.0)
+    sum_bias_right = models.FloatField(default=0.0)
+    sum_bias_biased = models.FloatField(default=0.0)
+    sum_bias_neutral = models.FloatField(default=0.0)
+    sum_sentiment_score = models.FloatField(default=0.0)
+    positive_count = models.PositiveIntegerField(default=0)
+    negative_count = models.PositiveIntegerField(default=0)
+    neutral_count = models.PositiveIntegerField(default=0)
+    last_published_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "channel stats"
+
+    def __str__(self):
+        return f"{self.channel_name} ({self.video_count} videos)"
+
+    def _avg(self, total):
+        return total / self.video_count if self.video_count else 0.0
+
+    @property
+    def avg_bias_left(self):
+        return self._avg(self.sum_bias_left)
+
+    @property
+    def avg_bias_center(self):
+        return self._avg(self.sum_bias_center)
+
+    @property
+    def avg_bias_right(self):
+        return self._avg(self.sum_bias_right)
+
+    @property
+    def avg_bias_biased(self):
+        return self._avg(self.sum_bias_biased)
+
+    @property
+    def avg_bias_neutral(self):
+        return self._avg(self.sum_bias_neutral)
+
+    @property
+    def avg_sentiment_score(self):
+        return self._avg(self.sum_sentiment_score)
+
+
+class AnalysisJob(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+    video_id = models.CharField(max_length=100, db_index=True)
+    video_url = models.URLField(max_length=500)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while the job runs; a running job whose
+    # heartbeat stops is requeued (see jobs.requeue_stale_jobs).
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+        constraints = [
+            # At most one queued/running job per video: duplicate submissions
+            # collapse onto the existing job.
+            models.UniqueConstraint(
+                fields=["video_id"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="unique_active_job_per_video",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.video_id}, {self.status})"
@@ -0,0 +1,306 @@
+import copy
+import logging
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .comments import analyze_comments, comments_enabled
+from .models import VideoAnalysis
+from .search import get_search_backend
+from .similarity import embed, embeddings_enabled, find_near_duplicate, index_analyses, reuse_duplicates
+from .stats import record_analyses
+from .timeline import build_timelines, timeline_enabled
+from .utils import metrics
+from .versioning import analysis_version
+
+logger = logging.getLogger(__name__)
+
+SAVED = metrics.counter("analyses_saved_total", "VideoAnalysis rows inserted.")
+REUSED = metrics.counter("analyses_reused_total", "Videos that reused a near-duplicate's analysis.")
+
+
+class AnalysisError(Exception):
+    """Raised when a video cannot be analysed (bad URL, no captions, ...)."""
+
+
+def video_url_for(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def existing_video_ids(video_ids, batch_size=500):
+    """
+    Return the subset of video_ids that already have a VideoAnalysis row.
+
+    Uses one IN query per batch_size IDs (SQLite caps bound parameters).
+    """
+    video_ids = list(video_ids)
+    found = set()
+    for start in range(0, len(video_ids), batch_size):
+        found.update(
+            VideoAnalysis.objects
+            .filter(video_id__in=video_ids[start:start + batch_size])
+            .values_list('video_id', flat=True)
+        )
+    return found
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_analysis(video_id, video_url, metadata, transcript, sentiment, bias, version=None):
+    """
+    Build an unsaved VideoAnalysis from fetched data and model outputs.
+
+    Fields missing from ``metadata`` fall back to the model defaults so rows
+    can be written with bulk_create without per-row validation. The row is
+    stamped with ``version`` (by default the analysis_version() of the
+    sentiment backend that produced ``sentiment``), unless a model call failed: then it gets no version, so stale_analyses()
+    returns it and manage.py reanalyze scores it again.
+
+    Raises:
+        AnalysisError: If ``metadata`` is empty (the lookup failed). A row of
+            placeholders would count towards an "Unknown Channel" and, being
+            stored, never be fetched again.
+    """
+    if not metadata:
+        raise AnalysisError(f"No metadata for video {video_id}; it was not stored.")
+    if "error" in sentiment or not sentiment.get("label") or "error" in bias:
+        logger.warning(
+            "Storing %s without an analysis version: %s", video_id,
+            sentiment.get("error") or bias.get("error") or "no sentiment",
+        )
+        version = ""
+    elif version is None:
+        version = analysis_version(sentiment.get("backend"))
+    published_at = parse_datetime(metadata.get("published_at") or "") or timezone.now()
+    return VideoAnalysis(
+        video_title=metadata.get("title", "Untitled"),
+        video_id=video_id,
+        video_url=video_url,
+        channel_name=metadata.get("channel_title", "Unknown Channel"),
+        published_at=published_at,
+        view_count=_to_int(metadata.get("view_count")),
+        caption_text=transcript,
+        sentiment_label=sentiment.get("label", ""),
+        sentiment_score=sentiment.get("score", 0.0),
+        bias_left=bias.get("left", 0.0),
+        bias_center=bias.get("center", 0.0),
+        bias_right=bias.get("right", 0.0),
+        bias_biased=bias.get("biased", 0.0),
+        bias_neutral=bias.get("neutral", 0.0),
+        analysis_version=version,
+        analyzed_at=timezone.now(),
+    )
+
+
+def check_duplicate(transcript):
+    """
+    Look for an already-analysed near-duplicate of a transcript.
+
+    Returns:
+        tuple: (VideoAnalysis or None, embedding or None). Both are None when
+        REUSE_DUPLICATE_ANALYSES is off.
+    """
+    if not reuse_duplicates():
+        return None, None
+    vector = embed([transcript])[0]
+    return find_near_duplicate(vector), vector
+
+
+def reused_scores(duplicate):
+    """The (sentiment, bias) results of an existing analysis, as build_analysis takes them."""
+    REUSED.inc()
+    sentiment = {"label": duplicate.sentiment_label, "score": duplicate.sentiment_score}
+    bias = {
+        "left": duplicate.bias_left,
+        "center": duplicate.bias_center,
+        "right": duplicate.bias_right,
+        "biased": duplicate.bias_biased,
+        "neutral": duplicate.bias_neutral,
+    }
+    return sentiment, bias
+
+
+def _index_embeddings(analyses):
+    # The vector store can be rebuilt from the database, so failing to index
+    # must not fail the save (build_embedding_index catches up later).
+    if not embeddings_enabled():
+        return
+    try:
+        index_analyses(analyses)
+    except Exception:
+        logger.exception("Could not add %d analyses to the embedding index", len(analyses))
+
+
+def save_timelines(items):
+    """
+    Build timelines for [(saved VideoAnalysis, transcript segments)].
+
+    Like the embedding index, timelines can be rebuilt later (manage.py
+    build_timelines), so failing here must not fail the analysis.
+    """
+    items = [(analysis, segments) for analysis, segments in items if segments]
+    if not (items and timeline_enabled()):
+        return
+    try:
+        build_timelines(items)
+    except Exception:
+        logger.exception("Could not build timelines for %d analyses", len(items))
+
+
+def save_analyses(analyses):
+    """
+    Insert new VideoAnalysis rows, fold them into the channel statistics and
+    add them to the search and embedding indexes.
+
+    Rows whose video is already stored are skipped. Returns the saved rows.
+    """
+    existing = existing_video_ids(analysis.video_id for analysis in analyses)
+    new = [analysis for analysis in analyses if analysis.video_id not in existing]
+    try:
+        with metrics.stage_timer("db_write"), transaction.atomic():
+            VideoAnalysis.attach_transcripts(new)
+            VideoAnalysis.objects.bulk_create(new)
+            record_analyses(new)
+            get_search_backend().index(new)
+        SAVED.inc(len(new))
+        _index_embeddings(new)
+        return new
+    except IntegrityError:
+        # Another writer stored some of these videos meanwhile; go row by row.
+        saved = []
+        for analysis in new:
+            analysis.pk = None
+            if analysis.transcript_id:
+                # The rollback also removed the Transcript rows attach_transcripts
+                # inserted; save() stores the text again.
+                analysis.caption_text = analysis.transcript.text
+                analysis.transcript = None
+            try:
+                with transaction.atomic():
+                    analysis.save()
+                    record_analyses([analysis])
+                    get_search_backend().index([analysis])
+            except IntegrityError:
+                continue
+            saved.append(analysis)
+        SAVED.inc(len(saved))
+        _index_embeddings(saved)
+        return saved
+
+
+def analyze_video(video_id, video_url):
+    """
+    Fetch, score and store one video, returning its VideoAnalysis row.
+
+    An existing row for the video is returned as-is.
+    """
+    existing = VideoAnalysis.objects.filter(video_id=video_id).first()
+    if existing:
+        return existing
+    with metrics.stage_timer("analyze"):
+        return _analyze_new_video(video_id, video_url)
+
+
+def _analyze_new_video(video_id, video_url):
+    from .utils.bias_utils import analyze_bias
+    from .utils.sentiment_utils import score_sentiment
+    from .utils.youtube_utils import fetch_video_data
+
+    video_data = fetch_video_data(video_url)
+    if not video_data:
+        raise AnalysisError("Failed to fetch video data. Please check the URL and try again.")
+    if not video_data.get("metadata"):
+        # Checked before scoring: the video is not stored, so a retry fetches it again.
+        raise AnalysisError("Failed to fetch the video's details from YouTube. Please try again later.")
+    transcript = video_data.get("transcript")
+    if not transcript:
+        raise AnalysisError("No captions available for this video.")
+
+    duplicate, vector = check_duplicate(transcript)
+    if duplicate:
+        logger.info("Reusing the analysis of near-duplicate video %s for %s", duplicate.video_id, video_id)
+        sentiment, bias = reused_scores(duplicate)
+    else:
+        sentiment = score_sentiment(transcript)
+        bias = analyze_bias(transcript)
+    analysis = build_analysis(
+        video_id, video_url, video_data.get("metadata"), transcript, sentiment, bias,
+        version=duplicate.analysis_version if duplicate else None,
+    )
+    analysis.embedding = vector
+    if not save_analyses([analysis]):
+        return VideoAnalysis.objects.get(video_id=video_id)
+    if not duplicate:
+        save_timelines([(analysis, video_data.get("segments"))])
+    if comments_enabled():
+        analyze_comments(analysis)
+    return analysis
+
+
+def stale_analyses(version=None):
+    """
+    Analyses scored with another configuration than ``version`` (the current
+    one by default) that still have a transcript to re-score.
+
+    The distinct versions are read from the analysis_version index first, so
+    the final filter is an indexed IN lookup rather than a != scan.
+    """
+    version = version or analysis_version()
+    versions = (
+        VideoAnalysis.objects.order_by()
+        .values_list("analysis_version", flat=True).distinct()
+    )
+    stale = [v for v in versions if v != version]
+    return VideoAnalysis.objects.filter(analysis_version__in=stale).exclude(transcript=None)
+
+
+RESCORED_FIELDS = [
+    "sentiment_label", "sentiment_score",
+    "bias_left", "bias_center", "bias_right", "bias_biased", "bias_neutral",
+    "analysis_version", "analyzed_at",
+]
+
+
+def rescore_analyses(analyses):
+    """
+    Re-run sentiment and bias on stored analyses and update them in place.
+
+    Bias windows whose text and settings did not change come from the
+    chunk-level inference cache. Rows whose sentiment call failed keep their
+    old scores and version, so a later run retries them. Returns the number
+    of rows updated.
+    """
+    from .utils.bias_utils import analyze_bias_many
+    from .utils.sentiment_utils import score_sentiment_many
+
+    analyses = list(analyses)
+    texts = [analysis.caption_text for analysis in analyses]
+    biases = analyze_bias_many(texts)
+    sentiments = score_sentiment_many(texts)
+
+    now = timezone.now()
+    old, updated = [], []
+    for analysis, bias, sentiment in zip(analyses, biases, sentiments):
+        if "error" in sentiment:
+            logger.warning("Not re-scoring %s: %s", analysis.video_id, sentiment["error"])
+            continue
+        old.append(copy.copy(analysis))
+        analysis.sentiment_label = sentiment.get("label", "")
+        analysis.sentiment_score = sentiment.get("score", 0.0)
+        for label in ("left", "center", "right", "biased", "neutral"):
+            setattr(analysis, f"bias_{label}", bias[label])
+        analysis.analysis_version = analysis_version(sentiment.get("backend"))
+        analysis.analyzed_at = now
+        updated.append(analysis)
+
+    with transaction.atomic():
+        record_analyses(old, sign=-1)
+        VideoAnalysis.objects.bulk_update(updated, RESCORED_FIELDS)
+        record_analyses(updated)
+    return len(updated)
@@ -0,0 +1,304 @@
+import math
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import ChannelStats, VideoAnalysis
+from .utils.config import get_setting
+
+# Score columns that search results can be filtered on with (min, max) ranges.
+FILTER_FIELDS = ChannelStats.BIAS_FIELDS + ("sentiment_score",)
+
+# Matched terms in titles and snippets are wrapped in these (Markdown bold).
+HIGHLIGHT = ("**", "**")
+
+SNIPPET_WORDS = 40
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_QUERY_TERM_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def parse_query(query):
+    """
+    Split a user query into lowercase terms; a trailing ``*`` marks a prefix
+    term. Everything else (quotes, operators, punctuation) is ignored.
+    """
+    return [term.lower() for term in _QUERY_TERM_RE.findall(query or "")]
+
+
+def _term_matches(word, terms):
+    word = word.lower()
+    return any(
+        word.startswith(term[:-1]) if term.endswith("*") else word == term
+        for term in terms
+    )
+
+
+def highlight(text, terms, marks=HIGHLIGHT):
+    """Wrap every word of ``text`` that matches one of ``terms``."""
+    if not terms:
+        return text
+    return _WORD_RE.sub(
+        lambda m: f"{marks[0]}{m.group(0)}{marks[1]}" if _term_matches(m.group(0), terms) else m.group(0),
+        text,
+    )
+
+
+def make_snippet(text, terms, words=SNIPPET_WORDS, marks=HIGHLIGHT):
+    """
+    Return the ``words``-word window of ``text`` with the most query matches,
+    highlighted, with "..." where text was cut.
+    """
+    tokens = list(_WORD_RE.finditer(text or ""))
+    if not tokens:
+        return ""
+    hits = [i for i, token in enumerate(tokens) if _term_matches(token.group(0), terms)]
+    start = 0
+    if hits:
+        # Slide over the hits to find the window containing the most of them.
+        best, left = 0, 0
+        for right, hit in enumerate(hits):
+            while hit - hits[left] >= words:
+                left += 1
+            if right - left + 1 > best:
+                best, start = right - left + 1, hits[left]
+        start = max(0, min(start - words // 4, len(tokens) - words))
+    end = min(len(tokens), start + words)
+    snippet = highlight(text[tokens[start].start():tokens[end - 1].end()], terms, marks)
+    return ("..." if start > 0 else "") + snippet + ("..." if end < len(tokens) else "")
+
+
+def _filter_sql(filters, alias):
+    """Translate {field: (min, max)} into SQL conditions and parameters."""
+    conditions, params = [], []
+    for field, (low, high) in (filters or {}).items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"Cannot filter search results on '{field}'")
+        if low is not None:
+            conditions.append(f"{alias}.{field} >= %s")
+            params.append(low)
+        if high is not None:
+            conditions.append(f"{alias}.{field} <= %s")
+            params.append(high)
+    return conditions, params
+
+
+class SearchBackend:
+    """
+    Interface of search backends.
+
+    ``search()`` returns a dict with the query, paging information and a
+    ``results`` list of {"analysis", "score", "title", "snippet"} dicts, best
+    match first. Titles and snippets have matched terms highlighted.
+    """
+
+    def index(self, analyses):
+        """Add or update saved analyses in the index."""
+
+    def rebuild(self):
+        """Re-index every stored analysis. Returns the number indexed."""
+        return VideoAnalysis.objects.count()
+
+    def search(self, query, filters=None, page=1, per_page=20):
+        raise NotImplementedError
+
+    def _page(self, query, terms, page, per_page, total, hits):
+        """Build the result dict from (id, score) hits of the requested page."""
+        analyses = VideoAnalysis.objects.select_related("transcript").in_bulk([pk for pk, _ in hits])
+        results = []
+        for pk, score in hits:
+            analysis = analyses.get(pk)
+            if analysis is None:
+                continue
+            results.append({
+                "analysis": analysis,
+                "score": score,
+                "title": highlight(analysis.video_title, terms),
+                "snippet": make_snippet(analysis.caption_text, terms),
+            })
+        return {
+            "query": query,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "num_pages": max(1, math.ceil(total / per_page)),
+            "results": results,
+        }
+
+
+class SimpleSearchBackend(SearchBackend):
+    """
+    Case-insensitive substring search on titles and channel names. Works on
+    any database, but scans the table; use it where FTS5 is not available.
+    """
+
+    def search(self, query, filters=None, page=1, per_page=20):
+        terms = [term.rstrip("*") for term in parse_query(query)]
+        queryset = VideoAnalysis.objects.all()
+        for term in terms:
+            queryset = queryset.filter(Q(video_title__icontains=term) | Q(channel_name__icontains=term))
+        for field, (low, high) in (filters or {}).items():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Cannot filter search results on '{field}'")
+            if low is not None:
+                queryset = queryset.filter(**{f"{field}__gte": low})
+            if high is not None:
+                queryset = queryset.filter(**{f"{field}__lte": high})
+        if not terms:
+            return self._page(query, terms, page, per_page, 0, [])
+        total = queryset.count()
+        offset = (page - 1) * per_page
+        ids = queryset.order_by("-published_at").values_list("id", flat=True)[offset:offset + per_page]
+        return self._page(query, terms, page, per_page, total, [(pk, 0.0) for pk in ids])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    SQLite FTS5 full-text search over titles, channel names and transcripts,
+    ranked by BM25.
+
+    Titles and channels live in a small FTS table keyed by VideoAnalysis id.
+    Transcripts are indexed once per Transcript row in a contentless table
+    (the text itself stays compressed in Transcript), so snippets are cut in
+    Python from the transcripts of the requested page only.
+    """
+
+    META_TABLE = "news_analysis_search_meta"
+    TEXT_TABLE = "news_analysis_search_text"
+
+    # BM25 column weights: a title hit counts more than a channel hit.
+    META_WEIGHTS = (10.0, 5.0)
+
+    def __init__(self):
+        if connection.vendor != "sqlite":
+            raise ImproperlyConfigured("SQLiteFTSBackend needs the SQLite database backend")
+
+    def create_tables(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.META_TABLE} USING fts5("
+            " title, channel, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TEXT_TABLE} USING fts5("
+            " transcript, content = '', tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def index(self, analyses):
+        analyses = [analysis for analysis in analyses if analysis.pk]
+        if not analyses:
+            return
+        with connection.cursor() as cursor:
+            ids = [analysis.pk for analysis in analyses]
+            cursor.execute(
+                f"DELETE FROM {self.META_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(ids))})", ids
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.META_TABLE} (rowid, title, channel) VALUES (%s, %s, %s)",
+                [(analysis.pk, analysis.video_title, analysis.channel_name) for analysis in analyses],
+            )
+
+            # Transcripts never change once stored, so only new ones are indexed.
+            transcripts = {analysis.transcript_id: analysis for analysis in analyses if analysis.transcript_id}
+            if transcripts:
+                cursor.execute(
+                    f"SELECT rowid FROM {self.TEXT_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(transcripts))})",
+                    list(transcripts),
+                )
+                for (indexed,) in cursor.fetchall():
+                    del transcripts[indexed]
+                cursor.executemany(
+                    f"INSERT INTO {self.TEXT_TABLE} (rowid, transcript) VALUES (%s, %s)",
+                    [(pk, analysis.transcript.text) for pk, analysis in transcripts.items()],
+                )
+
+    def rebuild(self, batch_size=500):
+        with connection.cursor() as cursor:
+            self.create_tables(cursor)
+            cursor.execute(f"DELETE FROM {self.META_TABLE}")
+            cursor.execute(f"INSERT INTO {self.TEXT_TABLE} ({self.TEXT_TABLE}) VALUES ('delete-all')")
+        count = 0
+        batch = []
+        rows = VideoAnalysis.objects.select_related("transcript").only(
+            "id", "video_title", "channel_name", "transcript"
+        )
+        for analysis in rows.iterator(chunk_size=batch_size):
+            batch.append(analysis)
+            if len(batch) == batch_size:
+                self.index(batch)
+                count += len(batch)
+                batch = []
+        self.index(batch)
+        return count + len(batch)
+
+    def _match(self, term):
+        # Quoted so FTS5 syntax in user input is matched literally.
+        return f'"{term[:-1]}"*' if term.endswith("*") else f'"{term}"'
+
+    def _hits_sql(self, union="UNION ALL", score=True):
+        """Ids (and BM25 scores) of analyses whose metadata or transcript match %s."""
+        meta_score = f", bm25({self.META_TABLE}, {self.META_WEIGHTS[0]}, {self.META_WEIGHTS[1]}) AS score"
+        text_score = f", bm25({self.TEXT_TABLE}) AS score"
+        return (
+            f"SELECT rowid AS id{meta_score if score else ''}"
+            f" FROM {self.META_TABLE} WHERE {self.META_TABLE} MATCH %s"
+            f" {union}"
+            f" SELECT va.id{text_score if score else ''} FROM {self.TEXT_TABLE}"
+            f" JOIN {VideoAnalysis._meta.db_table} va ON va.transcript_id = {self.TEXT_TABLE}.rowid"
+            f" WHERE {self.TEXT_TABLE} MATCH %s"
+        )
+
+    def search(self, query, filters=None, page=1, per_page=20):
+        terms = parse_query(query)
+        if not terms:
+            return self._page(query, terms, page, per_page, 0, [])
+        # Every term must occur in the title, channel or transcript of a
+        # video, not necessarily all in the same one; the tables are matched
+        # per term and the results intersected. Ranking sums the BM25 scores
+        # of both tables for the query as a whole.
+        conditions, params = [], []
+        for term in dict.fromkeys(terms):
+            conditions.append(f"hits.id IN ({self._hits_sql(union='UNION', score=False)})")
+            params += [self._match(term)] * 2
+        filter_conditions, filter_params = _filter_sql(filters, "v")
+        conditions += filter_conditions
+        params += filter_params
+        any_term = " OR ".join(self._match(term) for term in terms)
+        from_sql = (
+            f" FROM ({self._hits_sql()}) hits JOIN {VideoAnalysis._meta.db_table} v ON v.id = hits.id"
+            f" WHERE {' AND '.join(conditions)}"
+        )
+        params = [any_term, any_term] + params
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(DISTINCT hits.id) {from_sql}", params)
+            total = cursor.fetchone()[0]
+            # BM25 scores are negative; lower is a better match.
+            cursor.execute(
+                f"SELECT hits.id, SUM(hits.score) AS score {from_sql}"
+                " GROUP BY hits.id ORDER BY score LIMIT %s OFFSET %s",
+                params + [per_page, (page - 1) * per_page],
+            )
+            hits = [(pk, -score) for pk, score in cursor.fetchall()]
+        return self._page(query, terms, page, per_page, total, hits)
+
+
+_backend = None
+
+
+def get_search_backend():
+    """Return the backend named by the SEARCH_BACKEND setting (a dotted class path)."""
+    global _backend
+    if _backend is None:
+        default = (
+            "news_analysis.search.SQLiteFTSBackend" if connection.vendor == "sqlite"
+            else "news_analysis.search.SimpleSearchBackend"
+        )
+        _backend = import_string(get_setting("SEARCH_BACKEND") or default)()
+    return _backend
+
+
+def search(query, filters=None, page=1, per_page=20):
+    """Search stored analyses with the configured backend. See SearchBackend."""
+    return get_search_backend().search(query, filters=filters, page=page, per_page=per_page)
@@ -0,0 +1,106 @@
+import threading
+
+from .models import VideoAnalysis
+from .utils import metrics
+from .utils.config import get_setting
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def embeddings_enabled():
+    """Whether saved analyses are embedded (EMBEDDINGS_ENABLED, or needed for duplicate reuse)."""
+    return str(get_setting("EMBEDDINGS_ENABLED", "0")) not in ("0", "False", "false") or reuse_duplicates()
+
+
+def duplicate_threshold():
+    return float(get_setting("DUPLICATE_THRESHOLD", 0.95))
+
+
+def reuse_duplicates():
+    """Whether near-duplicate transcripts reuse an existing analysis (REUSE_DUPLICATE_ANALYSES)."""
+    return str(get_setting("REUSE_DUPLICATE_ANALYSES", "0")) not in ("0", "False", "false")
+
+
+def get_vector_store():
+    """Return the process-wide VectorStore of transcript embeddings."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from .utils.vector_store import VectorStore, stored_dim
+
+                path = str(get_setting("EMBEDDING_DIR", "embeddings"))
+                dim = stored_dim(path)
+                if dim is None:
+                    # New store: the only reason to load the model here.
+                    from .utils.embeddings import get_embedder
+
+                    dim = get_embedder().dim
+                _store = VectorStore(path, dim, dtype=get_setting("EMBEDDING_DTYPE", "float32"))
+    return _store
+
+
+def embed(texts):
+    from .utils.embeddings import embed_texts
+
+    with metrics.stage_timer("embedding"):
+        return embed_texts(texts)
+
+
+def index_analyses(analyses):
+    """
+    Add saved analyses to the embedding index.
+
+    Vectors already computed for an analysis (``analysis.embedding``, set
+    when it was checked for duplicates) are reused instead of re-embedding.
+    """
+    analyses = [a for a in analyses if a.pk and a.transcript_id]
+    missing = [a for a in analyses if getattr(a, "embedding", None) is None]
+    if missing:
+        for analysis, vector in zip(missing, embed([a.caption_text for a in missing])):
+            analysis.embedding = vector
+    if analyses:
+        get_vector_store().add([a.pk for a in analyses], [a.embedding for a in analyses])
+
+
+def _with_analyses(hits):
+    analyses = VideoAnalysis.objects.in_bulk([pk for pk, _ in hits])
+    return [(analyses[pk], score) for pk, score in hits if pk in analyses]
+
+
+def find_similar(video_id=None, text=None, vector=None, k=10, min_score=0.0, nprobe=8):
+    """
+    Find the stored videos whose transcripts are most similar.
+
+    Give one of ``video_id`` (a stored video), ``text`` or an embedding
+    ``vector``.
+
+    Returns:
+        list[tuple[VideoAnalysis, float]]: Up to k (analysis, cosine
+        similarity) pairs, best first.
+    """
+    store = get_vector_store()
+    exclude = ()
+    if video_id is not None:
+        analysis = VideoAnalysis.objects.get(video_id=video_id)
+        exclude = (analysis.pk,)
+        vector = store.get(analysis.pk)
+        if vector is None:
+            text = analysis.caption_text
+    if vector is None:
+        if not text:
+            return []
+        vector = embed([text])[0]
+    hits = [hit for hit in store.search(vector, k=k, nprobe=nprobe, exclude=exclude) if hit[1] >= min_score]
+    return _with_analyses(hits)
+
+
+def find_near_duplicate(vector, threshold=None):
+    """
+    Return the stored analysis most similar to ``vector`` if its similarity
+    is at least ``threshold`` (DUPLICATE_THRESHOLD by default), else None.
+    """
+    threshold = duplicate_threshold() if threshold is None else threshold
+    matches = find_similar(vector=vector, k=1, min_score=threshold)
+    return matches[0][0] if matches else None
@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .api_cache import invalidate_all, invalidate_channels
+from .models import ChannelStats, VideoAnalysis
+
+
+def sentiment_bucket(label):
+    """Map a free-text sentiment label to "positive", "negative", "neutral" or None."""
+    label = (label or "").lower()
+    for bucket in ("positive", "negative", "neutral"):
+        if bucket in label:
+            return bucket
+    return None
+
+
+def record_analyses(analyses, sign=1):
+    """
+    Add newly written analyses to their channels' running totals.
+
+    Uses one UPDATE with F() expressions per channel, so concurrent writers
+    never lose increments. Call inside the transaction that wrote the rows.
+    With sign=-1 the analyses are subtracted instead (e.g. the old scores of
+    re-analysed rows); last_published_at is left alone then. Cached API
+    responses of the channels are invalidated once the transaction commits.
+    """
+    deltas = defaultdict(lambda: defaultdict(float))
+    latest = {}
+    for analysis in analyses:
+        delta = deltas[analysis.channel_name]
+        delta["video_count"] += sign
+        for field in ChannelStats.BIAS_FIELDS:
+            delta[f"sum_{field}"] += sign * getattr(analysis, field)
+        delta["sum_sentiment_score"] += sign * analysis.sentiment_score
+        bucket = sentiment_bucket(analysis.sentiment_label)
+        if bucket:
+            delta[f"{bucket}_count"] += sign
+        if sign > 0 and analysis.published_at and (
+            analysis.channel_name not in latest or analysis.published_at > latest[analysis.channel_name]
+        ):
+            latest[analysis.channel_name] = analysis.published_at
+
+    for channel_name, delta in deltas.items():
+        ChannelStats.objects.get_or_create(channel_name=channel_name)
+        updates = {field: F(field) + value for field, value in delta.items()}
+        if channel_name in latest:
+            published = Value(latest[channel_name])
+            updates["last_published_at"] = Greatest(Coalesce(F("last_published_at"), published), published)
+        ChannelStats.objects.filter(channel_name=channel_name).update(**updates)
+    if deltas:
+        channels = list(deltas)
+        transaction.on_commit(lambda: invalidate_channels(channels))
+
+
+def channel_aggregates(queryset=None):
+    """Aggregate VideoAnalysis rows per channel into ChannelStats field values."""
+    queryset = VideoAnalysis.objects.all() if queryset is None else queryset
+    annotations = {f"sum_{field}": Sum(field) for field in ChannelStats.BIAS_FIELDS}
+    annotations.update({
+        "video_count": Count("id"),
+        "sum_sentiment_score": Sum("sentiment_score"),
+        "positive_count": Count("id", filter=Q(sentiment_label__icontains="positive")),
+        "negative_count": Count("id", filter=Q(sentiment_label__icontains="negative")),
+        "neutral_count": Count("id", filter=Q(sentiment_label__icontains="neutral")),
+        "last_published_at": Max("published_at"),
+    })
+    return queryset.values("channel_name").annotate(**annotations).order_by()
+
+
+def rebuild_channel_stats():
+    """Recompute every channel's totals from scratch. Returns the channel count."""
+    rows = [ChannelStats(**values) for values in channel_aggregates()]
+    ChannelStats.objects.all().delete()
+    ChannelStats.objects.bulk_create(rows)
+    transaction.on_commit(invalidate_all)
+    return len(rows)
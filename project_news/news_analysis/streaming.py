@@ -0,0 +1,330 @@
+"""
+Asynchronous analysis of one or many videos, reported as it progresses.
+
+analysis_events() drives a whole batch from one event loop. Videos that are
+already stored are answered from the database. Transcripts of new videos
+are downloaded concurrently into the transcript cache, and each video is
+then queued as an AnalysisJob for the run_analysis_worker processes, which
+hold the models. Job progress is read by one JobWatcher per event loop, so
+waiting streams run no queries of their own. job_events() follows jobs
+that already exist (e.g. for a client that reconnects) without fetching or
+queueing anything.
+"""
+import asyncio
+import contextvars
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+
+from .jobs import submit_job
+from .models import AnalysisJob, VideoAnalysis
+from .pipeline import video_url_for
+from .utils import metrics
+from .utils.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+MAX_URLS = 50
+KEEPALIVE_SECONDS = 15
+NO_CAPTIONS = "No captions available for this video."
+
+SUMMARY_FIELDS = (
+    "video_id", "video_title", "channel_name", "published_at", "sentiment_label", "sentiment_score",
+    "bias_left", "bias_center", "bias_right", "bias_biased", "bias_neutral",
+)
+
+VIDEOS = metrics.counter(
+    "analysis_stream_videos_total",
+    "Videos requested through the streaming endpoint, by outcome (stored, done, failed, timeout).",
+)
+
+
+def poll_seconds():
+    return float(get_setting("ANALYSIS_STREAM_POLL_SECONDS", 1.0))
+
+
+def stream_timeout():
+    return float(get_setting("ANALYSIS_STREAM_TIMEOUT", 600))
+
+
+def fetch_concurrency():
+    return int(get_setting("ANALYSIS_STREAM_FETCHES", 8))
+
+
+def parse_video_ids(urls):
+    """
+    Video IDs of ``urls`` in order, without duplicates.
+
+    Returns:
+        tuple: (video IDs, URLs no ID could be read from).
+    """
+    from .utils.youtube_utils import extract_video_id
+
+    video_ids, invalid = [], []
+    for url in urls:
+        video_id = extract_video_id(url)
+        if video_id:
+            video_ids.append(video_id)
+        else:
+            invalid.append(url)
+    return list(dict.fromkeys(video_ids)), invalid
+
+
+# The YouTube and transcript clients block, so downloads run on their own
+# bounded pool rather than on the threads Django uses for the async ORM.
+_fetch_pool = None
+
+
+def _get_fetch_pool():
+    global _fetch_pool
+    if _fetch_pool is None:
+        _fetch_pool = ThreadPoolExecutor(max_workers=fetch_concurrency(), thread_name_prefix="stream-fetch")
+    return _fetch_pool
+
+
+async def _summaries(video_ids):
+    return {
+        row["video_id"]: row
+        async for row in VideoAnalysis.objects.filter(video_id__in=list(video_ids)).values(*SUMMARY_FIELDS)
+    }
+
+
+class JobWatcher:
+    """
+    Polls the jobs that streams are waiting on: one query per interval for
+    all of them, however many streams there are. Each status change is put
+    on the queues of the streams watching the job as ("job", job, summary);
+    summary is the analysis' SUMMARY_FIELDS once the job is done.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        # job ID -> {queue: last status that queue was given}
+        self.watching = {}
+        self.task = None
+
+    def watch(self, job, queue):
+        self.watching.setdefault(job.pk, {})[queue] = job.status
+        if self.task is None or self.task.done():
+            # Started outside the request's context: the watcher outlives the
+            # request, and asgiref would otherwise keep giving its ORM calls a
+            # thread tied to that finished request.
+            self.task = contextvars.Context().run(asyncio.get_running_loop().create_task, self._run())
+
+    def unwatch(self, job_id, queue):
+        queues = self.watching.get(job_id)
+        if queues is not None:
+            queues.pop(queue, None)
+            if not queues:
+                del self.watching[job_id]
+
+    async def _run(self):
+        while self.watching:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("Could not poll %d analysis jobs", len(self.watching))
+
+    async def poll(self):
+        job_ids = list(self.watching)
+        jobs = []
+        for start in range(0, len(job_ids), 500):
+            jobs += [
+                job async for job in AnalysisJob.objects.filter(pk__in=job_ids[start:start + 500])
+                .only("id", "video_id", "status", "error")
+            ]
+        changed = [
+            job for job in jobs
+            if any(status != job.status for status in self.watching.get(job.pk, {}).values())
+        ]
+        done = [job.video_id for job in changed if job.status == AnalysisJob.DONE]
+        summaries = await _summaries(done) if done else {}
+        for job in changed:
+            queues = self.watching.get(job.pk, {})
+            for queue, status in list(queues.items()):
+                if status != job.status:
+                    queues[queue] = job.status
+                    queue.put_nowait(("job", job, summaries.get(job.video_id)))
+
+
+_watchers = weakref.WeakKeyDictionary()
+
+
+def get_watcher():
+    """The JobWatcher of the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _watchers:
+        _watchers[loop] = JobWatcher(poll_seconds())
+    return _watchers[loop]
+
+
+def _video_event(video_id, status, **data):
+    return "video", {"video_id": video_id, "status": status, **data}
+
+
+async def _prepare(video_id, queue):
+    """
+    Download a new video's transcript into the transcript cache (so the
+    worker only runs inference), then queue its job. Videos without
+    captions fail here, without a job.
+    """
+    from .utils.transcript_cache import get_transcript_cache
+    from .utils.youtube_utils import fetch_transcript_segments
+
+    try:
+        if get_transcript_cache() is not None:
+            try:
+                segments = await asyncio.get_running_loop().run_in_executor(
+                    _get_fetch_pool(), fetch_transcript_segments, video_id
+                )
+            except Exception as e:
+                # The worker fetches (and retries) again; only a definite
+                # "no transcript" answer stops the video here.
+                logger.warning("Transcript prefetch for %s failed: %s", video_id, e)
+            else:
+                if not segments:
+                    queue.put_nowait(("prepared", video_id, None, NO_CAPTIONS))
+                    return
+        job = await sync_to_async(submit_job)(video_id, video_url_for(video_id))
+        queue.put_nowait(("prepared", video_id, job, None))
+    except Exception as e:
+        queue.put_nowait(("prepared", video_id, None, f"{type(e).__name__}: {e}"))
+
+
+async def _follow(queue, videos, counts, tasks=()):
+    """
+    Yield the events of ``videos`` until all are done or failed, then "end".
+
+    ``videos`` maps keys to video IDs. A key is the video ID itself
+    (analysis_events) or a job ID (job_events), so that two jobs of the same
+    video are followed separately. ``queue`` receives ("prepared", key, job,
+    error) items, from _prepare() or for jobs that already exist, and the
+    JobWatcher's updates.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + stream_timeout()
+    pending = set(videos)
+    watcher = get_watcher()
+    # key -> job ID, and back, for the jobs being watched
+    jobs, keys_of_jobs = {}, {}
+
+    def finish(key, video_id, status, **data):
+        pending.discard(key)
+        counts[status] += 1
+        VIDEOS.inc(outcome=status)
+        if key in jobs:
+            watcher.unwatch(jobs[key], queue)
+        return _video_event(video_id, status, **data)
+
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=min(KEEPALIVE_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield None, None
+                continue
+
+            if item[0] == "prepared":
+                _, key, job, error = item
+                video_id = videos[key]
+                if job is None:
+                    yield finish(key, video_id, "failed", error=error)
+                elif job.status == AnalysisJob.DONE:
+                    # Analysed meanwhile, e.g. by another stream's job.
+                    summary = (await _summaries([video_id])).get(video_id)
+                    yield finish(key, video_id, "done", job_id=job.pk, analysis=summary)
+                elif job.status == AnalysisJob.FAILED:
+                    yield finish(key, video_id, "failed", job_id=job.pk, error=job.error)
+                else:
+                    jobs[key], keys_of_jobs[job.pk] = job.pk, key
+                    watcher.watch(job, queue)
+                    yield _video_event(video_id, job.status, job_id=job.pk)
+                continue
+
+            _, job, summary = item
+            key = keys_of_jobs.get(job.pk)
+            if key not in pending:
+                continue
+            if job.status == AnalysisJob.DONE:
+                yield finish(key, job.video_id, "done", job_id=job.pk, analysis=summary)
+            elif job.status == AnalysisJob.FAILED:
+                yield finish(key, job.video_id, "failed", job_id=job.pk, error=job.error)
+            else:
+                yield _video_event(job.video_id, job.status, job_id=job.pk)
+    finally:
+        for task in tasks:
+            task.cancel()
+        for job_id in jobs.values():
+            watcher.unwatch(job_id, queue)
+
+    if pending:
+        VIDEOS.inc(len(pending), outcome="timeout")
+    yield "end", {
+        **counts,
+        "pending": [video_id for key, video_id in videos.items() if key in pending],
+        "pending_jobs": [jobs[key] for key in videos if key in pending and key in jobs],
+    }
+
+
+async def analysis_events(video_ids, invalid=()):
+    """
+    Analyse ``video_ids`` and yield (event, data) pairs as they progress.
+
+    Events are "accepted" (the video IDs and invalid URLs), "video" for
+    every status change of a video (stored, fetching, queued, running,
+    done, failed; done carries the analysis' SUMMARY_FIELDS, and every
+    event after "fetching" the job_id) and a final "end" with the counts.
+    (None, None) is yielded as a keep-alive when nothing happened for
+    KEEPALIVE_SECONDS. Videos still unfinished after ANALYSIS_STREAM_TIMEOUT
+    are listed as "pending" in "end", and their jobs as "pending_jobs"; the
+    jobs keep running and can be followed again with job_events().
+    """
+    loop = asyncio.get_running_loop()
+    yield "accepted", {"videos": list(video_ids), "invalid": list(invalid)}
+
+    stored = await _summaries(video_ids)
+    counts = {"stored": len(stored), "done": 0, "failed": 0}
+    for video_id in video_ids:
+        if video_id in stored:
+            VIDEOS.inc(outcome="stored")
+            yield _video_event(video_id, "stored", analysis=stored[video_id])
+
+    pending = [video_id for video_id in video_ids if video_id not in stored]
+    queue = asyncio.Queue()
+    tasks = [loop.create_task(_prepare(video_id, queue)) for video_id in pending]
+    for video_id in pending:
+        yield _video_event(video_id, "fetching")
+
+    async for event in _follow(queue, {video_id: video_id for video_id in pending}, counts, tasks):
+        yield event
+
+
+async def job_events(job_ids):
+    """
+    Follow existing AnalysisJobs; events as for analysis_events(). Nothing
+    is fetched or queued. "accepted" lists the videos of the jobs found, in
+    the order of ``job_ids`` (a video appears once per job), and the job IDs
+    that do not exist.
+    """
+    found = {
+        job.pk: job
+        async for job in AnalysisJob.objects.filter(pk__in=list(job_ids)).only("id", "video_id", "status", "error")
+    }
+    jobs = {job_id: found[job_id] for job_id in job_ids if job_id in found}
+    yield "accepted", {
+        "videos": [job.video_id for job in jobs.values()],
+        "missing": [job_id for job_id in job_ids if job_id not in found],
+    }
+
+    queue = asyncio.Queue()
+    for job_id, job in jobs.items():
+        queue.put_nowait(("prepared", job_id, job, None))
+    videos = {job_id: job.video_id for job_id, job in jobs.items()}
+    async for event in _follow(queue, videos, {"stored": 0, "done": 0, "failed": 0}):
+        yield event
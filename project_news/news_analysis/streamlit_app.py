@@ -2,16 +2,16 @@ import os
 import sys
 import django
 import streamlit as st
-from transformers import pipeline, AutoTokenizer
 from urllib.parse import urlparse, parse_qs
 import plotly.graph_objects as go
 from dotenv import load_dotenv
-import requests
 import json
+import time
 
 load_dotenv()
 
-HF_API_TOKEN = os.getenv("HF_API_TOKEN")
+# How long one script run waits on a queued job before offering a re-check
+JOB_POLL_SECONDS = int(os.getenv("JOB_POLL_SECONDS", 60))
 
 # Add the project root (one level up from the current file)
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -22,38 +22,15 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_news.settings')
 django.setup()
 
 # Now safe to import Django models and your utilities
-from news_analysis.models import VideoAnalysis
-from django.utils.dateparse import parse_datetime
-from utils.youtube_utils import fetch_video_data
-from utils.sentiment_utils import analyze_sentiment
-from utils.bias_utils import analyze_bias
-
-model_name = "meta-llama/Llama-3.3-70B-Instruct"
-
-def analyze_sentiment_with_llama(text):
-    headers = {
-        "Authorization": f"Bearer {HF_API_TOKEN}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "inputs": f"Sentiment analysis: {text}",
-        "parameters": {
-            "max_length": 50
-        }
-    }
-
-    response = requests.post(
-        f"https://api-inference.huggingface.co/models/{model_name}",
-        headers=headers,
-        json=payload
-    )
-
-    if response.status_code == 200:
-        output = response.json()[0]['generated_text']
-        return {"label": output.strip()}
-    else:
-        return {"error": f"Failed to analyze sentiment: {response.status_code}"}
+from news_analysis.models import AnalysisJob, CommentSentiment, VideoAnalysis, VideoTimeline
+from news_analysis.jobs import submit_job
+from news_analysis.search import FILTER_FIELDS, search
+from news_analysis.versioning import analysis_version
+# Imported through the news_analysis package (not the bare utils path) so the
+# Streamlit script and Django share one module, and one model registry.
+from news_analysis.utils.youtube_utils import quota_scheduler
+from news_analysis.utils import metrics, model_registry
+from news_analysis.utils.inference_cache import get_cache
 
 def extract_video_id(url):
     parsed_url = urlparse(url)
@@ -116,12 +93,196 @@ def generate_model_commentary(sentiment, bias):
         """
     return commentary
 
+def show_comment_sentiment(analysis):
+    comments = CommentSentiment.objects.filter(video=analysis).first()
+    if comments is None:
+        return
+    st.write("## Audience Reaction (Comments)")
+    if comments.error:
+        st.caption(comments.error)
+    if not comments.comment_count:
+        return
+    st.write(
+        f"**{comments.comment_count}** comments"
+        + (f" (first {comments.max_comments})" if comments.truncated else "")
+        + f": {comments.positive_count} positive, {comments.neutral_count} neutral, "
+        f"{comments.negative_count} negative. Mean score {comments.mean_score:+.2f}, "
+        f"like-weighted {comments.like_weighted_score:+.2f}."
+    )
+    bins = len(comments.score_histogram)
+    fig = go.Figure(go.Bar(
+        x=[round(-1 + (i + 0.5) * 2 / bins, 2) for i in range(bins)],
+        y=comments.score_histogram,
+    ))
+    fig.update_layout(xaxis_title="Comment sentiment score", yaxis_title="Comments", height=250,
+                      margin=dict(t=10, b=40))
+    st.plotly_chart(fig)
+
+def show_timeline(analysis):
+    timeline = VideoTimeline.objects.filter(video=analysis).first()
+    if timeline is None or not timeline.window_count:
+        return
+    st.write("## Bias & Sentiment Over Time")
+    columns = timeline.columns()
+    minutes = [start / 60 for start in columns["start"]]
+    fig = go.Figure()
+    for label in ("left", "center", "right", "biased"):
+        fig.add_trace(go.Scatter(x=minutes, y=columns[label], name=label.capitalize(), mode="lines"))
+    fig.add_trace(go.Scatter(
+        x=minutes, y=columns["sentiment"], name="Sentiment", mode="lines",
+        line={"dash": "dot", "color": "black"}, yaxis="y2",
+    ))
+    fig.update_layout(
+        xaxis_title="Minute",
+        yaxis={"title": "Bias probability", "range": [0, 1]},
+        yaxis2={"title": "Sentiment", "range": [-1, 1], "overlaying": "y", "side": "right"},
+        height=350,
+        margin=dict(t=10, b=40),
+        legend={"orientation": "h"},
+    )
+    st.plotly_chart(fig)
+    st.caption(f"{timeline.window_count} windows of {timeline.window_seconds:.0f}s")
+
+def show_analysis(analysis):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("## Video Information")
+        st.write(f"**Title:** {analysis.video_title}")
+        st.write(f"**Video ID:** {analysis.video_id}")
+        st.write(f"**Channel:** {analysis.channel_name}")
+        st.write(f"**Published At:** {analysis.published_at}")
+        st.write(f"**Views:** {analysis.view_count}")
+
+    with col2:
+        st.write("## Sentiment Analysis")
+        sentiment = {
+            "label": analysis.sentiment_label,
+            "score": round(analysis.sentiment_score, 3),
+        }
+        st.write(sentiment)
+
+    show_comment_sentiment(analysis)
+
+    st.write("## Caption Text (Preview)")
+    st.write(analysis.caption_preview(500))
+
+    st.write("## Bias Score")
+    bias = {
+        "left": analysis.bias_left,
+        "center": analysis.bias_center,
+        "right": analysis.bias_right,
+        "biased": analysis.bias_biased,
+        "neutral": analysis.bias_neutral,
+    }
+    st.write(f"**Left:** {round(bias['left'] * 100, 2)}%")
+    st.write(f"**Center:** {round(bias['center'] * 100, 2)}%")
+    st.write(f"**Right:** {round(bias['right'] * 100, 2)}%")
+    st.write(f"**Biased:** {round(bias['biased'] * 100, 2)}%")
+    st.write(f"**Neutral:** {round(bias['neutral'] * 100, 2)}%")
+
+    bias_score = round((bias['right'] - bias['left']) * 100, 2)
+    fig = plot_bias_gauge(bias_score)
+    st.plotly_chart(fig)
+
+    show_timeline(analysis)
+
+    with st.expander(" Model Interpretation & Suggestions"):
+        commentary = generate_model_commentary(sentiment, bias)
+        st.markdown(commentary)
+
+def show_job(job_id):
+    """Poll a queued analysis job and render its result once a worker finishes it."""
+    job = AnalysisJob.objects.get(pk=job_id)
+    deadline = time.monotonic() + JOB_POLL_SECONDS
+    with st.spinner(f"Job #{job.pk} is {job.status}. Results appear here when a worker finishes."):
+        while job.status in AnalysisJob.ACTIVE_STATUSES and time.monotonic() < deadline:
+            time.sleep(1)
+            job.refresh_from_db()
+
+    if job.status == AnalysisJob.DONE:
+        del st.session_state["job_id"]
+        analysis = VideoAnalysis.objects.filter(video_id=job.video_id).first()
+        if analysis:
+            st.success("Analysis complete.")
+            show_analysis(analysis)
+        else:
+            st.error("The job finished but its analysis was not found.")
+    elif job.status == AnalysisJob.FAILED:
+        del st.session_state["job_id"]
+        st.error(f"Analysis failed: {job.error}")
+    else:
+        st.info(
+            f"Job #{job.pk} is still {job.status}. Make sure a worker is running "
+            "(python manage.py run_analysis_worker)."
+        )
+        st.button("Check again")
+
+def show_search():
+    query = st.text_input("Search titles, channels and transcripts:")
+
+    filters = {}
+    with st.expander("Filters"):
+        for field in FILTER_FIELDS:
+            # Bias scores are probabilities; sentiment_score is a polarity in [-1, 1].
+            bounds = (-1.0, 1.0) if field == "sentiment_score" else (0.0, 1.0)
+            low, high = st.slider(field.replace("_", " ").title(), *bounds, bounds, 0.05)
+            if (low, high) != bounds:
+                filters[field] = (low, high)
+
+    if not query:
+        return
+
+    page = st.number_input("Page", min_value=1, value=1, step=1)
+    started = time.perf_counter()
+    results = search(query, filters=filters, page=page, per_page=10)
+    st.caption(
+        f"{results['total']} results in {(time.perf_counter() - started) * 1000:.0f} ms "
+        f"(page {results['page']} of {results['num_pages']})"
+    )
+
+    for result in results["results"]:
+        analysis = result["analysis"]
+        st.markdown(f"### {result['title']}")
+        st.caption(f"{analysis.channel_name} · {analysis.published_at:%Y-%m-%d} · {analysis.video_url}")
+        st.markdown(result["snippet"])
+        if st.button("Show analysis", key=f"show-{analysis.pk}"):
+            show_analysis(analysis)
+
+def show_metrics():
+    """Stage timings and counters summed over all processes (see /metrics)."""
+    timings, counters = metrics.summary(metrics.collect())
+    st.caption("Timings (ms; p50/p95 estimated from histogram buckets)")
+    st.dataframe(timings, hide_index=True)
+    st.caption("Counters")
+    st.dataframe(counters, hide_index=True)
+
 def main():
     st.title(" YouTube Video Bias & Sentiment Analyzer")
 
     with st.sidebar:
         analysis_type = st.selectbox("Select Analysis Type", ["Analyze Video", "Database Search"])
 
+        with st.expander("Models"):
+            col1, col2 = st.columns(2)
+            if col1.button("Warm up"):
+                with st.spinner("Loading models..."):
+                    model_registry.warmup()
+            if col2.button("Unload"):
+                model_registry.unload()
+            st.json(model_registry.memory_usage())
+
+        cache = get_cache()
+        if cache is not None:
+            with st.expander("Inference cache"):
+                st.json(cache.stats())
+
+        with st.expander("YouTube API quota"):
+            st.json(quota_scheduler.usage_stats())
+
+        with st.expander("Metrics"):
+            show_metrics()
+
     if analysis_type == "Analyze Video":
         video_url = st.text_input("Enter YouTube Video URL:")
 
@@ -138,118 +299,24 @@ def main():
             try:
                 existing_analysis = VideoAnalysis.objects.get(video_id=video_id)
                 st.success("Found existing analysis in database. Displaying saved results:")
-
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    st.write("## Video Information")
-                    st.write(f"**Title:** {existing_analysis.video_title}")
-                    st.write(f"**Video ID:** {existing_analysis.video_id}")
-                    st.write(f"**Channel:** {existing_analysis.channel_name}")
-                    st.write(f"**Published At:** {existing_analysis.published_at}")
-                    st.write(f"**Views:** {existing_analysis.view_count}")
-
-                with col2:
-                    st.write("## Sentiment Analysis")
-                    sentiment = {
-                        "label": existing_analysis.sentiment_label,
-                    }
-                    st.write(sentiment)
-
-                st.write("## Caption Text (Preview)")
-                st.write(existing_analysis.caption_text[:500] + "...")
-
-                st.write("## Bias Score")
-                bias = {
-                    "left": existing_analysis.bias_left,
-                    "center": existing_analysis.bias_center,
-                    "right": existing_analysis.bias_right,
-                    "biased": existing_analysis.bias_biased,
-                    "neutral": existing_analysis.bias_neutral,
-                }
-                st.write(f"**Left:** {round(bias['left'] * 100, 2)}%")
-                st.write(f"**Center:** {round(bias['center'] * 100, 2)}%")
-                st.write(f"**Right:** {round(bias['right'] * 100, 2)}%")
-                st.write(f"**Biased:** {round(bias['biased'] * 100, 2)}%")
-                st.write(f"**Neutral:** {round(bias['neutral'] * 100, 2)}%")
-
-                bias_score = round((bias['right'] - bias['left']) * 100, 2)
-                fig = plot_bias_gauge(bias_score)
-                st.plotly_chart(fig)
-
-                with st.expander(" Model Interpretation & Suggestions"):
-                    commentary = generate_model_commentary(sentiment, bias)
-                    st.markdown(commentary)
+                if existing_analysis.analysis_version != analysis_version():
+                    st.info(
+                        "This video was scored with an older model configuration; "
+                        "it is refreshed by `python manage.py reanalyze`."
+                    )
+                show_analysis(existing_analysis)
 
             except VideoAnalysis.DoesNotExist:
-                st.info("No existing analysis found. Fetching video data...")
-
-                video_data = fetch_video_data(video_url)
-
-                if not video_data:
-                    st.error("Failed to fetch video data. Please check the URL and try again.")
-                    return
-
-                metadata = video_data.get("metadata", {})
-                transcript = video_data.get("transcript")
-
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    st.write("## Video Information")
-                    st.write(f"**Title:** {metadata.get('title', 'N/A')}")
-                    st.write(f"**Video ID:** {video_id}")
-                    st.write(f"**Channel:** {metadata.get('channel_title', 'N/A')}")
-                    st.write(f"**Published At:** {metadata.get('published_at', 'N/A')}")
-                    st.write(f"**Views:** {metadata.get('view_count', 'N/A')}")
-
-                with col2:
-                    if transcript:
-                        st.write("## Sentiment Analysis")
-                        sentiment = analyze_sentiment_with_llama(transcript)
-                        st.write(sentiment)
-
-                if transcript:
-                    st.write("## Caption Text (Preview)")
-                    st.write(transcript[:500] + "...")
-
-                    bias = analyze_bias(transcript)
-                    st.write("## Bias Score")
-                    st.write(f"**Left:** {round(bias['left'] * 100, 2)}%")
-                    st.write(f"**Center:** {round(bias['center'] * 100, 2)}%")
-                    st.write(f"**Right:** {round(bias['right'] * 100, 2)}%")
-                    st.write(f"**Biased:** {round(bias['biased'] * 100, 2)}%")
-                    st.write(f"**Neutral:** {round(bias['neutral'] * 100, 2)}%")
-
-                    bias_score = round((bias['right'] - bias['left']) * 100, 2)
-                    fig = plot_bias_gauge(bias_score)
-                    st.plotly_chart(fig)
-
-                    with st.expander(" Model Interpretation & Suggestions"):
-                        commentary = generate_model_commentary(sentiment, bias)
-                        st.markdown(commentary)
-
-                    try:
-                        VideoAnalysis.objects.create(
-                            video_title=metadata.get("title", "Untitled"),
-                            video_id=video_id,
-                            video_url=video_url,
-                            channel_name=metadata.get("channel_title", "Unknown Channel"),
-                            published_at=parse_datetime(metadata.get("published_at")),
-                            view_count=metadata.get("view_count", 0),
-                            caption_text=transcript,
-                            sentiment_label=sentiment.get("label", ""),
-                            bias_left=bias["left"],
-                            bias_center=bias["center"],
-                            bias_right=bias["right"],
-                            bias_biased=bias["biased"],
-                            bias_neutral=bias["neutral"],
-                        )
-                        st.success("Analysis results saved to database.")
-                    except Exception as e:
-                        st.error(f"Failed to save results to database: {e}")
-                else:
-                    st.warning("No captions available for this video.")
+                job = submit_job(video_id, video_url)
+                st.session_state["job_id"] = job.pk
+                st.info(f"No existing analysis found. Queued as job #{job.pk}.")
+
+        job_id = st.session_state.get("job_id")
+        if job_id:
+            show_job(job_id)
+
+    elif analysis_type == "Database Search":
+        show_search()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
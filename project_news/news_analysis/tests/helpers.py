@@ -0,0 +1,29 @@
+from news_analysis.pipeline import build_analysis
+
+BIAS = {"left": 0.1, "center": 0.6, "right": 0.3, "biased": 0.2, "neutral": 0.8}
+
+
+def make_analysis(video_id, channel="Channel A", published_at="2024-05-01T12:00:00Z",
+                  sentiment=None, bias=None):
+    """An unsaved VideoAnalysis with fixed scores and analysis version "v1"."""
+    return build_analysis(
+        video_id, f"https://www.youtube.com/watch?v={video_id}",
+        {"title": f"Video {video_id}", "channel_title": channel, "published_at": published_at},
+        f"transcript of {video_id}",
+        sentiment or {"label": "POSITIVE", "score": 0.5},
+        bias or BIAS,
+        version="v1",
+    )
+
+
+class FakeClock:
+    """A clock for time-dependent code; sleep() advances it instead of blocking."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
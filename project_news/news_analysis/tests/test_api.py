@@ -0,0 +1,84 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from news_analysis.api_cache import CACHE_ALIAS
+from news_analysis.models import VideoAnalysis
+from news_analysis.pipeline import save_analyses
+
+from .helpers import make_analysis
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    CACHE_ALIAS: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "api-tests"},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, API_MAX_AGE=0)
+class ApiTests(TestCase):
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+
+    def save(self, analyses):
+        with self.captureOnCommitCallbacks(execute=True):
+            return save_analyses(analyses)
+
+    def test_cursor_pagination_visits_every_video_once(self):
+        # Two videos share a published_at, so the cursor has to break the tie by ID.
+        self.save([
+            make_analysis(f"video{i:02d}", published_at=f"2024-05-{1 + i // 2:02d}T12:00:00Z")
+            for i in range(7)
+        ])
+        seen, url = [], "/api/videos/?limit=3&fields=video_id"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertLessEqual(len(data["results"]), 3)
+            seen += [row["video_id"] for row in data["results"]]
+            url = data["next"]
+        expected = list(
+            VideoAnalysis.objects.order_by("-published_at", "-id").values_list("video_id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 7)
+
+    def test_invalid_parameters(self):
+        for query in ("cursor=bogus", "since=2024-02-30", "limit=x", "fields=nope"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/api/videos/?{query}").status_code, 400)
+
+    def test_etag_changes_when_analyses_are_recorded(self):
+        self.save([make_analysis("video01"), make_analysis("other01", channel="Channel B")])
+        first = self.client.get("/api/videos/")
+        channel_b = self.client.get("/api/channels/Channel B/")
+        detail = self.client.get("/api/videos/video01/")
+        for response in (first, channel_b, detail):
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get("/api/videos/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/videos/video01/", HTTP_IF_NONE_MATCH=detail["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        self.save([make_analysis("video02", published_at="2024-06-01T12:00:00Z")])
+
+        response = self.client.get("/api/videos/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(response.json()["results"][0]["video_id"], "video02")
+        self.assertEqual(
+            self.client.get("/api/videos/video01/", HTTP_IF_NONE_MATCH=detail["ETag"]).status_code, 200
+        )
+        # Other channels keep their versions.
+        self.assertEqual(
+            self.client.get("/api/channels/Channel B/", HTTP_IF_NONE_MATCH=channel_b["ETag"]).status_code, 304
+        )
+
+    @override_settings(API_CACHE_SECONDS=0)
+    def test_etag_does_not_expire_with_cached_bodies(self):
+        self.save([make_analysis("video01")])
+        first = self.client.get("/api/channels/")
+        self.assertEqual(self.client.get("/api/channels/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        # The API uses its own cache alias.
+        caches["default"].clear()
+        self.assertEqual(self.client.get("/api/channels/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
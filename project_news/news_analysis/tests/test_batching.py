@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from news_analysis.utils.batching import MicroBatcher, percentile
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_concurrent_calls_are_coalesced(self):
+        batches = []
+        batcher = MicroBatcher(lambda items: batches.append(items) or [item * 2 for item in items],
+                               max_batch_size=8, max_wait=0.2)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda item: batcher.submit(item).result(timeout=5), range(6)))
+        self.assertEqual(results, [0, 2, 4, 6, 8, 10])
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batcher.stats()["requests"], 6)
+        self.assertEqual(batcher.stats()["batches"], 1)
+
+    def test_batches_are_capped_and_keep_order(self):
+        sizes = []
+        release = threading.Event()
+
+        def double(items):
+            release.wait(5)
+            sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(double, max_batch_size=3, max_wait=0.2)
+        futures = batcher.submit_many(range(7))
+        release.set()
+        self.assertEqual([future.result(timeout=5) for future in futures], [0, 2, 4, 6, 8, 10, 12])
+        self.assertEqual(sizes, [3, 3, 1])
+
+    def test_a_failed_batch_fails_its_callers_only(self):
+        def batch_fn(items):
+            if "bad" in items:
+                raise ValueError("bad input")
+            return items
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait=0.2)
+        failed = batcher.submit_many(["ok", "bad"])
+        for future in failed:
+            with self.assertRaisesMessage(ValueError, "bad input"):
+                future.result(timeout=5)
+        self.assertEqual(batcher.submit("fine").result(timeout=5), "fine")
+
+    def test_percentile(self):
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 50), 3)
+        self.assertEqual(percentile(list(range(1, 101)), 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
@@ -0,0 +1,59 @@
+import re
+from functools import partial
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from news_analysis.utils import bias_utils
+from news_analysis.utils.bias_utils import _sample_evenly, chunk_text
+
+
+def whitespace_tokenizer(text, **kwargs):
+    """Stands in for a fast tokenizer: one token per word, with character offsets."""
+    return {"offset_mapping": [match.span() for match in re.finditer(r"\S+", text)]}
+
+
+class ChunkTextTests(SimpleTestCase):
+    def test_overlapping_windows_keep_the_source_text(self):
+        text = "one two  three four five six seven"
+        self.assertEqual(chunk_text(text, whitespace_tokenizer, max_tokens=3, overlap=1), [
+            ("one two  three", 3), ("three four five", 3), ("five six seven", 3),
+        ])
+
+    def test_last_window_may_be_shorter(self):
+        self.assertEqual(chunk_text("a b c d", whitespace_tokenizer, max_tokens=3, overlap=1), [
+            ("a b c", 3), ("c d", 2),
+        ])
+
+    def test_short_and_empty_texts(self):
+        self.assertEqual(chunk_text("a b", whitespace_tokenizer, max_tokens=3, overlap=1), [("a b", 2)])
+        self.assertEqual(chunk_text("  \n", whitespace_tokenizer), [])
+
+    def test_overlap_must_be_smaller_than_the_window(self):
+        with self.assertRaises(ValueError):
+            chunk_text("a b c", whitespace_tokenizer, max_tokens=2, overlap=2)
+
+    def test_sample_evenly(self):
+        chunks = list(range(10))
+        self.assertEqual(_sample_evenly(chunks, 5), [0, 2, 4, 6, 8])
+        self.assertEqual(_sample_evenly(chunks, 3), [0, 3, 6])
+        self.assertEqual(_sample_evenly(chunks, 10), chunks)
+        self.assertEqual(_sample_evenly(chunks, 0), chunks)
+
+
+class ScoreDocumentsTests(SimpleTestCase):
+    def test_window_scores_are_weighted_by_token_count(self):
+        def logits(chunks, labels, batch_size, backend=None):
+            # Windows mentioning "left" are certain about it, the others are split evenly.
+            return [{"left": 50.0 if "left" in chunk else 0.0, "right": 0.0} for chunk in chunks]
+
+        classifier = SimpleNamespace(tokenizer=whitespace_tokenizer)
+        with mock.patch.object(bias_utils, "get_classifier", return_value=classifier), \
+                mock.patch.object(bias_utils, "_chunk_entailment_logits", side_effect=logits), \
+                mock.patch.object(bias_utils, "chunk_text", partial(chunk_text, max_tokens=3, overlap=0)):
+            # Windows: "left x y" (3 tokens, all left) and "z w" (2 tokens, even).
+            scores, empty = bias_utils._score_documents(["left x y z w", ""], ["left", "right"], 16)
+        self.assertAlmostEqual(scores["left"], (3 * 1.0 + 2 * 0.5) / 5)
+        self.assertAlmostEqual(scores["right"], (2 * 0.5) / 5)
+        self.assertEqual(empty, {"left": 0.0, "right": 0.0})
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from news_analysis.comments import CommentAggregate, analyze_comments
+from news_analysis.models import CommentSentiment
+from news_analysis.utils import sentiment_utils, youtube_utils
+
+from .helpers import make_analysis
+
+
+class CommentAggregateTests(SimpleTestCase):
+    def test_statistics(self):
+        aggregate = CommentAggregate(bins=4)
+        aggregate.add(
+            [{"like_count": 3}, {}, {"like_count": 0}, {"like_count": 1}],
+            [
+                {"label": "POSITIVE", "score": 1.0},
+                {"label": "NEGATIVE", "score": -1.0},
+                {"label": "NEUTRAL", "score": 0.0},
+                {"label": "POSITIVE", "score": 0.4},
+            ],
+        )
+        self.assertEqual(aggregate.count, 4)
+        self.assertEqual(aggregate.labels, {"POSITIVE": 2, "NEUTRAL": 1, "NEGATIVE": 1})
+        self.assertEqual(aggregate.histogram, [1, 0, 2, 1])
+        self.assertAlmostEqual(aggregate.mean, 0.1)
+        self.assertAlmostEqual(aggregate.stddev, (2.16 / 4 - 0.01) ** 0.5)
+        # Weights are 1 + likes: 4, 1, 1, 2.
+        self.assertAlmostEqual(aggregate.like_weighted_mean, (4 - 1 + 0 + 0.8) / 8)
+
+    def test_empty(self):
+        aggregate = CommentAggregate()
+        self.assertEqual((aggregate.mean, aggregate.stddev, aggregate.like_weighted_mean), (0.0, 0.0, 0.0))
+
+
+def score_by_text(texts, batch_size=None):
+    return [{"label": "POSITIVE" if "good" in text else "NEGATIVE", "score": 1.0 if "good" in text else -1.0}
+            for text in texts]
+
+
+class AnalyzeCommentsTests(TestCase):
+    def setUp(self):
+        self.analysis = make_analysis("video01")
+        self.analysis.save()
+        patcher = mock.patch.object(sentiment_utils, "score_short_texts", side_effect=score_by_text)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stores_the_distribution(self):
+        comments = [{"text": "good", "like_count": 1}, {"text": "bad", "like_count": 0}, {"text": "good"}]
+        with mock.patch.object(youtube_utils, "iter_comments", return_value=iter(comments)) as read:
+            result = analyze_comments(self.analysis, limit=3, batch_size=2)
+        read.assert_called_once_with("video01", max_comments=3)
+        self.assertEqual((result.comment_count, result.positive_count, result.negative_count), (3, 2, 1))
+        self.assertTrue(result.truncated)
+        self.assertEqual(result.error, "")
+
+    def test_a_failed_read_keeps_what_was_scored(self):
+        def comments():
+            yield {"text": "good"}
+            raise RuntimeError("quota exhausted")
+
+        with mock.patch.object(youtube_utils, "iter_comments", return_value=comments()):
+            analyze_comments(self.analysis, limit=10, batch_size=1)
+        stored = CommentSentiment.objects.get(video=self.analysis)
+        self.assertEqual((stored.comment_count, stored.truncated), (1, False))
+        self.assertEqual(stored.error, "RuntimeError: quota exhausted")
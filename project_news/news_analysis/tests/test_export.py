@@ -0,0 +1,51 @@
+import csv
+import io
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from news_analysis.export import DEFAULT_COLUMNS, parse_columns, parse_date_filter
+from news_analysis.pipeline import save_analyses
+
+from .helpers import make_analysis
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        staff = get_user_model().objects.create_superuser("staff", password="pw")
+        self.client.force_login(staff)
+
+    def test_parse_columns(self):
+        self.assertEqual(parse_columns(""), DEFAULT_COLUMNS)
+        self.assertEqual(parse_columns(" video_id, caption_text "), ["video_id", "caption_text"])
+        with self.assertRaisesMessage(ValueError, "Unknown export columns: transcript, nope"):
+            parse_columns("video_id,transcript,nope")
+
+    def test_parse_date_filter(self):
+        self.assertIsNone(parse_date_filter(""))
+        self.assertIsNone(parse_date_filter(None))
+        self.assertEqual(parse_date_filter("2024-02-29"), date(2024, 2, 29))
+        for value in ("2024-02-30", "2024-13-01", "yesterday", "01/02/2024"):
+            with self.subTest(value=value), self.assertRaisesMessage(ValueError, f"Invalid date '{value}'"):
+                parse_date_filter(value)
+
+    def test_view_rejects_bad_parameters(self):
+        for query in ("format=xml", "columns=nope", "since=2024-02-30", "until=soon"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/export/?{query}").status_code, 400)
+        response = self.client.get("/export/?format=jsonl&columns=video_id&since=2024-01-01")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_admin_action_streams_selected_rows(self):
+        saved = save_analyses([make_analysis("video01"), make_analysis("video02"), make_analysis("video03")])
+        response = self.client.post("/admin/news_analysis/videoanalysis/", {
+            "action": "export_csv",
+            "_selected_action": [saved[0].pk, saved[2].pk],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([row["video_id"] for row in rows], ["video01", "video03"])
+        self.assertEqual(list(rows[0]), DEFAULT_COLUMNS)
@@ -0,0 +1,54 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from news_analysis.utils import youtube_utils
+from news_analysis.utils.youtube_utils import fetch_video_data
+
+METADATA = {"title": "A video", "channel_title": "A channel", "published_at": "2024-05-01T12:00:00Z"}
+SEGMENTS = [{"text": "hello", "start": 0.0, "duration": 1.0}, {"text": "world", "start": 1.0, "duration": 1.0}]
+
+
+def slow(value, seconds=0.2):
+    def call(video_id):
+        time.sleep(seconds)
+        return value
+    return call
+
+
+class FetchVideoDataTests(SimpleTestCase):
+    def patch(self, **calls):
+        for name, func in calls.items():
+            patcher = mock.patch.object(youtube_utils, name, side_effect=func)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_calls_run_concurrently(self):
+        self.patch(fetch_video_metadata=slow(METADATA), _fetch_segments=slow(SEGMENTS))
+        started = time.monotonic()
+        data = fetch_video_data("https://www.youtube.com/watch?v=abcdefghijk")
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(data["video_id"], "abcdefghijk")
+        self.assertEqual(data["metadata"], METADATA)
+        self.assertEqual(data["segments"], SEGMENTS)
+        self.assertEqual(data["transcript"], "hello world")
+        self.assertEqual(data["errors"], {})
+
+    def test_a_timed_out_call_leaves_its_field_empty(self):
+        self.patch(fetch_video_metadata=slow(METADATA, 0), _fetch_segments=slow(SEGMENTS, 0.5))
+        with mock.patch.object(youtube_utils, "TRANSCRIPT_TIMEOUT", 0.05), \
+                self.assertLogs(youtube_utils.logger, "WARNING"):
+            data = fetch_video_data("https://youtu.be/abcdefghijk")
+        self.assertEqual(data["errors"], {"transcript": "timed out"})
+        self.assertIsNone(data["transcript"])
+        self.assertEqual(data["metadata"], METADATA)
+
+    def test_known_metadata_is_not_fetched_again(self):
+        self.patch(fetch_video_metadata=self.fail, _fetch_segments=slow(SEGMENTS, 0))
+        data = fetch_video_data("https://youtu.be/abcdefghijk", metadata=METADATA)
+        self.assertEqual(data["metadata"], METADATA)
+
+    def test_invalid_url(self):
+        with self.assertLogs(youtube_utils.logger, "WARNING"):
+            self.assertIsNone(fetch_video_data("https://example.com/"))
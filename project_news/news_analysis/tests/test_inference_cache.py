@@ -0,0 +1,60 @@
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from news_analysis.utils import inference_cache
+from news_analysis.utils.inference_cache import InferenceCache, make_key
+
+
+class MakeKeyTests(SimpleTestCase):
+    def test_trivially_different_copies_share_a_key(self):
+        self.assertEqual(make_key("Hello  world\n", "m"), make_key("Hello world", "m"))
+        # NFKC folds the full-width letters.
+        self.assertEqual(make_key("Ｈello world", "m"), make_key("Hello world", "m"))
+
+    def test_labels_are_order_insensitive(self):
+        self.assertEqual(make_key("t", "m", labels=["a", "b"]), make_key("t", "m", labels=["b", "a"]))
+
+    def test_everything_that_changes_the_output_changes_the_key(self):
+        key = make_key("t", "m", labels=["a"], params={"chunk_tokens": 400})
+        for other in (
+            make_key("u", "m", labels=["a"], params={"chunk_tokens": 400}),
+            make_key("t", "n", labels=["a"], params={"chunk_tokens": 400}),
+            make_key("t", "m", labels=["a", "b"], params={"chunk_tokens": 400}),
+            make_key("t", "m", labels=["a"], params={"chunk_tokens": 200}),
+        ):
+            self.assertNotEqual(key, other)
+
+
+class InferenceCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.now = 1000.0
+        clock = mock.patch.object(inference_cache, "time", SimpleNamespace(time=lambda: self.now))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.cache = InferenceCache(f"{directory.name}/cache.sqlite3", max_entries=2)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set_many({"a": {"left": 0.5}, "b": [1, 2]}, model="m")
+        self.assertEqual(self.cache.get("a"), {"left": 0.5})
+        self.assertEqual(self.cache.get_many(["a", "b", "c", "a"]), {"a": {"left": 0.5}, "b": [1, 2]})
+        self.assertEqual(self.cache.get_or_compute("b", self.fail), [1, 2])
+        self.assertEqual(self.cache.stats()["hits"], 4)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_evicts_the_least_recently_used_entries(self):
+        self.cache.set("a", 1)
+        self.now += 1
+        self.cache.set("b", 2)
+        self.now += 1
+        self.cache.get("a")
+        self.now += 1
+        self.cache.set("c", 3)
+        self.cache.evict()
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+        self.assertEqual(self.cache.stats()["entries"], 2)
@@ -0,0 +1,81 @@
+import io
+import json
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from news_analysis.management.commands import ingest
+from news_analysis.models import ChannelStats, VideoAnalysis
+from news_analysis.utils import youtube_utils
+from news_analysis.utils.youtube_quota import QuotaScheduler
+
+from .helpers import BIAS
+
+
+def fake_fetch(video_url, metadata=None):
+    video_id = youtube_utils.extract_video_id(video_url)
+    if not video_id.startswith("nometa"):
+        metadata = {"title": f"Video {video_id}", "channel_title": "Channel A",
+                    "published_at": "2024-05-01T12:00:00Z"}
+    segments = [{"text": f"transcript of {video_id}", "start": 0.0, "duration": 5.0}]
+    return {"video_id": video_id, "metadata": metadata, "segments": segments,
+            "transcript": segments[0]["text"], "errors": {}}
+
+
+@override_settings(TIMELINE_ENABLED=False, COMMENT_ANALYSIS_ENABLED=False)
+class IngestTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.state_file = f"{directory.name}/state.json"
+        self.urls_file = f"{directory.name}/urls.txt"
+        patches = [
+            mock.patch.object(youtube_utils, "fetch_video_data", side_effect=fake_fetch),
+            mock.patch.object(youtube_utils, "quota_scheduler", QuotaScheduler(["key"])),
+            mock.patch("news_analysis.utils.sentiment_utils.score_sentiment",
+                       return_value={"label": "POSITIVE", "score": 0.5}),
+            mock.patch("news_analysis.utils.bias_utils.analyze_bias_many",
+                       side_effect=lambda texts: [BIAS] * len(texts)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def ingest(self, *video_ids):
+        with open(self.urls_file, "w") as f:
+            f.write("".join(f"https://youtu.be/{video_id}\n" for video_id in video_ids))
+        call_command("ingest", urls_file=self.urls_file, state_file=self.state_file,
+                     workers=2, batch_size=2, stdout=io.StringIO(), stderr=io.StringIO())
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def test_videos_without_metadata_are_failed_not_stored(self):
+        # The batched lookup fails, so each video is looked up on its own.
+        with mock.patch.object(youtube_utils, "fetch_video_metadata_many", side_effect=RuntimeError("HTTP 500")):
+            state = self.ingest("video000001", "nometa00001", "video000002")
+        self.assertEqual(sorted(VideoAnalysis.objects.values_list("video_id", flat=True)),
+                         ["video000001", "video000002"])
+        self.assertEqual(state["failed"], {"nometa00001": "video details could not be fetched"})
+        self.assertEqual(ChannelStats.objects.get().video_count, 2)
+
+    def test_videos_missing_from_videos_list_are_failed(self):
+        with mock.patch.object(youtube_utils, "fetch_video_metadata_many",
+                               return_value={"video000001": {"title": "Known"}}) as lookup:
+            state = self.ingest("video000001", "gone0000001")
+        lookup.assert_called_once_with(["video000001", "gone0000001"])
+        self.assertEqual(list(VideoAnalysis.objects.values_list("video_id", flat=True)), ["video000001"])
+        self.assertIn("gone0000001", state["failed"])
+
+    @override_settings(COMMENT_ANALYSIS_ENABLED=True)
+    def test_comments_are_analysed_when_enabled(self):
+        with mock.patch.object(youtube_utils, "fetch_video_metadata_many", side_effect=RuntimeError("HTTP 500")), \
+                mock.patch.object(ingest, "analyze_comments") as analyze_comments:
+            analyze_comments.side_effect = [None, RuntimeError("comments disabled")]
+            state = self.ingest("video000001", "video000002")
+        self.assertEqual(sorted(call.args[0].video_id for call in analyze_comments.call_args_list),
+                         ["video000001", "video000002"])
+        # A comment failure does not fail the video.
+        self.assertEqual(state["failed"], {})
+        self.assertEqual(VideoAnalysis.objects.count(), 2)
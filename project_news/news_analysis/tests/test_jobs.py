@@ -0,0 +1,100 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from news_analysis import jobs
+from news_analysis.jobs import claim_next_job, heartbeat, requeue_stale_jobs, run_job, submit_job
+from news_analysis.models import AnalysisJob
+
+from .helpers import make_analysis
+
+
+def submit(video_id):
+    return submit_job(video_id, f"https://www.youtube.com/watch?v={video_id}")
+
+
+class SubmitJobTests(TestCase):
+    def test_repeated_submissions_share_one_job(self):
+        job = submit("video01")
+        self.assertEqual(submit("video01").pk, job.pk)
+        self.assertEqual(AnalysisJob.objects.count(), 1)
+
+    def test_at_most_one_active_job_per_video(self):
+        submit("video01")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AnalysisJob.objects.create(video_id="video01", video_url="https://youtu.be/video01")
+        # Finished jobs do not count.
+        AnalysisJob.objects.create(video_id="video01", video_url="https://youtu.be/video01",
+                                   status=AnalysisJob.FAILED)
+
+    def test_failed_jobs_are_replaced(self):
+        job = submit("video01")
+        AnalysisJob.objects.filter(pk=job.pk).update(status=AnalysisJob.FAILED)
+        self.assertNotEqual(submit("video01").pk, job.pk)
+
+    def test_videos_already_stored_get_a_finished_job(self):
+        analysis = make_analysis("video01")
+        analysis.save()
+        self.assertEqual(submit("video01").status, AnalysisJob.DONE)
+
+
+@override_settings(ANALYSIS_JOB_HEARTBEAT_SECONDS=3600)
+class WorkerTests(TestCase):
+    def test_claims_the_oldest_queued_job_once(self):
+        first, second = submit("video01"), submit("video02")
+        job = claim_next_job("worker-a")
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual((job.status, job.worker, job.attempts), (AnalysisJob.RUNNING, "worker-a", 1))
+        self.assertIsNotNone(job.heartbeat_at)
+        self.assertEqual(claim_next_job("worker-b").pk, second.pk)
+        self.assertIsNone(claim_next_job("worker-c"))
+
+    def test_requeues_only_jobs_without_a_recent_heartbeat(self):
+        long_ago = timezone.now() - timedelta(hours=2)
+        healthy, dead, exhausted = submit("video01"), submit("video02"), submit("video03")
+        AnalysisJob.objects.update(status=AnalysisJob.RUNNING, started_at=long_ago, attempts=1)
+        AnalysisJob.objects.filter(pk=healthy.pk).update(heartbeat_at=timezone.now())
+        AnalysisJob.objects.filter(pk__in=[dead.pk, exhausted.pk]).update(heartbeat_at=long_ago)
+        AnalysisJob.objects.filter(pk=exhausted.pk).update(attempts=3)
+
+        self.assertEqual(requeue_stale_jobs(timedelta(minutes=5)), 1)
+        statuses = dict(AnalysisJob.objects.values_list("video_id", "status"))
+        self.assertEqual(statuses, {
+            "video01": AnalysisJob.RUNNING, "video02": AnalysisJob.QUEUED, "video03": AnalysisJob.FAILED,
+        })
+
+    def test_run_job_records_the_outcome(self):
+        submit("video01")
+        job = claim_next_job("worker-a")
+        analysis = make_analysis("video01")
+        analysis.save()
+        with mock.patch.object(jobs, "analyze_video", return_value=analysis):
+            job = run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (AnalysisJob.DONE, {"analysis_id": analysis.pk}))
+
+    def test_a_job_taken_over_by_another_worker_is_left_alone(self):
+        submit("video01")
+        job = claim_next_job("worker-a")
+        self.assertTrue(heartbeat(job))
+
+        # worker-a looked dead, so the job was requeued and claimed again.
+        AnalysisJob.objects.filter(pk=job.pk).update(status=AnalysisJob.QUEUED)
+        claim_next_job("worker-b")
+        self.assertFalse(heartbeat(job))
+        with mock.patch.object(jobs, "analyze_video", side_effect=RuntimeError("boom")), \
+                self.assertLogs(jobs.logger, "WARNING"):
+            job = run_job(job)
+        self.assertEqual((job.status, job.worker, job.attempts), (AnalysisJob.RUNNING, "worker-b", 2))
+
+    def test_a_requeued_job_not_claimed_again_is_still_finished(self):
+        submit("video01")
+        job = claim_next_job("worker-a")
+        AnalysisJob.objects.filter(pk=job.pk).update(status=AnalysisJob.QUEUED)
+        with mock.patch.object(jobs, "analyze_video", side_effect=jobs.AnalysisError("No captions")):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (AnalysisJob.FAILED, "No captions"))
@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from news_analysis.utils import bias_utils, embeddings, model_registry, sentiment_utils  # noqa: F401 (registrations)
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        # Keep the real registrations out of reach; nothing here loads a real model.
+        for name in ("_loaders", "_active", "_models", "_load_seconds"):
+            patcher = mock.patch.dict(getattr(model_registry, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_models_load_once_on_first_use(self):
+        loader = mock.Mock(return_value="model")
+        model_registry.register("test-model", loader)
+        self.assertFalse(model_registry.is_loaded("test-model"))
+        self.assertEqual(model_registry.get_model("test-model"), "model")
+        self.assertEqual(model_registry.get_model("test-model"), "model")
+        loader.assert_called_once_with()
+        with self.assertRaises(KeyError):
+            model_registry.get_model("unknown")
+
+    def test_warmup_loads_only_active_models(self):
+        model_registry._loaders.clear()
+        model_registry._active.clear()
+        model_registry.register("always", lambda: "a")
+        model_registry.register("selected", lambda: "b", active=lambda: True)
+        model_registry.register("other-backend", self.fail, active=lambda: False)
+        model_registry.warmup()
+        self.assertEqual(sorted(model_registry._models), ["always", "selected"])
+
+    @override_settings(BIAS_BACKEND="onnx-int8", SENTIMENT_BACKEND="local", EMBEDDINGS_ENABLED=False,
+                       REUSE_DUPLICATE_ANALYSES=False)
+    def test_only_the_configured_backends_are_active(self):
+        self.assertEqual(sorted(model_registry.active_models()), ["bias-classifier:onnx-int8", "sentiment-classifier"])
+
+    @override_settings(BIAS_BACKEND="pytorch", SENTIMENT_BACKEND="llm", EMBEDDINGS_ENABLED=True)
+    def test_llm_sentiment_and_embeddings(self):
+        self.assertEqual(sorted(model_registry.active_models()), ["bias-classifier:pytorch", "sentence-embedder"])
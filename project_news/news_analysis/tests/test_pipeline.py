@@ -0,0 +1,33 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from news_analysis.models import ChannelStats, VideoAnalysis
+from news_analysis.pipeline import AnalysisError, analyze_video, build_analysis
+
+from .helpers import BIAS, make_analysis
+
+
+class BuildAnalysisTests(TestCase):
+    def test_metadata_fields(self):
+        analysis = make_analysis("video01", channel="Channel A")
+        self.assertEqual(analysis.video_title, "Video video01")
+        self.assertEqual(analysis.channel_name, "Channel A")
+        self.assertEqual(analysis.published_at.isoformat(), "2024-05-01T12:00:00+00:00")
+        self.assertEqual(analysis.caption_text, "transcript of video01")
+
+    def test_missing_metadata_is_not_turned_into_placeholders(self):
+        for metadata in (None, {}):
+            with self.subTest(metadata=metadata), self.assertRaises(AnalysisError):
+                build_analysis("video01", "https://youtu.be/video01", metadata, "text",
+                               {"label": "POSITIVE", "score": 0.5}, BIAS)
+
+    def test_analyze_video_without_metadata_stores_nothing(self):
+        data = {"video_id": "video01", "metadata": None, "transcript": "text", "segments": [], "errors": {}}
+        with mock.patch("news_analysis.utils.youtube_utils.fetch_video_data", return_value=data), \
+                mock.patch("news_analysis.utils.sentiment_utils.score_sentiment", side_effect=self.fail), \
+                mock.patch("news_analysis.utils.bias_utils.analyze_bias", side_effect=self.fail):
+            with self.assertRaises(AnalysisError):
+                analyze_video("video01", "https://youtu.be/video01")
+        self.assertFalse(VideoAnalysis.objects.exists())
+        self.assertFalse(ChannelStats.objects.exists())
@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from news_analysis.models import ChannelStats, VideoAnalysis
+from news_analysis.pipeline import rescore_analyses, save_analyses, stale_analyses
+from news_analysis.versioning import analysis_version
+
+from .helpers import make_analysis
+from .test_stats import ChannelStatsTestMixin
+
+
+class RescoreTests(ChannelStatsTestMixin, TestCase):
+    def test_rescore_moves_channel_totals_to_the_new_scores(self):
+        save_analyses([
+            make_analysis("video01"),
+            make_analysis("video02", sentiment={"label": "NEGATIVE", "score": -0.4}),
+            make_analysis("other01", channel="Channel B"),
+        ])
+        analyses = list(VideoAnalysis.objects.filter(channel_name="Channel A").order_by("video_id"))
+        biases = [{"left": 0.7, "center": 0.2, "right": 0.1, "biased": 0.9, "neutral": 0.1}] * 2
+        sentiments = [{"label": "NEUTRAL", "score": 0.0, "backend": "local"}, {"error": "model unavailable"}]
+        with mock.patch("news_analysis.utils.bias_utils.analyze_bias_many", return_value=biases), \
+                mock.patch("news_analysis.utils.sentiment_utils.score_sentiment_many", return_value=sentiments), \
+                self.assertLogs("news_analysis.pipeline", "WARNING"):
+            self.assertEqual(rescore_analyses(analyses), 1)
+
+        video01 = VideoAnalysis.objects.get(video_id="video01")
+        self.assertEqual((video01.sentiment_label, video01.bias_left), ("NEUTRAL", 0.7))
+        self.assertEqual(video01.analysis_version, analysis_version("local"))
+        # The failed row keeps its scores and version, so it stays stale.
+        video02 = VideoAnalysis.objects.get(video_id="video02")
+        self.assertEqual((video02.sentiment_label, video02.analysis_version), ("NEGATIVE", "v1"))
+        self.assertEqual(
+            sorted(stale_analyses(analysis_version("local")).values_list("video_id", flat=True)),
+            ["other01", "video02"],
+        )
+
+        stats = ChannelStats.objects.get(channel_name="Channel A")
+        self.assertEqual((stats.video_count, stats.positive_count, stats.negative_count, stats.neutral_count),
+                         (2, 0, 1, 1))
+        self.assertStatsMatchAnalyses()
@@ -0,0 +1,98 @@
+from django.test import SimpleTestCase, TestCase
+
+from news_analysis.pipeline import save_analyses
+from news_analysis.search import (
+    SimpleSearchBackend,
+    SQLiteFTSBackend,
+    highlight,
+    make_snippet,
+    parse_query,
+)
+
+from .helpers import make_analysis
+
+
+class QueryTextTests(SimpleTestCase):
+    def test_parse_query(self):
+        self.assertEqual(parse_query('"Budget" OR elect* -tax'), ["budget", "or", "elect*", "tax"])
+        self.assertEqual(parse_query(None), [])
+
+    def test_highlight(self):
+        self.assertEqual(
+            highlight("Election results and electoral law", ["elect*", "law"]),
+            "**Election** results and **electoral** **law**",
+        )
+        self.assertEqual(highlight("no terms", []), "no terms")
+
+    def test_snippet_centres_on_the_densest_matches(self):
+        text = " ".join(["filler"] * 50 + ["budget", "vote", "budget"] + ["filler"] * 50)
+        snippet = make_snippet(text, ["budget"], words=10)
+        self.assertTrue(snippet.startswith("...") and snippet.endswith("..."))
+        self.assertEqual(snippet.count("**budget**"), 2)
+        self.assertEqual(make_snippet("", ["budget"]), "")
+        self.assertEqual(make_snippet("short text", ["budget"]), "short text")
+
+
+def make_video(video_id, title, transcript, sentiment_score=0.5):
+    analysis = make_analysis(video_id, sentiment={"label": "POSITIVE", "score": sentiment_score})
+    analysis.video_title = title
+    analysis.caption_text = transcript
+    return analysis
+
+
+class SQLiteFTSBackendTests(TestCase):
+    def setUp(self):
+        # save_analyses indexes through the configured backend, which is
+        # SQLiteFTSBackend on the SQLite test database.
+        save_analyses([
+            make_video("video01", "Election night", "The budget was not discussed.", 0.9),
+            make_video("video02", "Budget debate", "Talk about the coming election.", 0.1),
+            make_video("video03", "Weather report", "Sunny with some rain.", 0.5),
+        ])
+        self.backend = SQLiteFTSBackend()
+
+    def ids(self, result):
+        return sorted(hit["analysis"].video_id for hit in result["results"])
+
+    def test_terms_may_match_title_and_transcript(self):
+        result = self.backend.search("election budget")
+        self.assertEqual(result["total"], 2)
+        self.assertEqual(self.ids(result), ["video01", "video02"])
+        hit = next(hit for hit in result["results"] if hit["analysis"].video_id == "video01")
+        self.assertEqual(hit["title"], "**Election** night")
+        self.assertIn("**budget**", hit["snippet"])
+
+    def test_prefix_terms_and_no_match(self):
+        self.assertEqual(self.ids(self.backend.search("weath*")), ["video03"])
+        self.assertEqual(self.backend.search("election weather")["total"], 0)
+        self.assertEqual(self.backend.search("")["results"], [])
+
+    def test_fts_syntax_is_matched_literally(self):
+        self.assertEqual(self.backend.search('budget" OR "rain')["total"], 0)
+
+    def test_filters_and_paging(self):
+        result = self.backend.search("election", filters={"sentiment_score": (0.5, None)})
+        self.assertEqual(self.ids(result), ["video01"])
+        with self.assertRaises(ValueError):
+            self.backend.search("election", filters={"video_title": (0, 1)})
+
+        first = self.backend.search("election", per_page=1)
+        second = self.backend.search("election", page=2, per_page=1)
+        self.assertEqual((first["total"], first["num_pages"]), (2, 2))
+        self.assertEqual(len(first["results"]) + len(second["results"]), 2)
+        self.assertNotEqual(self.ids(first), self.ids(second))
+
+    def test_rebuild(self):
+        self.assertEqual(self.backend.rebuild(), 3)
+        self.assertEqual(self.ids(self.backend.search("budget")), ["video01", "video02"])
+
+
+class SimpleSearchBackendTests(TestCase):
+    def test_matches_titles_only(self):
+        save_analyses([
+            make_video("video01", "Election night", "The budget was not discussed."),
+            make_video("video02", "Budget debate", "Talk about the coming election."),
+        ])
+        result = SimpleSearchBackend().search("budget")
+        self.assertEqual([hit["analysis"].video_id for hit in result["results"]], ["video02"])
+        self.assertEqual(result["results"][0]["title"], "**Budget** debate")
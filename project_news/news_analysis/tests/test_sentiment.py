@@ -0,0 +1,94 @@
+from concurrent.futures import Future
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from news_analysis.pipeline import build_analysis
+from news_analysis.utils import sentiment_utils
+from news_analysis.utils.sentiment_utils import normalize_llm_sentiment, score_sentiment_many
+from news_analysis.versioning import analysis_version
+
+from .helpers import BIAS
+
+
+class FakeCache:
+    def __init__(self):
+        self.data, self.models = {}, {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, model):
+        self.data[key], self.models[key] = value, model
+
+
+class FakeBatcher:
+    def __init__(self):
+        self.texts = []
+
+    def submit_many(self, texts):
+        self.texts += texts
+        futures = []
+        for _ in texts:
+            future = Future()
+            future.set_result({"label": "POSITIVE", "score": 0.8})
+            futures.append(future)
+        return futures
+
+
+class NormalizeLLMSentimentTests(SimpleTestCase):
+    def test_first_label_word_counts(self):
+        for answer, expected in (
+            ("Positive.", {"label": "POSITIVE", "score": 1.0}),
+            ("The sentiment is NEGATIVE, not positive", {"label": "NEGATIVE", "score": -1.0}),
+            ("neutral", {"label": "NEUTRAL", "score": 0.0}),
+            ("I cannot tell", {"label": "NEUTRAL", "score": 0.0}),
+            ("positively", {"label": "NEUTRAL", "score": 0.0}),
+        ):
+            with self.subTest(answer=answer):
+                self.assertEqual(normalize_llm_sentiment({"label": answer}), expected)
+
+    def test_errors_pass_through(self):
+        self.assertEqual(normalize_llm_sentiment({"error": "boom"}), {"error": "boom"})
+
+
+@override_settings(SENTIMENT_BACKEND="local")
+class ScoreSentimentTests(SimpleTestCase):
+    def setUp(self):
+        self.cache, self.batcher = FakeCache(), FakeBatcher()
+        for name, value in (("get_cache", lambda: self.cache), ("get_batcher", lambda: self.batcher)):
+            patcher = mock.patch.object(sentiment_utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_local_scores_are_cached_per_configured_model(self):
+        with override_settings(SENTIMENT_MODEL="org/model-a"):
+            self.assertEqual(score_sentiment_many(["text"]), [{"label": "POSITIVE", "score": 0.8, "backend": "local"}])
+            score_sentiment_many(["text"])
+        self.assertEqual(self.batcher.texts, ["text"])
+        self.assertEqual(set(self.cache.models.values()), {"org/model-a"})
+        with override_settings(SENTIMENT_MODEL="org/model-b"):
+            score_sentiment_many(["text"])
+        self.assertEqual(self.batcher.texts, ["text", "text"])
+        self.assertEqual(sorted(self.cache.models.values()), ["org/model-a", "org/model-b"])
+
+    @override_settings(SENTIMENT_LLM_FALLBACK="1")
+    def test_fallback_scores_are_stamped_with_the_llm_version(self):
+        self.batcher.submit_many = mock.Mock(side_effect=OSError("model download failed"))
+        with mock.patch.object(sentiment_utils, "_query_llama_sentiment", return_value={"label": "Negative"}), \
+                self.assertLogs(sentiment_utils.logger, "ERROR"):
+            [sentiment] = score_sentiment_many(["text"])
+        self.assertEqual(sentiment, {"label": "NEGATIVE", "score": -1.0, "backend": "llm"})
+
+        analysis = build_analysis(
+            "video01", "https://www.youtube.com/watch?v=video01",
+            {"title": "Video", "channel_title": "Channel A"}, "text", sentiment, BIAS,
+        )
+        self.assertEqual(analysis.analysis_version, analysis_version("llm"))
+        self.assertNotEqual(analysis.analysis_version, analysis_version())
+
+    @override_settings(SENTIMENT_LLM_FALLBACK="0")
+    def test_without_fallback_the_error_is_raised(self):
+        self.batcher.submit_many = mock.Mock(side_effect=OSError("model download failed"))
+        with self.assertRaises(OSError):
+            score_sentiment_many(["text"])
@@ -0,0 +1,60 @@
+from django.test import TestCase
+
+from news_analysis.models import ChannelStats
+from news_analysis.pipeline import save_analyses
+from news_analysis.stats import channel_aggregates, rebuild_channel_stats, sentiment_bucket
+
+from .helpers import make_analysis
+
+
+class ChannelStatsTestMixin:
+    def assertStatsMatchAnalyses(self):
+        """ChannelStats holds exactly what aggregating VideoAnalysis gives."""
+        expected = {row.pop("channel_name"): row for row in channel_aggregates()}
+        self.assertEqual(set(ChannelStats.objects.values_list("channel_name", flat=True)), set(expected))
+        for channel_name, values in expected.items():
+            stats = ChannelStats.objects.get(channel_name=channel_name)
+            for field, value in values.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(getattr(stats, field), value, msg=field)
+                else:
+                    self.assertEqual(getattr(stats, field), value, msg=field)
+
+
+class ChannelStatsTests(ChannelStatsTestMixin, TestCase):
+    def test_saved_analyses_update_their_channels(self):
+        save_analyses([
+            make_analysis("video01"),
+            make_analysis("video02", published_at="2024-06-01T12:00:00Z",
+                          sentiment={"label": "NEGATIVE", "score": -0.5}),
+            make_analysis("other01", channel="Channel B"),
+        ])
+        save_analyses([make_analysis("video03", published_at="2024-01-01T12:00:00Z",
+                                     sentiment={"label": "Neutral-ish", "score": 0.1})])
+
+        stats = ChannelStats.objects.get(channel_name="Channel A")
+        self.assertEqual(stats.video_count, 3)
+        self.assertEqual((stats.positive_count, stats.negative_count, stats.neutral_count), (1, 1, 1))
+        self.assertAlmostEqual(stats.avg_bias_center, 0.6)
+        self.assertAlmostEqual(stats.avg_sentiment_score, (0.5 - 0.5 + 0.1) / 3)
+        # An older video does not move last_published_at back.
+        self.assertEqual(stats.last_published_at.isoformat(), "2024-06-01T12:00:00+00:00")
+        self.assertStatsMatchAnalyses()
+
+    def test_already_stored_videos_are_not_counted_twice(self):
+        save_analyses([make_analysis("video01")])
+        self.assertEqual(save_analyses([make_analysis("video01"), make_analysis("video02")])[0].video_id, "video02")
+        self.assertEqual(ChannelStats.objects.get().video_count, 2)
+
+    def test_rebuild(self):
+        save_analyses([make_analysis("video01"), make_analysis("other01", channel="Channel B")])
+        ChannelStats.objects.update(video_count=99, sum_bias_left=0)
+        ChannelStats.objects.create(channel_name="Gone")
+        self.assertEqual(rebuild_channel_stats(), 2)
+        self.assertStatsMatchAnalyses()
+
+    def test_sentiment_bucket(self):
+        self.assertEqual(sentiment_bucket("POSITIVE"), "positive")
+        self.assertEqual(sentiment_bucket("mostly negative"), "negative")
+        self.assertIsNone(sentiment_bucket("mixed"))
+        self.assertIsNone(sentiment_bucket(None))
@@ -0,0 +1,104 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+
+from news_analysis.models import AnalysisJob
+from news_analysis.streaming import job_events
+
+from .helpers import make_analysis
+
+URL = "/analyze/stream/"
+
+
+def create_job(video_id, status):
+    return AnalysisJob.objects.create(
+        video_id=video_id, video_url=f"https://www.youtube.com/watch?v={video_id}", status=status,
+        error="model crashed" if status == AnalysisJob.FAILED else "",
+    )
+
+
+async def collect(events):
+    return [event async for event in events if event[0] is not None]
+
+
+async def read_events(response):
+    body = "".join([chunk.decode() async for chunk in response.streaming_content])
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n") if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@override_settings(ANALYZE_TOKEN="secret", ANALYSIS_STREAM_POLL_SECONDS=0.01, ANALYSIS_STREAM_TIMEOUT=5)
+class AnalyzeStreamAccessTests(TestCase):
+    def setUp(self):
+        make_analysis("video000001").save()
+        self.user = get_user_model().objects.create_user("reader", password="pw")
+
+    async def test_needs_a_login_or_the_token(self):
+        client = AsyncClient()
+        self.assertEqual((await client.post(URL, {"url": "https://youtu.be/video000001"})).status_code, 403)
+        self.assertEqual((await client.get(URL, {"job": 1})).status_code, 403)
+        wrong = await client.post(URL, {"url": "https://youtu.be/video000001"}, AUTHORIZATION="Bearer nope")
+        self.assertEqual(wrong.status_code, 403)
+
+        response = await client.post(URL, {"url": "https://youtu.be/video000001"}, AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        events = await read_events(response)
+        self.assertEqual([event for event, _ in events], ["accepted", "video", "end"])
+        self.assertEqual(events[1][1]["status"], "stored")
+
+    async def test_a_logged_in_post_needs_the_csrf_token(self):
+        client = AsyncClient(enforce_csrf_checks=True)
+        await sync_to_async(client.force_login)(self.user)
+        response = await client.post(URL, {"url": "https://youtu.be/video000001"})
+        self.assertEqual(response.status_code, 403)
+
+        await client.get("/analyze/")
+        token = client.cookies["csrftoken"].value
+        response = await client.post(URL, {"url": "https://youtu.be/video000001", "csrfmiddlewaretoken": token})
+        self.assertEqual(response.status_code, 200)
+        await read_events(response)
+
+    async def test_get_follows_jobs_and_validates_ids(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+        self.assertEqual((await client.get(URL)).status_code, 400)
+        self.assertEqual((await client.get(URL, {"job": "x"})).status_code, 400)
+        job = await sync_to_async(create_job)("video000001", AnalysisJob.DONE)
+        response = await client.get(URL, {"job": job.pk})
+        self.assertEqual(response.status_code, 200)
+        events = await read_events(response)
+        self.assertEqual(events[1][1]["status"], "done")
+        self.assertEqual(events[1][1]["analysis"]["video_id"], "video000001")
+
+
+@override_settings(ANALYSIS_STREAM_POLL_SECONDS=0.01, ANALYSIS_STREAM_TIMEOUT=5)
+class JobEventsTests(TestCase):
+    async def test_two_jobs_of_one_video_are_followed_separately(self):
+        failed = await sync_to_async(create_job)("video000001", AnalysisJob.FAILED)
+        retried = await sync_to_async(create_job)("video000001", AnalysisJob.QUEUED)
+        events = job_events([failed.pk, retried.pk, 999])
+
+        accepted = await events.__anext__()
+        self.assertEqual(accepted, ("accepted", {"videos": ["video000001"] * 2, "missing": [999]}))
+        self.assertEqual((await events.__anext__())[1]["status"], "failed")
+        self.assertEqual((await events.__anext__())[1], {"video_id": "video000001", "status": "queued",
+                                                          "job_id": retried.pk})
+
+        await sync_to_async(make_analysis("video000001").save)()
+        await AnalysisJob.objects.filter(pk=retried.pk).aupdate(status=AnalysisJob.DONE)
+        rest = await collect(events)
+        self.assertEqual([data["status"] for _, data in rest[:-1]], ["done"])
+        self.assertEqual(rest[-1], ("end", {"stored": 0, "done": 1, "failed": 1, "pending": [], "pending_jobs": []}))
+
+    @override_settings(ANALYSIS_STREAM_TIMEOUT=0.05)
+    async def test_unfinished_jobs_are_listed_in_end(self):
+        job = await sync_to_async(create_job)("video000001", AnalysisJob.RUNNING)
+        events = await collect(job_events([job.pk]))
+        self.assertEqual(events[-1][1]["pending"], ["video000001"])
+        self.assertEqual(events[-1][1]["pending_jobs"], [job.pk])
@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from news_analysis.models import VideoTimeline
+from news_analysis.timeline import build_timelines, group_windows
+from news_analysis.utils import bias_utils, sentiment_utils
+
+from .helpers import BIAS, make_analysis
+
+
+class GroupWindowsTests(SimpleTestCase):
+    def test_groups_segments_and_skips_silence(self):
+        segments = [
+            {"text": "a", "start": 0.0, "duration": 10},
+            {"text": "b", "start": 30.0, "duration": 10},
+            {"text": "c", "start": 130.0, "duration": 10},
+        ]
+        self.assertEqual(group_windows(segments, seconds=60, limit=10), (60, [(0, "a b"), (120, "c")]))
+
+    def test_widens_windows_for_long_videos(self):
+        segments = [{"text": str(minute), "start": minute * 60.0, "duration": 60} for minute in range(10)]
+        width, windows = group_windows(segments, seconds=60, limit=4)
+        self.assertEqual(width, 150)
+        self.assertEqual(windows, [(0, "0 1 2"), (150, "3 4"), (300, "5 6 7"), (450, "8 9")])
+
+    def test_no_segments(self):
+        self.assertEqual(group_windows([], seconds=60, limit=10), (60, []))
+
+
+class BuildTimelinesTests(TestCase):
+    def test_scores_every_window_in_one_pass(self):
+        first, second = make_analysis("video01"), make_analysis("video02")
+        first.save()
+        second.save()
+        segments = [{"text": "a", "start": 0.0, "duration": 10}, {"text": "b", "start": 70.0, "duration": 10}]
+        with mock.patch.object(bias_utils, "analyze_bias_passages",
+                               side_effect=lambda texts: [BIAS] * len(texts)) as bias, \
+                mock.patch.object(sentiment_utils, "score_short_texts",
+                                  side_effect=lambda texts, max_tokens: [{"score": 0.25}] * len(texts)) as sentiment:
+            timelines = build_timelines([(first, segments), (second, segments[:1]), (second, None)])
+        bias.assert_called_once_with(["a", "b", "a"])
+        sentiment.assert_called_once()
+        self.assertEqual(len(timelines), 2)
+
+        timeline = VideoTimeline.objects.get(video=first)
+        self.assertEqual((timeline.window_count, timeline.window_seconds), (2, 60))
+        columns = timeline.columns()
+        self.assertEqual(columns["start"], [0.0, 60.0])
+        self.assertAlmostEqual(columns["center"][1], BIAS["center"])
+        self.assertEqual(columns["sentiment"], [0.25, 0.25])
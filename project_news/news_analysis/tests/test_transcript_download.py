@@ -0,0 +1,116 @@
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from news_analysis.utils import youtube_utils
+from news_analysis.utils.rate_limit import TokenBucket
+from news_analysis.utils.transcript_cache import TranscriptCache
+
+from .helpers import FakeClock
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+        self.assertTrue(all(bucket.try_acquire() for _ in range(3)))
+        self.assertFalse(bucket.try_acquire())
+        clock.now += 0.5
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        # Refills never exceed the capacity.
+        clock.now += 100
+        self.assertTrue(all(bucket.try_acquire() for _ in range(3)))
+        self.assertFalse(bucket.try_acquire())
+
+    def test_acquire_sleeps_until_a_token_is_available(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=4, capacity=1, clock=clock, sleep=clock.sleep)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertAlmostEqual(bucket.acquire(), 0.25)
+        self.assertAlmostEqual(clock.now, 0.25)
+
+    def test_acquire_gives_up_without_waiting_past_the_timeout(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        self.assertIsNone(bucket.acquire(timeout=0.5))
+        self.assertEqual(clock.now, 0.0)
+        self.assertEqual(bucket.acquire(timeout=1), 1.0)
+
+    def test_penalize(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, capacity=5, clock=clock, sleep=clock.sleep)
+        bucket.penalize(10)
+        self.assertFalse(bucket.try_acquire())
+        self.assertAlmostEqual(bucket.acquire(), 11.0)
+
+    def test_zero_rate_disables_limiting(self):
+        bucket = TokenBucket(rate=0, clock=FakeClock(), sleep=self.fail)
+        self.assertTrue(all(bucket.try_acquire() for _ in range(100)))
+        self.assertEqual(bucket.acquire(), 0.0)
+
+
+class DownloadSegmentsTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.bucket = TokenBucket(rate=1, capacity=1, clock=self.clock, sleep=self.clock.sleep)
+        self.api = mock.Mock()
+        self.api.get_transcript.side_effect = [RuntimeError("HTTP 429"), [{"text": "hi", "start": 0}]]
+        patches = [
+            mock.patch.object(youtube_utils, "transcript_rate_limiter", self.bucket),
+            mock.patch.object(youtube_utils, "YouTubeTranscriptApi", self.api),
+            mock.patch.object(youtube_utils, "_is_throttled", return_value=True),
+            mock.patch.object(youtube_utils, "time", mock.Mock(monotonic=self.clock)),
+            mock.patch.object(youtube_utils, "TRANSCRIPT_BACKOFF", 8),
+            # No jitter: the fake clock only advances in whole seconds.
+            mock.patch.object(youtube_utils.random, "uniform", return_value=1),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_backs_off_and_retries_without_a_deadline(self):
+        with self.assertLogs(youtube_utils.logger, "WARNING"):
+            self.assertEqual(youtube_utils._download_segments("abc", ["en"]), [{"text": "hi", "start": 0}])
+        self.assertEqual(self.clock.now, 1009.0)
+
+    def test_gives_up_at_the_deadline_instead_of_backing_off(self):
+        with self.assertLogs(youtube_utils.logger, "WARNING"), self.assertRaises(TimeoutError):
+            youtube_utils._download_segments("abc", ["en"], deadline=self.clock() + 3)
+        self.assertEqual(self.api.get_transcript.call_count, 1)
+        self.assertEqual(self.clock.now, 1000.0)
+
+
+class TranscriptCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.clock = FakeClock(time.time())
+        self.cache = TranscriptCache(directory.name, missing_ttl=60, clock=self.clock)
+
+    def test_put_get_delete(self):
+        segments = [{"text": "hello", "start": 0.0, "duration": 1.5}]
+        self.assertIsNone(self.cache.get("abc123"))
+        self.cache.put("abc123", "en", segments)
+        self.assertTrue(self.cache.has("abc123"))
+        self.assertEqual(self.cache.get("abc123"), {"segments": segments})
+        self.assertIsNone(self.cache.get("abc123", "de"))
+        self.cache.delete("abc123")
+        self.assertFalse(self.cache.has("abc123"))
+
+    def test_missing_expires_after_ttl(self):
+        self.cache.put_missing("abc123", "en", "TranscriptsDisabled")
+        self.assertEqual(self.cache.get("abc123"), {"missing": "TranscriptsDisabled"})
+        self.clock.now += 60
+        self.assertTrue(self.cache.has("abc123"))
+        self.clock.now += 1
+        self.assertFalse(self.cache.has("abc123"))
+        self.assertIsNone(self.cache.get("abc123"))
+
+    def test_put_replaces_missing(self):
+        self.cache.put_missing("abc123", "en")
+        self.cache.put("abc123", "en", [])
+        self.assertEqual(self.cache.get("abc123"), {"segments": []})
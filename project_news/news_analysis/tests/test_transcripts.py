@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from news_analysis import pipeline
+from news_analysis.models import ChannelStats, Transcript, VideoAnalysis
+from news_analysis.pipeline import save_analyses
+from news_analysis.utils.compression import DEFAULT_CODEC, compress_text, decompress_text
+
+from .helpers import make_analysis
+
+
+class TranscriptStoreTests(TestCase):
+    def test_compression_round_trip(self):
+        text = "Ünïcödé transcript, repeated. " * 200
+        data = compress_text(text, DEFAULT_CODEC)
+        self.assertLess(len(data), len(text.encode("utf-8")) / 10)
+        self.assertEqual(decompress_text(data, DEFAULT_CODEC), text)
+        self.assertEqual(decompress_text(memoryview(compress_text(text, "zlib")), "zlib"), text)
+        with self.assertRaises(ValueError):
+            compress_text(text, "lz4")
+
+    def test_identical_transcripts_are_stored_once(self):
+        first, second = Transcript.store_many(["same text", "same text"])
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Transcript.store("same text").pk, first.pk)
+        self.assertEqual(Transcript.objects.count(), 1)
+        self.assertEqual(Transcript.objects.get().length, len("same text"))
+
+    def test_caption_text_is_read_back_lazily(self):
+        a, b = make_analysis("video01"), make_analysis("video02")
+        b.caption_text = a.caption_text
+        save_analyses([a, b])
+        self.assertEqual(Transcript.objects.count(), 1)
+        video = VideoAnalysis.objects.get(video_id="video02")
+        self.assertEqual(video.caption_text, "transcript of video01")
+        self.assertEqual(video.caption_preview(10), "transcript...")
+
+    def test_saving_without_text(self):
+        analysis = make_analysis("video01")
+        analysis.caption_text = ""
+        analysis.save()
+        self.assertIsNone(VideoAnalysis.objects.get().transcript)
+        self.assertEqual(VideoAnalysis.objects.get().caption_text, "")
+
+
+class SaveAnalysesRaceTests(TestCase):
+    def test_a_concurrent_duplicate_does_not_drop_the_rest_of_the_batch(self):
+        save_analyses([make_analysis("video01")])
+        # Another writer stored video01 after this batch checked for existing rows.
+        with mock.patch.object(pipeline, "existing_video_ids", return_value=set()):
+            saved = save_analyses([make_analysis("video01"), make_analysis("video03")])
+        self.assertEqual([analysis.video_id for analysis in saved], ["video03"])
+        video = VideoAnalysis.objects.get(video_id="video03")
+        self.assertEqual(video.caption_text, "transcript of video03")
+        self.assertEqual(ChannelStats.objects.get().video_count, 2)
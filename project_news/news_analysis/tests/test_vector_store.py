@@ -0,0 +1,77 @@
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from news_analysis.utils import vector_store
+from news_analysis.utils.vector_store import VectorStore, normalize, stored_dim
+
+
+class VectorStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+        self.rng = np.random.default_rng(0)
+
+    def vectors(self, count, dim=16):
+        return normalize(self.rng.normal(size=(count, dim)))
+
+    def test_add_and_exact_search(self):
+        store = VectorStore(self.path, dim=16, dtype="float32")
+        self.assertEqual(store.search(np.ones(16)), [])
+        vectors = self.vectors(50)
+        store.add(range(100, 150), vectors)
+        self.assertEqual(len(store), 50)
+        [(best, score)] = store.search(vectors[7] * 3, k=1)
+        self.assertEqual(best, 107)
+        self.assertAlmostEqual(score, 1.0, places=5)
+        results = store.search(vectors[7], k=5, exclude=[107])
+        self.assertEqual(len(results), 5)
+        self.assertNotIn(107, [pk for pk, _ in results])
+        self.assertEqual([score for _, score in results], sorted((score for _, score in results), reverse=True))
+
+    def test_duplicate_ids_are_returned_once_and_get_returns_the_latest(self):
+        store = VectorStore(self.path, dim=16)
+        first, second = self.vectors(2)
+        store.add([1, 1], [first, second])
+        self.assertEqual([pk for pk, _ in store.search(first, k=5)], [1])
+        np.testing.assert_allclose(store.get(1), second, atol=1e-3)
+        self.assertIsNone(store.get(2))
+
+    def test_grows_and_is_shared_between_instances(self):
+        with mock.patch.object(vector_store, "INITIAL_CAPACITY", 4):
+            writer = VectorStore(self.path, dim=16)
+            reader = VectorStore(self.path, dim=16)
+            self.assertEqual(len(reader), 0)
+            for start in range(0, 20, 3):
+                writer.add(range(start, start + 3), self.vectors(3))
+        self.assertEqual(len(reader), 21)
+        self.assertEqual(list(reader.ids()), list(range(21)))
+        self.assertEqual(stored_dim(self.path), 16)
+
+    def test_rejects_a_different_dimension(self):
+        VectorStore(self.path, dim=16).add([1], self.vectors(1))
+        with self.assertRaisesMessage(ValueError, "rebuild it"):
+            len(VectorStore(self.path, dim=8))
+        with self.assertRaises(ValueError):
+            VectorStore(self.path, dim=16).add([1, 2], self.vectors(1))
+
+    def test_ivf_search_finds_near_duplicates(self):
+        store = VectorStore(self.path, dim=16)
+        vectors = self.vectors(500)
+        store.add(range(500), vectors)
+        self.assertEqual(store.build_ivf(nlist=10), 10)
+        # Vectors added after clustering are assigned to a list too.
+        store.add([1000], vectors[:1])
+        for i in (123, 250, 499):
+            self.assertEqual(store.search(vectors[i], k=1, nprobe=2)[0][0], i)
+        self.assertEqual({pk for pk, _ in store.search(vectors[0], k=2, nprobe=2)}, {0, 1000})
+
+    def test_clear(self):
+        store = VectorStore(self.path, dim=16)
+        store.add([1], self.vectors(1))
+        store.clear()
+        self.assertEqual(len(store), 0)
+        self.assertIsNone(stored_dim(self.path))
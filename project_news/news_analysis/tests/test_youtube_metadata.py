@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from news_analysis.utils import youtube_utils
+from news_analysis.utils.youtube_utils import MetadataCoalescer, fetch_video_metadata_many
+
+
+class FakeVideosList:
+    """Answers videos.list requests for every ID except those starting with "gone"."""
+
+    def __init__(self):
+        self.requests = []
+
+    def videos(self):
+        return self
+
+    def list(self, **params):
+        return params
+
+    def execute(self, method, make_request):
+        ids = make_request(self)["id"].split(",")
+        self.requests.append((method, ids))
+        return {"items": [
+            {"id": video_id, "snippet": {"title": f"Title {video_id}"}, "statistics": {"viewCount": "7"}}
+            for video_id in ids if not video_id.startswith("gone")
+        ]}
+
+
+class FetchVideoMetadataManyTests(SimpleTestCase):
+    def setUp(self):
+        self.api = FakeVideosList()
+        patcher = mock.patch.object(youtube_utils, "execute_api_call", side_effect=self.api.execute)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fifty_ids_per_request(self):
+        video_ids = [f"video{i:06d}" for i in range(120)]
+        metadata = fetch_video_metadata_many(video_ids + video_ids[:10])
+        self.assertEqual([len(ids) for _, ids in self.api.requests], [50, 50, 20])
+        self.assertEqual({method for method, _ in self.api.requests}, {"videos.list"})
+        self.assertEqual(list(metadata), video_ids)
+        self.assertEqual(metadata["video000003"]["title"], "Title video000003")
+        self.assertEqual(metadata["video000003"]["view_count"], "7")
+
+    def test_unknown_videos_are_left_out(self):
+        self.assertEqual(list(fetch_video_metadata_many(["video000001", "gone0000001"])), ["video000001"])
+
+
+class MetadataCoalescerTests(SimpleTestCase):
+    def test_concurrent_lookups_share_one_request(self):
+        batches = []
+
+        def lookup(video_ids):
+            batches.append(video_ids)
+            return {video_id: {"title": video_id} for video_id in video_ids if not video_id.startswith("gone")}
+
+        coalescer = MetadataCoalescer(max_batch=50, max_wait=0.2)
+        video_ids = [f"video{i:06d}" for i in range(10)] + ["gone0000001"]
+        with mock.patch.object(youtube_utils, "fetch_video_metadata_many", side_effect=lookup), \
+                ThreadPoolExecutor(max_workers=len(video_ids)) as pool:
+            results = list(pool.map(lambda video_id: coalescer.submit(video_id).result(timeout=5), video_ids))
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(batches[0]), sorted(video_ids))
+        self.assertEqual(results[0], {"title": "video000000"})
+        self.assertIsNone(results[-1])
+
+    def test_batches_are_capped(self):
+        batches = []
+
+        def lookup(video_ids):
+            batches.append(len(video_ids))
+            return {}
+
+        coalescer = MetadataCoalescer(max_batch=4, max_wait=0.2)
+        with mock.patch.object(youtube_utils, "fetch_video_metadata_many", side_effect=lookup):
+            futures = [coalescer.submit(f"video{i:06d}") for i in range(10)]
+            for future in futures:
+                future.result(timeout=5)
+        self.assertEqual(batches, [4, 4, 2])
+
+    def test_errors_reach_every_caller(self):
+        coalescer = MetadataCoalescer(max_wait=0.05)
+        with mock.patch.object(youtube_utils, "fetch_video_metadata_many", side_effect=RuntimeError("HTTP 500")):
+            futures = [coalescer.submit("video000001"), coalescer.submit("video000002")]
+            for future in futures:
+                with self.assertRaisesMessage(RuntimeError, "HTTP 500"):
+                    future.result(timeout=5)
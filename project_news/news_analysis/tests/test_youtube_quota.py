@@ -0,0 +1,54 @@
+import tempfile
+from datetime import datetime
+
+from django.test import SimpleTestCase
+
+from news_analysis.utils.youtube_quota import QUOTA_TIMEZONE, QuotaExhausted, QuotaScheduler, QuotaUsageFile
+
+
+class QuotaSchedulerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = datetime(2024, 5, 1, 9, 0, tzinfo=QUOTA_TIMEZONE)
+
+    def scheduler(self, keys=("key-a", "key-b"), **kwargs):
+        return QuotaScheduler(list(keys), daily_quota=100, clock=lambda: self.now, **kwargs)
+
+    def test_routes_to_the_key_with_most_headroom(self):
+        scheduler = self.scheduler()
+        first = scheduler.acquire("search.list")
+        self.assertEqual(scheduler.acquire("videos.list"), "key-b" if first == "key-a" else "key-a")
+        self.assertEqual(scheduler.acquire("videos.list"), scheduler.acquire("videos.list"))
+        self.assertEqual(scheduler.remaining(), 200 - 100 - 3)
+
+    def test_raises_when_no_key_can_afford_the_call(self):
+        scheduler = self.scheduler(keys=["key-a"])
+        scheduler.acquire("videos.list")
+        with self.assertRaises(QuotaExhausted):
+            scheduler.acquire("search.list")
+        self.assertEqual(scheduler.usage_stats()["key-a..."]["remaining"], 99)
+
+    def test_exhausted_key_cools_down_until_the_daily_reset(self):
+        scheduler = self.scheduler()
+        scheduler.mark_exhausted("key-a")
+        self.assertEqual([scheduler.acquire("videos.list") for _ in range(3)], ["key-b"] * 3)
+        self.assertEqual(scheduler.usage_stats()["key-a..."]["cooldown_until"], "2024-05-02T00:00:00-07:00")
+
+        self.now = datetime(2024, 5, 2, 0, 0, 1, tzinfo=QUOTA_TIMEZONE)
+        self.assertEqual(scheduler.remaining(), 200)
+        self.assertEqual(scheduler.acquire("search.list"), "key-a")
+
+    def test_usage_file_is_shared_between_schedulers(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = f"{directory.name}/quota.json"
+        one = self.scheduler(usage=QuotaUsageFile(path))
+        two = self.scheduler(usage=QuotaUsageFile(path))
+        one.acquire("search.list")
+        two.acquire("search.list")
+        with self.assertRaises(QuotaExhausted):
+            one.acquire("search.list")
+        two.mark_exhausted("key-a")
+        self.assertEqual(one.remaining(), 0)
+        # Keys are stored hashed.
+        with open(path) as f:
+            self.assertNotIn("key-a", f.read())
@@ -0,0 +1,96 @@
+from .models import VideoTimeline
+from .utils import metrics
+from .utils.config import get_setting
+from .versioning import analysis_version
+
+TIMELINE_WINDOW_SECONDS = 60
+TIMELINE_MAX_WINDOWS = 120
+
+WINDOWS = metrics.counter("timeline_windows_total", "Transcript windows scored for timelines.")
+
+
+def timeline_enabled():
+    """Whether analyze_video also builds a timeline (TIMELINE_ENABLED)."""
+    return str(get_setting("TIMELINE_ENABLED", "1")) not in ("0", "False", "false")
+
+
+def window_seconds():
+    return float(get_setting("TIMELINE_WINDOW_SECONDS", TIMELINE_WINDOW_SECONDS))
+
+
+def max_windows():
+    return int(get_setting("TIMELINE_MAX_WINDOWS", TIMELINE_MAX_WINDOWS))
+
+
+def group_windows(segments, seconds=None, limit=None):
+    """
+    Group timed {"text", "start", "duration"} segments into consecutive
+    windows of ``seconds`` (TIMELINE_WINDOW_SECONDS). Windows are widened
+    when the video would otherwise need more than ``limit``
+    (TIMELINE_MAX_WINDOWS), and windows without speech are left out.
+
+    Returns:
+        tuple: (window width in seconds, [(window start, text)]).
+    """
+    seconds = seconds or window_seconds()
+    limit = limit or max_windows()
+    if not segments:
+        return seconds, []
+    end = max(segment["start"] + segment.get("duration", 0) for segment in segments)
+    width = max(seconds, end / limit)
+    windows = {}
+    for segment in segments:
+        index = min(int(segment["start"] // width), limit - 1)
+        windows.setdefault(index, []).append(segment["text"])
+    return width, [(index * width, " ".join(texts)) for index, texts in sorted(windows.items())]
+
+
+def build_timelines(items):
+    """
+    Score the transcript windows of several videos and store a VideoTimeline
+    for each, replacing existing ones.
+
+    ``items`` is [(VideoAnalysis, segments)]. The windows of all videos go
+    through one batched bias pass (with the chunk-level inference cache) and
+    one sentiment pass with the local classifier. A window is about as long
+    as a bias chunk, so a timeline costs roughly what scoring the chunked
+    transcript did, not one model call per segment.
+    """
+    from .utils.bias_utils import analyze_bias_passages
+    from .utils.sentiment_utils import SENTIMENT_CHUNK_TOKENS, score_short_texts
+
+    grouped = [(analysis, *group_windows(segments)) for analysis, segments in items]
+    grouped = [(analysis, width, windows) for analysis, width, windows in grouped if windows]
+    texts = [text for _, _, windows in grouped for _, text in windows]
+    if not texts:
+        return []
+
+    with metrics.stage_timer("timeline"):
+        biases = analyze_bias_passages(texts)
+        sentiments = score_short_texts(texts, max_tokens=SENTIMENT_CHUNK_TOKENS)
+    WINDOWS.inc(len(texts))
+
+    version = analysis_version()
+    timelines, position = [], 0
+    for analysis, width, windows in grouped:
+        rows = []
+        for start, _ in windows:
+            bias, sentiment = biases[position], sentiments[position]
+            position += 1
+            rows.append([start, *(bias[label] for label in VideoTimeline.COLUMNS[1:6]), sentiment["score"]])
+        timelines.append(VideoTimeline(
+            video=analysis,
+            window_seconds=width,
+            window_count=len(rows),
+            data=VideoTimeline.pack(rows),
+            analysis_version=version,
+        ))
+
+    with metrics.stage_timer("db_write"):
+        VideoTimeline.objects.bulk_create(
+            timelines,
+            update_conflicts=True,
+            unique_fields=["video"],
+            update_fields=["window_seconds", "window_count", "data", "analysis_version", "updated_at"],
+        )
+    return timelines
@@ -1,8 +1,17 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),  # Homepage/dashboard
-    path('analyze/', views.analyze_video, name='analyze_video'),  # Link to Streamlit
+    path('analyze/', views.analyze_video, name='analyze_video'),  # Batch form, progress via analyze_stream
+    path('analyze/stream/', views.analyze_stream, name='analyze_stream'),  # Async, server-sent events
     path('channel/<str:channel_name>/', views.channel_detail, name='channel_detail'),  # Per-channel detail page
+    path('export/', views.export_analyses, name='export_analyses'),  # Streaming CSV/JSONL/Parquet export
+    path('metrics', views.metrics, name='metrics'),  # Prometheus scrape endpoint
+    # Read-only JSON API (news_analysis.api)
+    path('api/videos/', api.videos, name='api_videos'),
+    path('api/videos/<str:video_id>/', api.video_detail, name='api_video_detail'),
+    path('api/channels/', api.channels, name='api_channels'),
+    path('api/channels/<str:channel_name>/', api.channel_detail, name='api_channel_detail'),
+    path('api/aggregates/', api.aggregates, name='api_aggregates'),
 ]
@@ -0,0 +1,119 @@
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from . import metrics
+
+BATCH_SIZE = metrics.histogram(
+    "model_batch_size", "Items per micro-batched model call.", buckets=metrics.SIZE_BUCKETS
+)
+BATCH_SECONDS = metrics.histogram("model_batch_seconds", "Duration of micro-batched model calls.")
+QUEUE_SECONDS = metrics.histogram(
+    "model_queue_wait_seconds", "Time the oldest item of a batch waited before the model ran."
+)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item calls into batched calls of ``batch_fn``.
+
+    Callers submit() items and get Futures back. One background thread takes
+    the first pending item, waits up to ``max_wait`` seconds for more (or
+    until ``max_batch_size`` are pending), and runs ``batch_fn`` once on the
+    whole batch. Because only that thread calls ``batch_fn``, a model that is
+    not thread-safe can be shared by any number of callers.
+
+    Args:
+        batch_fn (callable): Takes a list of items, returns a list of results
+            in the same order.
+        max_batch_size (int): Upper bound on items per batch_fn call.
+        max_wait (float): Seconds to wait for a batch to fill up.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait=0.01, name="micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=10000)
+        self._requests = 0
+        self._batches = 0
+
+    def submit(self, item):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def submit_many(self, items):
+        return [self.submit(item) for item in items]
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Drain whatever is already queued even once the wait is over.
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            QUEUE_SECONDS.observe(started - batch[0][2], batcher=self.name)
+            BATCH_SIZE.observe(len(batch), batcher=self.name)
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            BATCH_SECONDS.observe(finished - started, batcher=self.name)
+            with self._lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._latencies.extend(finished - submitted for _, _, submitted in batch)
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self._latencies)
+            requests, batches = self._requests, self._batches
+        return {
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": round(requests / batches, 2) if batches else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._latencies.clear()
+            self._requests = self._batches = 0
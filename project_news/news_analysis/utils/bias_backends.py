@@ -0,0 +1,95 @@
+"""
+Inference backends for the zero-shot bias classifier.
+
+- "pytorch": the reference fp32 PyTorch model.
+- "pytorch-int8": PyTorch with Linear layers dynamically quantized to int8.
+- "onnx": the model exported to an ONNX graph and run by ONNX Runtime.
+- "onnx-int8": the ONNX graph with dynamic int8 quantization.
+
+The ONNX backends need the optional ``optimum[onnxruntime]`` package. Exported
+graphs are written once under BIAS_ONNX_DIR and reused afterwards.
+"""
+import os
+import platform
+
+BACKENDS = ("pytorch", "pytorch-int8", "onnx", "onnx-int8")
+
+DEFAULT_ONNX_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "onnx_models",
+)
+
+
+class BiasModel:
+    """A sequence-classification model plus its tokenizer, whatever the runtime."""
+
+    def __init__(self, model, tokenizer, backend):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.backend = backend
+
+
+def _load_pytorch(model_name, quantize):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return BiasModel(model, tokenizer, "pytorch-int8" if quantize else "pytorch")
+
+
+def _load_onnx(model_name, quantize, onnx_dir):
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError as e:
+        raise ImportError(
+            "The onnx bias backends need optimum: pip install 'optimum[onnxruntime]'"
+        ) from e
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    export_dir = os.path.join(onnx_dir, model_name.replace("/", "--"))
+    fp32_dir = os.path.join(export_dir, "fp32")
+    if not os.path.exists(os.path.join(fp32_dir, "model.onnx")):
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(fp32_dir)
+
+    if not quantize:
+        model = ORTModelForSequenceClassification.from_pretrained(fp32_dir)
+        return BiasModel(model, tokenizer, "onnx")
+
+    int8_dir = os.path.join(export_dir, "int8")
+    if not os.path.exists(os.path.join(int8_dir, "model_quantized.onnx")):
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(fp32_dir).quantize(
+            save_dir=int8_dir, quantization_config=qconfig
+        )
+    model = ORTModelForSequenceClassification.from_pretrained(
+        int8_dir, file_name="model_quantized.onnx"
+    )
+    return BiasModel(model, tokenizer, "onnx-int8")
+
+
+def load_backend(name, model_name, onnx_dir=DEFAULT_ONNX_DIR):
+    """
+    Load the bias classifier on the given backend.
+
+    Args:
+        name (str): One of BACKENDS.
+        model_name (str): Hugging Face model ID.
+        onnx_dir (str): Where exported ONNX graphs are cached.
+
+    Returns:
+        BiasModel
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown bias backend '{name}', expected one of {BACKENDS}")
+    if name.startswith("onnx"):
+        return _load_onnx(model_name, name.endswith("int8"), onnx_dir)
+    return _load_pytorch(model_name, name.endswith("int8"))
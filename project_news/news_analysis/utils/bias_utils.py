@@ -1,23 +1,351 @@
-from transformers import pipeline
+import os
+import threading
+
+from . import metrics
+from . import model_registry
+from .batching import MicroBatcher
+from .bias_backends import BACKENDS, DEFAULT_ONNX_DIR, load_backend
+from .config import get_setting
+from .inference_cache import get_cache, make_key
+
+BIAS_MODEL_NAME = "facebook/bart-large-mnli"
+
+# Candidate labels for bias analysis
+CANDIDATE_LABELS = ["left", "right", "center", "neutral", "biased"]
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+# Chunking / batching knobs. BART accepts 1024 tokens per (premise, hypothesis)
+# pair, but attention cost grows quadratically so smaller windows are cheaper.
+CHUNK_TOKENS = int(os.getenv("BIAS_CHUNK_TOKENS", 400))
+CHUNK_OVERLAP = int(os.getenv("BIAS_CHUNK_OVERLAP", 50))
+BATCH_SIZE = int(os.getenv("BIAS_BATCH_SIZE", 16))
+# Upper bound on windows scored per document so very long videos finish in
+# bounded time; windows are sampled evenly across the transcript, not cut off.
+MAX_CHUNKS = int(os.getenv("BIAS_MAX_CHUNKS", 64))
+# Concurrent analyze_bias calls are coalesced into batches of up to this many
+# documents, waiting at most this long for a batch to fill.
+SERVER_MAX_BATCH = int(os.getenv("BIAS_SERVER_MAX_BATCH", 8))
+SERVER_MAX_WAIT_MS = float(os.getenv("BIAS_SERVER_MAX_WAIT_MS", 10))
+
+# Forward passes on the shared model are serialized; torch modules are not
+# safe to call from several threads at once.
+_model_lock = threading.Lock()
+
+
+def current_backend():
+    """The bias backend selected by the BIAS_BACKEND setting (default "pytorch")."""
+    return get_setting("BIAS_BACKEND", "pytorch")
+
+
+def _register_backend(backend):
+    # Loading (and torch/transformers imports) only happens on first use.
+    # Every backend stays loadable (check_parity compares them), but only the
+    # selected one is warmed up.
+    model_registry.register(
+        f"bias-classifier:{backend}",
+        lambda: load_backend(
+            backend, BIAS_MODEL_NAME, str(get_setting("BIAS_ONNX_DIR", DEFAULT_ONNX_DIR))
+        ),
+        active=lambda: current_backend() == backend,
+    )
+
+
+for _backend in BACKENDS:
+    _register_backend(_backend)
+
+
+def get_classifier(backend=None):
+    """Return the shared bias model for a backend, loading it on first use."""
+    return model_registry.get_model(f"bias-classifier:{backend or current_backend()}")
+
+
+def chunk_text(text, tokenizer, max_tokens=CHUNK_TOKENS, overlap=CHUNK_OVERLAP):
+    """
+    Split text into overlapping token windows.
+
+    Args:
+        text (str): The input text to split.
+        tokenizer: A fast Hugging Face tokenizer (offsets are used to slice the
+            original string, so chunks keep the exact source text).
+        max_tokens (int): Tokens per window.
+        overlap (int): Tokens shared between consecutive windows.
+
+    Returns:
+        list[tuple[str, int]]: (chunk text, token count) pairs.
+    """
+    if not text or not text.strip():
+        return []
+    if overlap >= max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+
+    offsets = tokenizer(
+        text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+    )["offset_mapping"]
+    if not offsets:
+        return []
+
+    step = max_tokens - overlap
+    chunks = []
+    for start in range(0, len(offsets), step):
+        window = offsets[start:start + max_tokens]
+        chunks.append((text[window[0][0]:window[-1][1]], len(window)))
+        if start + max_tokens >= len(offsets):
+            break
+    return chunks
+
+
+def _sample_evenly(chunks, limit):
+    if limit <= 0 or len(chunks) <= limit:
+        return chunks
+    stride = len(chunks) / limit
+    return [chunks[int(i * stride)] for i in range(limit)]
+
+
+def _entailment_logits(pairs, batch_size, backend=None):
+    """Score (premise, hypothesis) pairs in padded batches, returning entailment logits."""
+    import torch
+
+    classifier = get_classifier(backend)
+    model = classifier.model
+    tokenizer = classifier.tokenizer
+    entail_id = next(
+        (i for label, i in model.config.label2id.items() if label.lower().startswith("entail")),
+        2,
+    )
+
+    # Sort by length so each padded batch wastes as little compute as possible.
+    order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]))
+    logits = [0.0] * len(pairs)
+
+    with _model_lock, torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = tokenizer(
+                [pairs[i][0] for i in batch],
+                [pairs[i][1] for i in batch],
+                padding=True,
+                truncation="only_first",
+                return_tensors="pt",
+            ).to(model.device)
+            output = model(**inputs).logits[:, entail_id].tolist()
+            for i, value in zip(batch, output):
+                logits[i] = value
+    return logits
+
+
+def _chunk_key(chunk, backend):
+    # Labels are not part of the key: the cached value maps each label scored
+    # so far to its entailment logit, so adding a label only scores that label.
+    return make_key(
+        chunk,
+        BIAS_MODEL_NAME,
+        params={"level": "chunk", "template": HYPOTHESIS_TEMPLATE, "backend": backend or current_backend()},
+    )
+
+
+def _chunk_entailment_logits(chunks, labels, batch_size, backend=None):
+    """
+    Entailment logits per window as [{label: logit}], reusing windows cached
+    by earlier runs (the chunk-level cache survives changes to chunk counts,
+    label sets and the other document-level settings).
+    """
+    cache = get_cache()
+    keys = [_chunk_key(chunk, backend) for chunk in chunks]
+    cached = cache.get_many(keys) if cache is not None else {}
+    known = [dict(cached.get(key) or {}) for key in keys]
+
+    pairs, targets = [], []
+    for i, chunk in enumerate(chunks):
+        for label in labels:
+            if label not in known[i]:
+                pairs.append((chunk, HYPOTHESIS_TEMPLATE.format(label)))
+                targets.append((i, label))
+    if pairs:
+        for (i, label), logit in zip(targets, _entailment_logits(pairs, batch_size, backend)):
+            known[i][label] = logit
+        if cache is not None:
+            cache.set_many(
+                {keys[i]: known[i] for i in {i for i, _ in targets}}, model=BIAS_MODEL_NAME
+            )
+    return known
+
+
+def _score_documents(texts, labels, batch_size, backend=None):
+    import torch
+
+    tokenizer = get_classifier(backend).tokenizer
+    doc_chunks = [
+        _sample_evenly(chunk_text(text, tokenizer), MAX_CHUNKS)
+        for text in texts
+    ]
+
+    chunk_logits = _chunk_entailment_logits(
+        [chunk for chunks in doc_chunks for chunk, _ in chunks], labels, batch_size, backend
+    )
+
+    results = []
+    position = 0
+    for chunks in doc_chunks:
+        totals = torch.zeros(len(labels))
+        weight_sum = 0
+        for _, n_tokens in chunks:
+            logits = torch.tensor([chunk_logits[position][label] for label in labels])
+            position += 1
+            totals += torch.softmax(logits, dim=0) * n_tokens
+            weight_sum += n_tokens
+        scores = (totals / weight_sum).tolist() if weight_sum else [0.0] * len(labels)
+        results.append(dict(zip(labels, scores)))
+    return results
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    """Return the in-process micro-batching server for the default labels."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    lambda texts: _score_documents(texts, CANDIDATE_LABELS, BATCH_SIZE),
+                    max_batch_size=SERVER_MAX_BATCH,
+                    max_wait=SERVER_MAX_WAIT_MS / 1000,
+                    name="bias-batcher",
+                )
+    return _batcher
+
+
+def _score(texts, labels, batch_size):
+    # Default-label requests go through the shared batcher so concurrent
+    # callers (sessions, ingest threads, workers) share forward passes.
+    if list(labels) == CANDIDATE_LABELS and batch_size == BATCH_SIZE:
+        return [future.result() for future in get_batcher().submit_many(texts)]
+    return _score_documents(texts, labels, batch_size)
+
+
+def _cache_key(text, labels):
+    return make_key(
+        text,
+        BIAS_MODEL_NAME,
+        labels=labels,
+        params={
+            "template": HYPOTHESIS_TEMPLATE,
+            "chunk_tokens": CHUNK_TOKENS,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "max_chunks": MAX_CHUNKS,
+            "backend": current_backend(),
+        },
+    )
+
+
+def analyze_bias_many(texts, labels=CANDIDATE_LABELS, batch_size=BATCH_SIZE):
+    """
+    Analyze the bias of several texts in one batched pass.
+
+    Every text is split into overlapping token windows, every (window, label)
+    pair across all texts is scored together in padded batches, and the
+    per-window label distributions are merged with a token-length weighted
+    average. Texts already in the inference cache are not re-scored.
+
+    Args:
+        texts (list[str]): The input texts to analyze.
+        labels (list[str]): Candidate labels.
+        batch_size (int): Number of (window, label) pairs per forward pass.
+
+    Returns:
+        list[dict]: One dict of label: score per input text.
+    """
+    with metrics.stage_timer("bias"):
+        cache = get_cache()
+        if cache is None:
+            return _score(texts, labels, batch_size)
+
+        keys = [_cache_key(text, labels) for text in texts]
+        results = [cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            scored = _score([texts[i] for i in missing], labels, batch_size)
+            for i, result in zip(missing, scored):
+                cache.set(keys[i], result, model=BIAS_MODEL_NAME)
+                results[i] = result
+        return results
+
+
+def analyze_bias_passages(passages, labels=CANDIDATE_LABELS, batch_size=BATCH_SIZE):
+    """
+    Score short passages (e.g. transcript time windows) in one batched pass.
+
+    Unlike analyze_bias_many, each passage is scored as a single window
+    (longer passages are truncated to the model input), so scoring all the
+    windows of a video costs about as much as scoring the chunked document.
+    Windows go through the chunk-level cache.
+
+    Returns:
+        list[dict]: One dict of label: score per passage.
+    """
+    import torch
+
+    passages = list(passages)
+    if not passages:
+        return []
+    with metrics.stage_timer("bias_passages"):
+        chunk_logits = _chunk_entailment_logits(passages, labels, batch_size)
+    results = []
+    for logits in chunk_logits:
+        scores = torch.softmax(torch.tensor([logits[label] for label in labels]), dim=0).tolist()
+        results.append(dict(zip(labels, scores)))
+    return results
 
-# Initialize a zero-shot-classification pipeline using a suitable model
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
 
 def analyze_bias(text: str) -> dict:
     """
     Analyze the bias of the given text using zero-shot classification.
 
+    Long transcripts are chunked rather than truncated; see analyze_bias_many.
+
     Args:
         text (str): The input text to analyze.
 
     Returns:
         dict: A dictionary with labels and their corresponding scores.
     """
-    # Candidate labels for bias analysis
-    candidate_labels = ["left", "right", "center", "neutral", "biased"]
+    return analyze_bias_many([text])[0]
+
+
+def check_parity(backend, texts, reference="pytorch", tolerance=0.05):
+    """
+    Compare a backend's scores with the reference backend on sample texts.
 
-    # Run classification
-    result = classifier(text, candidate_labels)
+    Args:
+        backend (str): Backend under test.
+        texts (list[str]): Sample transcripts.
+        reference (str): Backend treated as ground truth.
+        tolerance (float): Largest acceptable absolute score difference.
+
+    Returns:
+        dict: max/mean absolute score drift, how often the top label agrees,
+        and whether the drift is within tolerance.
+    """
+    expected = _score_documents(texts, CANDIDATE_LABELS, BATCH_SIZE, backend=reference)
+    actual = _score_documents(texts, CANDIDATE_LABELS, BATCH_SIZE, backend=backend)
 
-    # Return the results as a dict with label: score
-    return dict(zip(result['labels'], result['scores']))
+    diffs = [
+        abs(exp[label] - act[label])
+        for exp, act in zip(expected, actual)
+        for label in CANDIDATE_LABELS
+    ]
+    agree = sum(
+        max(exp, key=exp.get) == max(act, key=act.get)
+        for exp, act in zip(expected, actual)
+    )
+    max_diff = max(diffs) if diffs else 0.0
+    return {
+        "backend": backend,
+        "reference": reference,
+        "max_abs_diff": round(max_diff, 4),
+        "mean_abs_diff": round(sum(diffs) / len(diffs), 4) if diffs else 0.0,
+        "top_label_agreement": round(agree / len(texts), 3) if texts else 1.0,
+        "within_tolerance": max_diff <= tolerance,
+    }
@@ -0,0 +1,30 @@
+import zlib
+
+# zstd compresses transcripts a little better and decompresses faster, but it
+# is optional; zlib (the gzip/deflate format) is always available.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_CODEC = "zstd" if zstandard else "zlib"
+
+
+def compress_text(text, codec=DEFAULT_CODEC):
+    data = text.encode("utf-8")
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    raise ValueError(f"Unknown codec '{codec}'")
+
+
+def decompress_text(data, codec):
+    data = bytes(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This transcript is zstd-compressed; pip install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown codec '{codec}'")
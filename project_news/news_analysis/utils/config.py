@@ -0,0 +1,16 @@
+import os
+
+
+def get_setting(name, default=None):
+    """
+    Read a setting from Django settings when they are configured, else from
+    the environment (so utils also work in plain scripts).
+    """
+    try:
+        from django.conf import settings
+
+        if settings.configured and hasattr(settings, name):
+            return getattr(settings, name)
+    except ImportError:
+        pass
+    return os.getenv(name, default)
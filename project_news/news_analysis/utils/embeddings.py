@@ -0,0 +1,99 @@
+import os
+import threading
+
+import numpy as np
+
+from . import model_registry
+from .bias_utils import _sample_evenly, chunk_text
+from .config import get_setting
+
+# Small sentence-embedding model (22M parameters, 384-d output) that runs
+# comfortably on CPU next to the bias classifier.
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# MiniLM was trained on inputs up to 256 tokens; long transcripts are
+# embedded window by window and the windows averaged.
+EMBEDDING_CHUNK_TOKENS = int(os.getenv("EMBEDDING_CHUNK_TOKENS", 256))
+EMBEDDING_MAX_CHUNKS = int(os.getenv("EMBEDDING_MAX_CHUNKS", 16))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+
+_model_lock = threading.Lock()
+
+
+class EmbeddingModel:
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+
+    @property
+    def dim(self):
+        return self.model.config.hidden_size
+
+
+def _load():
+    from transformers import AutoModel, AutoTokenizer
+
+    model_name = get_setting("EMBEDDING_MODEL", EMBEDDING_MODEL_NAME)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+    return EmbeddingModel(model, AutoTokenizer.from_pretrained(model_name))
+
+
+def _in_use():
+    # Imported here: news_analysis.similarity imports this module.
+    from news_analysis.similarity import embeddings_enabled
+
+    return embeddings_enabled()
+
+
+model_registry.register("sentence-embedder", _load, active=_in_use)
+
+
+def get_embedder():
+    return model_registry.get_model("sentence-embedder")
+
+
+def embed_texts(texts, batch_size=EMBEDDING_BATCH_SIZE):
+    """
+    Embed documents into unit-length float32 vectors.
+
+    Each document is split into windows of EMBEDDING_CHUNK_TOKENS tokens (at
+    most EMBEDDING_MAX_CHUNKS, sampled evenly); the mean-pooled window
+    embeddings are averaged, weighted by token count.
+
+    Returns:
+        np.ndarray: Shape (len(texts), dim). Empty texts get a zero vector.
+    """
+    import torch
+
+    embedder = get_embedder()
+    sums = np.zeros((len(texts), embedder.dim), dtype=np.float32)
+    # The lock also covers tokenization: a fast tokenizer cannot be used from
+    # several threads at once ("Already borrowed").
+    with _model_lock, torch.inference_mode():
+        doc_chunks = [
+            _sample_evenly(chunk_text(text, embedder.tokenizer, EMBEDDING_CHUNK_TOKENS, 32), EMBEDDING_MAX_CHUNKS)
+            for text in texts
+        ]
+        flat = [(doc, chunk, n_tokens) for doc, chunks in enumerate(doc_chunks) for chunk, n_tokens in chunks]
+        # Sort by length so padded batches waste little compute.
+        flat.sort(key=lambda item: item[2])
+
+        for start in range(0, len(flat), batch_size):
+            batch = flat[start:start + batch_size]
+            inputs = embedder.tokenizer(
+                [chunk for _, chunk, _ in batch],
+                padding=True,
+                truncation=True,
+                max_length=EMBEDDING_CHUNK_TOKENS + 2,
+                return_tensors="pt",
+            )
+            hidden = embedder.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            pooled = torch.nn.functional.normalize(pooled, dim=1).numpy()
+            for (doc, _, n_tokens), vector in zip(batch, pooled):
+                sums[doc] += vector * n_tokens
+
+    norms = np.linalg.norm(sums, axis=1, keepdims=True)
+    return np.where(norms > 0, sums / np.maximum(norms, 1e-12), 0.0).astype(np.float32)
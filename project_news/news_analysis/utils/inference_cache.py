@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from dotenv import load_dotenv
+
+from . import metrics
+
+load_dotenv()
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "inference_cache.sqlite3",
+)
+CACHE_PATH = os.getenv("INFERENCE_CACHE_PATH", DEFAULT_CACHE_PATH)
+# Bias scores are also cached per transcript window (dozens per video).
+CACHE_MAX_ENTRIES = int(os.getenv("INFERENCE_CACHE_MAX_ENTRIES", 200000))
+CACHE_ENABLED = os.getenv("INFERENCE_CACHE_ENABLED", "1") != "0"
+
+# Eviction needs an index scan, so only run it every N writes.
+_EVICT_EVERY = 100
+# SQLite limits the number of bound parameters per statement.
+_MAX_PARAMS = 500
+
+LOOKUPS = metrics.counter("inference_cache_lookups_total", "Inference cache lookups by result (hit/miss).")
+WRITES = metrics.counter("inference_cache_writes_total", "Entries written to the inference cache.")
+
+
+def normalize_text(text):
+    """Normalize text so trivially different copies of a transcript share a key."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return " ".join(text.split())
+
+
+def make_key(text, model, labels=None, params=None):
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        text (str): Model input; normalized before hashing.
+        model (str): Model name.
+        labels (list[str]): Candidate labels, if any (order-insensitive).
+        params (dict): Any other parameters that change the output.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    payload = json.dumps(
+        {
+            "text": text_hash,
+            "model": model,
+            "labels": sorted(labels or []),
+            "params": params or {},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InferenceCache:
+    """
+    Persistent, size-bounded LRU cache of model outputs stored in SQLite.
+
+    Values must be JSON serializable. Each thread gets its own connection.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS inference_cache ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " hit_count INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS inference_cache_last_used"
+                " ON inference_cache (last_used)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value FROM inference_cache WHERE key = ?", (key,)
+        ).fetchone()
+        LOOKUPS.inc(result="miss" if row is None else "hit")
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        with conn:
+            conn.execute(
+                "UPDATE inference_cache SET last_used = ?, hit_count = hit_count + 1"
+                " WHERE key = ?",
+                (time.time(), key),
+            )
+        return json.loads(row[0])
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached, in one query per 500 keys."""
+        conn = self._connection()
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), _MAX_PARAMS):
+            batch = keys[start:start + _MAX_PARAMS]
+            found.update(conn.execute(
+                f"SELECT key, value FROM inference_cache WHERE key IN ({', '.join('?' * len(batch))})",
+                batch,
+            ).fetchall())
+        LOOKUPS.inc(len(found), result="hit")
+        LOOKUPS.inc(len(keys) - len(found), result="miss")
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        if found:
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE inference_cache SET last_used = ?, hit_count = hit_count + 1 WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+        return {key: json.loads(value) for key, value in found.items()}
+
+    def set(self, key, value, model=""):
+        self.set_many({key: value}, model=model)
+
+    def set_many(self, values, model=""):
+        """Store several {key: value} entries in one transaction."""
+        if not values:
+            return
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO inference_cache"
+                " (key, model, value, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(key, model, json.dumps(value), now, now) for key, value in values.items()],
+            )
+        WRITES.inc(len(values))
+        with self._lock:
+            before = self._writes
+            self._writes += len(values)
+            evict = before // _EVICT_EVERY != self._writes // _EVICT_EVERY or before == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM inference_cache WHERE key IN ("
+                " SELECT key FROM inference_cache ORDER BY last_used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def get_or_compute(self, key, compute, model=""):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, model=model)
+        return value
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM inference_cache")
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        entries = self._connection().execute(
+            "SELECT COUNT(*) FROM inference_cache"
+        ).fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache, or None when INFERENCE_CACHE_ENABLED=0."""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InferenceCache()
+    return _cache
@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    Retrying,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from . import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+HF_INFERENCE_URL = "https://api-inference.huggingface.co/models/{model}"
+
+CONNECT_TIMEOUT = float(os.getenv("HF_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HF_READ_TIMEOUT", 60))
+MAX_ATTEMPTS = int(os.getenv("HF_MAX_ATTEMPTS", 5))
+MAX_CONCURRENCY = int(os.getenv("HF_MAX_CONCURRENCY", 4))
+
+# 503 is what the Inference API returns while a model is still loading.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+REQUESTS = metrics.counter("inference_requests_total", "Inference API calls by model and final status.")
+RETRIES = metrics.counter("inference_retries_total", "Inference API attempts that were retried.")
+REQUEST_SECONDS = metrics.histogram(
+    "inference_request_seconds", "Inference API call latency by model, including retries and queueing."
+)
+
+
+class InferenceClient:
+    """
+    Shared HTTP client for the Hugging Face Inference API.
+
+    One pooled keep-alive session is reused for every call. Requests have
+    connect/read timeouts, are retried with jittered exponential backoff on
+    connection errors and retryable statuses, and at most ``max_concurrency``
+    run at once so one slow endpoint cannot tie up every thread.
+    """
+
+    def __init__(
+        self,
+        token=None,
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        max_attempts=MAX_ATTEMPTS,
+        max_concurrency=MAX_CONCURRENCY,
+    ):
+        self.token = token or os.getenv("HF_API_TOKEN") or os.getenv("HUGGING_FACE_TOKEN")
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_concurrency, 10))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _retrying(self):
+        return Retrying(
+            retry=(
+                retry_if_exception_type((requests.ConnectionError, requests.Timeout))
+                | retry_if_result(lambda response: response.status_code in RETRY_STATUSES)
+            ),
+            wait=wait_random_exponential(multiplier=0.5, max=20),
+            stop=stop_after_attempt(self.max_attempts),
+            # Once attempts run out, hand back the last response (or raise the
+            # last exception) so callers can report the status code as before.
+            retry_error_callback=lambda state: state.outcome.result(),
+            before_sleep=self._before_retry,
+        )
+
+    @staticmethod
+    def _before_retry(state):
+        RETRIES.inc()
+        logger.warning(
+            "Retrying inference call (attempt %d): %s",
+            state.attempt_number,
+            state.outcome.exception() or state.outcome.result().status_code,
+        )
+
+    def post(self, url, payload, token=None, model=""):
+        """
+        POST a JSON payload to an inference endpoint.
+
+        Args:
+            url (str): Full endpoint URL (see model_url()).
+            payload (dict): JSON body.
+            token (str): Overrides the client's API token for this call.
+            model (str): Model name, used to label metrics.
+
+        Returns:
+            requests.Response: The final response after any retries.
+        """
+        headers = {
+            "Authorization": f"Bearer {token or self.token}",
+            "Content-Type": "application/json",
+        }
+        started = time.perf_counter()
+        status = "error"
+        try:
+            with self._slots:
+                response = self._retrying()(
+                    self.session.post, url, headers=headers, json=payload, timeout=self.timeout
+                )
+            status = response.status_code
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS.inc(model=model, status=status)
+            REQUEST_SECONDS.observe(elapsed, model=model)
+        logger.info("POST %s -> %s in %.0f ms", url, response.status_code, elapsed * 1000)
+        return response
+
+    def query(self, model, payload, token=None):
+        """POST a payload to the hosted model called ``model``."""
+        return self.post(model_url(model), payload, token=token, model=model)
+
+
+def model_url(model):
+    return HF_INFERENCE_URL.format(model=model)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_inference_client():
+    """Return the process-wide InferenceClient."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient()
+    return _client
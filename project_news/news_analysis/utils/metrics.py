@@ -0,0 +1,329 @@
+"""
+Process-wide counters, histograms and timers.
+
+Metrics are created once at import time (``counter(...)``/``histogram(...)``
+return the existing metric when called again with the same name) and
+updated from any thread. Each update is a dict lookup and a few additions
+under a lock, cheap enough to wrap every network call and model batch.
+
+Web, Streamlit, worker and ingest processes each keep their own numbers.
+With METRICS_DIR set, every process writes a snapshot there every
+METRICS_FLUSH_SECONDS (and on exit), and collect() sums the snapshots of all
+processes, so /metrics and the Streamlit panel show the whole deployment.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+
+from .config import get_setting
+
+# Seconds; spans a cache lookup up to a long transcript on CPU.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Items per model batch.
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Snapshots of processes that stopped writing this long ago are deleted.
+RETENTION_SECONDS = 7 * 24 * 3600
+
+_metrics = {}
+_registry_lock = threading.Lock()
+_started = int(time.time())
+_flusher = None
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """[(labels dict, value)] for every label combination seen so far."""
+        with self._lock:
+            return [(dict(key), self._copy(value)) for key, value in self._values.items()]
+
+    def _copy(self, value):
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. API calls or cache hits."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.started
+        self.histogram.observe(self.seconds, **self.labels)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in fixed buckets (Prometheus style:
+    cumulative counts are computed when rendering).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            entry["counts"][index] += 1
+            entry["sum"] += value
+
+    def time(self, **labels):
+        """Context manager that observes the seconds spent in its block."""
+        return _Timer(self, labels)
+
+    def _copy(self, value):
+        return {"counts": list(value["counts"]), "sum": value["sum"]}
+
+
+def _get_or_create(cls, name, help, **kwargs):
+    with _registry_lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, help, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+        return metric
+
+
+def counter(name, help):
+    return _get_or_create(Counter, name, help)
+
+
+def histogram(name, help, buckets=DEFAULT_BUCKETS):
+    return _get_or_create(Histogram, name, help, buckets=buckets)
+
+
+# Wall time of each analysis stage (fetch, transcript, sentiment, bias,
+# embedding, db_write, ...), shared by the modules that run them.
+STAGE_SECONDS = histogram("pipeline_stage_seconds", "Time spent in each analysis stage.")
+
+
+def stage_timer(stage):
+    """Time a block as one run of ``stage``: ``with stage_timer("bias"): ...``."""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def reset():
+    """Zero every metric in this process."""
+    for metric in list(_metrics.values()):
+        metric.clear()
+
+
+# -- snapshots ---------------------------------------------------------------
+
+def snapshot():
+    """This process's metrics as a JSON-serializable dict."""
+    metrics = {}
+    for name, metric in list(_metrics.items()):
+        entry = {"type": metric.kind, "help": metric.help, "samples": metric.samples()}
+        if metric.kind == "histogram":
+            entry["buckets"] = list(metric.buckets)
+        metrics[name] = entry
+    return {"pid": os.getpid(), "time": time.time(), "metrics": metrics}
+
+
+def merge(snapshots):
+    """Sum several snapshots: counters and histogram buckets add up per label set."""
+    merged = {}
+    for snap in snapshots:
+        for name, entry in snap["metrics"].items():
+            target = merged.setdefault(name, {**entry, "samples": {}})
+            if entry.get("buckets") != target.get("buckets"):
+                continue  # bucket layout changed between releases; skip stale data
+            for labels, value in entry["samples"]:
+                key = _label_key(labels)
+                if entry["type"] == "histogram":
+                    current = target["samples"].setdefault(
+                        key, {"counts": [0] * len(value["counts"]), "sum": 0.0}
+                    )
+                    current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                    current["sum"] += value["sum"]
+                else:
+                    target["samples"][key] = target["samples"].get(key, 0) + value
+    for entry in merged.values():
+        entry["samples"] = [(dict(key), value) for key, value in entry["samples"].items()]
+    return {"metrics": merged}
+
+
+def metrics_dir():
+    path = get_setting("METRICS_DIR", "")
+    return str(path) if path else None
+
+
+def _snapshot_path(path):
+    return os.path.join(path, f"{os.getpid()}-{_started}.json")
+
+
+def flush():
+    """Write this process's snapshot to METRICS_DIR (no-op when unset)."""
+    path = metrics_dir()
+    if not path:
+        return
+    snap = snapshot()
+    if not any(entry["samples"] for entry in snap["metrics"].values()):
+        return
+    os.makedirs(path, exist_ok=True)
+    target = _snapshot_path(path)
+    with open(target + ".tmp", "w") as f:
+        json.dump(snap, f)
+    os.replace(target + ".tmp", target)
+
+
+def collect():
+    """
+    Metrics of every process that wrote to METRICS_DIR plus this one (live),
+    merged. Without METRICS_DIR, just this process.
+    """
+    snapshots = [snapshot()]
+    path = metrics_dir()
+    if path and os.path.isdir(path):
+        own = _snapshot_path(path)
+        for name in os.listdir(path):
+            file = os.path.join(path, name)
+            if not name.endswith(".json") or file == own:
+                continue
+            try:
+                if time.time() - os.path.getmtime(file) > RETENTION_SECONDS:
+                    os.remove(file)
+                    continue
+                with open(file) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # removed or half-written meanwhile
+    return merge(snapshots)
+
+
+def start_flusher(interval=None):
+    """Flush every ``interval`` seconds from a daemon thread, and once at exit."""
+    global _flusher
+    if not metrics_dir() or _flusher is not None:
+        return
+    interval = float(interval or get_setting("METRICS_FLUSH_SECONDS", 10))
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                flush()
+            except OSError:
+                pass
+
+    _flusher = threading.Thread(target=run, name="metrics-flusher", daemon=True)
+    _flusher.start()
+    atexit.register(flush)
+
+
+# -- output ------------------------------------------------------------------
+
+def _format_labels(labels, extra=None):
+    items = sorted(labels.items()) + (extra or [])
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def render(collected):
+    """Render collected metrics in the Prometheus text exposition format."""
+    lines = []
+    for name, entry in sorted(collected["metrics"].items()):
+        if not entry["samples"]:
+            continue
+        lines.append(f"# HELP {name} {entry['help']}")
+        lines.append(f"# TYPE {name} {entry['type']}")
+        for labels, value in entry["samples"]:
+            if entry["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(entry["buckets"]) + ["+Inf"], value["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def quantile(buckets, counts, q):
+    """Estimate a quantile from bucket counts, interpolating inside the bucket."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank, seen = q * total, 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if i == len(buckets):
+                return buckets[-1]  # beyond the last bound; report the bound
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (buckets[i] - lower) * (rank - seen) / count
+        seen += count
+    return buckets[-1]
+
+
+def summary(collected):
+    """
+    Flatten collected metrics into table rows for display.
+
+    Returns:
+        tuple[list[dict], list[dict]]: Histogram rows (count, mean/p50/p95 in
+        ms for second-valued metrics) and counter rows.
+    """
+    histograms, counters = [], []
+    for name, entry in sorted(collected["metrics"].items()):
+        for labels, value in entry["samples"]:
+            label = ", ".join(f"{k}={v}" for k, v in sorted(labels.items()))
+            if entry["type"] != "histogram":
+                counters.append({"metric": name, "labels": label, "value": value})
+                continue
+            count = sum(value["counts"])
+            scale = 1000 if name.endswith("_seconds") else 1
+            histograms.append({
+                "metric": name,
+                "labels": label,
+                "count": count,
+                "mean": round(value["sum"] / count * scale, 2) if count else 0.0,
+                "p50": round(quantile(entry["buckets"], value["counts"], 0.5) * scale, 2),
+                "p95": round(quantile(entry["buckets"], value["counts"], 0.95) * scale, 2),
+                "unit": "ms" if scale == 1000 else "",
+            })
+    return histograms, counters
@@ -0,0 +1,125 @@
+import gc
+import os
+import resource
+import sys
+import threading
+import time
+
+from . import metrics
+
+# Process-wide registry of heavy models. Loaders are registered by name at
+# import time (cheap) and only run the first time get_model() asks for them,
+# so importing utils, running manage.py or rerunning Streamlit never pays for
+# a model load it does not use.
+_loaders = {}
+_active = {}
+_models = {}
+_load_seconds = {}
+_lock = threading.RLock()
+
+LOAD_SECONDS = metrics.histogram("model_load_seconds", "Time to load a model into memory.")
+
+
+def register(name, loader, active=None):
+    """
+    Register a zero-argument loader for a model.
+
+    Args:
+        name (str): Registry key.
+        loader (callable): Builds and returns the model object.
+        active (callable): Returns whether the current settings use the
+            model (e.g. only the selected bias backend); warmup() loads only
+            those. Models without it are always used.
+    """
+    with _lock:
+        _loaders[name] = loader
+        _active[name] = active
+
+
+def get_model(name):
+    """
+    Return the shared instance of a model, loading it on first use.
+
+    Args:
+        name (str): Registry key passed to register().
+
+    Returns:
+        The loaded model object.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        # Another thread may have finished loading while we waited.
+        if name in _models:
+            return _models[name]
+        if name not in _loaders:
+            raise KeyError(f"No model registered under '{name}'")
+        started = time.perf_counter()
+        _models[name] = _loaders[name]()
+        _load_seconds[name] = time.perf_counter() - started
+        LOAD_SECONDS.observe(_load_seconds[name], model=name)
+        return _models[name]
+
+
+def active_models():
+    """Names of the registered models that the current settings use."""
+    with _lock:
+        registered = list(_active.items())
+    return [name for name, active in registered if active is None or active()]
+
+
+def warmup(*names):
+    """Eagerly load the given models (by default every model in active_models())."""
+    for name in names or active_models():
+        get_model(name)
+
+
+def unload(*names):
+    """Drop the given models (all loaded models if none given) and free their memory."""
+    with _lock:
+        for name in names or list(_models):
+            _models.pop(name, None)
+            _load_seconds.pop(name, None)
+    gc.collect()
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is the peak, reported in KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _model_bytes(model):
+    # Pipelines wrap the torch module; plain torch modules expose parameters().
+    module = getattr(model, "model", model)
+    if not hasattr(module, "parameters"):
+        return None
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def memory_usage():
+    """
+    Report process memory and the weight footprint of each loaded model.
+
+    Returns:
+        dict: {"rss_mb": float, "models": {name: {"weights_mb", "load_seconds"}}}
+    """
+    models = {}
+    for name, model in list(_models.items()):
+        size = _model_bytes(model)
+        models[name] = {
+            "weights_mb": round(size / 2**20, 1) if size is not None else None,
+            "load_seconds": round(_load_seconds.get(name, 0.0), 2),
+        }
+    return {"rss_mb": round(_rss_bytes() / 2**20, 1), "models": models}
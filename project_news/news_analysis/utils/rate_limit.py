@@ -0,0 +1,69 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``
+    (the burst size); acquire() takes one, sleeping until it is available.
+    A rate of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take ``tokens`` if available now; return whether they were taken."""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Take ``tokens``, waiting as long as needed, or at most ``timeout``
+        seconds.
+
+        Returns:
+            float: Seconds spent waiting, or None (without waiting) when the
+            tokens would not be available within ``timeout``.
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            if timeout is not None and waited + delay > timeout:
+                return None
+            self._sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds):
+        """Drain the bucket so no call goes out for ``seconds`` (after a throttling error)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
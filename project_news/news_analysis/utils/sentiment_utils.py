@@ -1,29 +1,331 @@
-import requests
 import json
+import logging
 import os
+import re
+import threading
+
 from dotenv import load_dotenv
 
+from . import metrics
+from . import model_registry
+from .batching import MicroBatcher
+from .config import get_setting
+from .inference_cache import get_cache, make_key
+from .inference_client import get_inference_client
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 HUGGING_FACE_TOKEN = os.getenv('HUGGING_FACE_TOKEN')
+HF_API_TOKEN = os.getenv("HF_API_TOKEN")
 MODEL_NAME = "meta-llama/Llama-3.3-70B-Instruct"
+SENTIMENT_PROMPT = "Sentiment analysis: {}"
+# Without return_full_text=False the answer starts with the prompt, i.e. the
+# transcript itself.
+SENTIMENT_PARAMETERS = {"max_length": 50, "return_full_text": False}
+_LLM_LABEL_RE = re.compile(r"\b(negative|positive|neutral)\b", re.IGNORECASE)
 
-def analyze_sentiment(text):
-    headers = {
-        "Authorization": f"Bearer {HUGGING_FACE_TOKEN}",
-        "Content-Type": "application/json"
+# Local three-class (negative / neutral / positive) RoBERTa-base classifier.
+LOCAL_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+SENTIMENT_LABELS = ("NEGATIVE", "NEUTRAL", "POSITIVE")
+
+# The model was trained on short texts, so transcripts are scored in windows
+# of SENTIMENT_CHUNK_TOKENS tokens (at most SENTIMENT_MAX_CHUNKS per document,
+# sampled evenly) and the window scores averaged by token count.
+SENTIMENT_CHUNK_TOKENS = int(os.getenv("SENTIMENT_CHUNK_TOKENS", 256))
+SENTIMENT_MAX_CHUNKS = int(os.getenv("SENTIMENT_MAX_CHUNKS", 12))
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", 32))
+SERVER_MAX_BATCH = int(os.getenv("SENTIMENT_SERVER_MAX_BATCH", 8))
+# Comments are short; longer ones are truncated rather than windowed.
+COMMENT_MAX_TOKENS = int(os.getenv("SENTIMENT_COMMENT_MAX_TOKENS", 128))
+SERVER_MAX_WAIT_MS = float(os.getenv("SENTIMENT_SERVER_MAX_WAIT_MS", 10))
+
+_model_lock = threading.Lock()
+
+
+def current_backend():
+    """The sentiment backend selected by the SENTIMENT_BACKEND setting: "local" or "llm"."""
+    return get_setting("SENTIMENT_BACKEND", "local")
+
+
+class SentimentModel:
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+        # Map model output indices to NEGATIVE / NEUTRAL / POSITIVE.
+        self.label_index = {
+            label.upper(): int(i) for i, label in model.config.id2label.items()
+        }
+
+
+def local_model_name():
+    """The local classifier named by the SENTIMENT_MODEL setting."""
+    return get_setting("SENTIMENT_MODEL", LOCAL_MODEL_NAME)
+
+
+def _load_local_model():
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model_name = local_model_name()
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    return SentimentModel(model, AutoTokenizer.from_pretrained(model_name))
+
+
+model_registry.register("sentiment-classifier", _load_local_model, active=lambda: current_backend() == "local")
+
+
+def _label_probabilities(model, probs):
+    """Per-label probabilities, tolerating models whose labels are LABEL_0..2."""
+    if all(label in model.label_index for label in SENTIMENT_LABELS):
+        return [probs[model.label_index[label]] for label in SENTIMENT_LABELS]
+    return list(probs[:len(SENTIMENT_LABELS)])
+
+
+def _score_sentiment_documents(texts, batch_size=SENTIMENT_BATCH_SIZE):
+    """
+    Score transcripts with the local classifier.
+
+    All windows of all texts are scored together in length-sorted padded
+    batches, then merged per text with a token-weighted average.
+    """
+    import torch
+
+    from .bias_utils import _sample_evenly, chunk_text
+
+    model = model_registry.get_model("sentiment-classifier")
+    sums = [[0.0] * len(SENTIMENT_LABELS) for _ in texts]
+    weights = [0] * len(texts)
+    # Tokenizers are not thread-safe either, so chunking is done under the lock.
+    with _model_lock, torch.inference_mode():
+        windows = [
+            (doc, chunk, n_tokens)
+            for doc, text in enumerate(texts)
+            for chunk, n_tokens in _sample_evenly(
+                chunk_text(text, model.tokenizer, SENTIMENT_CHUNK_TOKENS, 32), SENTIMENT_MAX_CHUNKS
+            )
+        ]
+        windows.sort(key=lambda window: window[2])
+        for start in range(0, len(windows), batch_size):
+            batch = windows[start:start + batch_size]
+            inputs = model.tokenizer(
+                [chunk for _, chunk, _ in batch],
+                padding=True,
+                truncation=True,
+                max_length=SENTIMENT_CHUNK_TOKENS + 2,
+                return_tensors="pt",
+            )
+            probs = torch.softmax(model.model(**inputs).logits, dim=-1).tolist()
+            for (doc, _, n_tokens), row in zip(batch, probs):
+                for i, p in enumerate(_label_probabilities(model, row)):
+                    sums[doc][i] += p * n_tokens
+                weights[doc] += n_tokens
+
+    results = []
+    for total, weight in zip(sums, weights):
+        if not weight:
+            results.append({"label": "NEUTRAL", "score": 0.0, "scores": {}})
+            continue
+        scores = dict(zip(SENTIMENT_LABELS, (value / weight for value in total)))
+        results.append({
+            "label": max(scores, key=scores.get),
+            # Polarity in [-1, 1]: P(positive) - P(negative)
+            "score": round(scores["POSITIVE"] - scores["NEGATIVE"], 4),
+            "scores": {label: round(value, 4) for label, value in scores.items()},
+        })
+    return results
+
+
+def score_short_texts(texts, batch_size=SENTIMENT_BATCH_SIZE, max_tokens=COMMENT_MAX_TOKENS):
+    """
+    Score short texts such as comments with the local classifier.
+
+    Each text is truncated to ``max_tokens`` tokens; texts are scored in
+    length-sorted padded batches.
+
+    Returns:
+        list[dict]: {"label", "score"} per text, as score_sentiment_many.
+    """
+    import torch
+
+    model = model_registry.get_model("sentiment-classifier")
+    results = [None] * len(texts)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    with _model_lock, torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = model.tokenizer(
+                [texts[i] for i in batch],
+                padding=True,
+                truncation=True,
+                max_length=max_tokens,
+                return_tensors="pt",
+            )
+            probs = torch.softmax(model.model(**inputs).logits, dim=-1).tolist()
+            for i, row in zip(batch, probs):
+                scores = dict(zip(SENTIMENT_LABELS, _label_probabilities(model, row)))
+                results[i] = {
+                    "label": max(scores, key=scores.get),
+                    "score": scores["POSITIVE"] - scores["NEGATIVE"],
+                }
+    return results
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    """Return the in-process micro-batching server for the local sentiment model."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    _score_sentiment_documents,
+                    max_batch_size=SERVER_MAX_BATCH,
+                    max_wait=SERVER_MAX_WAIT_MS / 1000,
+                    name="sentiment-batcher",
+                )
+    return _batcher
+
+
+def normalize_llm_sentiment(result):
+    """
+    Turn the LLM's free-text answer into {"label", "score"} like the local
+    model's output (score is +1, -1 or 0). The first label word of the
+    answer counts; answers without one are NEUTRAL. Errors are passed
+    through.
+    """
+    if "error" in result:
+        return result
+    match = _LLM_LABEL_RE.search(result.get("label", ""))
+    label = match.group(1).upper() if match else "NEUTRAL"
+    return {"label": label, "score": {"NEGATIVE": -1.0, "POSITIVE": 1.0, "NEUTRAL": 0.0}[label]}
+
+
+def _query_llama_sentiment(text):
+    payload = {
+        "inputs": SENTIMENT_PROMPT.format(text),
+        "parameters": SENTIMENT_PARAMETERS
     }
+
+    try:
+        response = get_inference_client().query(MODEL_NAME, payload, token=HF_API_TOKEN)
+    except Exception as e:
+        return {"error": f"Failed to analyze sentiment: {e}"}
+
+    if response.status_code == 200:
+        output = response.json()[0]['generated_text']
+        return {"label": output.strip()}
+    else:
+        return {"error": f"Failed to analyze sentiment: {response.status_code}"}
+
+
+def analyze_sentiment_with_llama(text):
+    """
+    Ask the hosted Llama model for the sentiment of a transcript.
+
+    Successful answers are stored in the inference cache, so re-uploads and
+    syndicated copies of the same text skip the remote call.
+
+    Returns:
+        dict: {"label": ...} on success, {"error": ...} otherwise.
+    """
+    cache = get_cache()
+    if cache is None:
+        return _query_llama_sentiment(text)
+
+    key = make_key(
+        text,
+        MODEL_NAME,
+        params={"prompt": SENTIMENT_PROMPT, **SENTIMENT_PARAMETERS},
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = _query_llama_sentiment(text)
+    if "error" not in result:
+        cache.set(key, result, model=MODEL_NAME)
+    return result
+
+
+def _local_cache_key(text, model_name):
+    return make_key(
+        text,
+        model_name,
+        params={
+            "chunk_tokens": SENTIMENT_CHUNK_TOKENS,
+            "max_chunks": SENTIMENT_MAX_CHUNKS,
+        },
+    )
+
+
+def _score_local(texts):
+    cache = get_cache()
+    model_name = local_model_name()
+    keys = [_local_cache_key(text, model_name) for text in texts] if cache else []
+    results = [cache.get(key) for key in keys] if cache else [None] * len(texts)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        futures = get_batcher().submit_many([texts[i] for i in missing])
+        for i, future in zip(missing, futures):
+            results[i] = future.result()
+            if cache:
+                cache.set(keys[i], results[i], model=model_name)
+    return results
+
+
+def score_sentiment_many(texts):
+    """
+    Score the sentiment of several transcripts.
+
+    Uses the local classifier unless SENTIMENT_BACKEND is "llm". If the local
+    model fails (e.g. it cannot be downloaded) and SENTIMENT_LLM_FALLBACK is
+    on, the hosted LLM is asked instead.
+
+    Returns:
+        list[dict]: {"label": "POSITIVE" | "NEUTRAL" | "NEGATIVE",
+        "score": polarity in [-1, 1], "backend": "local" | "llm"} per text,
+        or {"error": ...} when the LLM call failed. "backend" names the
+        backend that produced the score, which differs from current_backend()
+        after a fallback; analysis_version() takes it to stamp the row.
+    """
+    with metrics.stage_timer("sentiment"):
+        if current_backend() == "llm":
+            return _score_llm(texts)
+        try:
+            return [dict(result, backend="local") for result in _score_local(texts)]
+        except Exception:
+            if str(get_setting("SENTIMENT_LLM_FALLBACK", "0")) in ("0", "False", "false"):
+                raise
+            logger.exception("Local sentiment model failed; falling back to %s", MODEL_NAME)
+            return _score_llm(texts)
+
+
+def _score_llm(texts):
+    results = [normalize_llm_sentiment(analyze_sentiment_with_llama(text)) for text in texts]
+    return [result if "error" in result else dict(result, backend="llm") for result in results]
+
+
+def score_sentiment(text):
+    """Score the sentiment of one transcript. See score_sentiment_many."""
+    return score_sentiment_many([text])[0]
+
+
+def analyze_sentiment(text):
     payload = {
         "inputs": text,
         "parameters": {
             "max_length": 50
         }
     }
-    response = requests.post(
-        f"https://api-inference.huggingface.co/models/{MODEL_NAME}",
-        headers=headers,
-        json=payload
-    )
+    try:
+        response = get_inference_client().query(MODEL_NAME, payload, token=HUGGING_FACE_TOKEN)
+    except Exception as e:
+        return f"Error: {e}"
     if response.status_code == 200:
         output = response.json()[0]['generated_text']
         return output
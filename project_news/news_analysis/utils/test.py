@@ -1,8 +1,10 @@
-import requests
-import json
+# Smoke test for the hosted Llama endpoint. Run from project_news/:
+#   python -m news_analysis.utils.test
 import os
 from dotenv import load_dotenv
 
+from news_analysis.utils.inference_client import get_inference_client
+
 load_dotenv()
 
 HUGGING_FACE_TOKEN = os.getenv('HUGGING_FACE_TOKEN')
@@ -11,11 +13,6 @@ model_name = "meta-llama/Llama-3.3-70B-Instruct"
 
 input_text = "Hello, how are you?"
 
-headers = {
-    "Authorization": f"Bearer {HUGGING_FACE_TOKEN}",
-    "Content-Type": "application/json"
-}
-
 payload = {
     "inputs": input_text,
     "parameters": {
@@ -23,14 +20,11 @@ payload = {
     }
 }
 
-response = requests.post(
-    f"https://api-inference.huggingface.co/models/{model_name}",
-    headers=headers,
-    json=payload
-)
-
-if response.status_code == 200:
-    output = response.json()[0]['generated_text']
-    print(output)
-else:
-    print(f"Error: {response.status_code}")
\ No newline at end of file
+if __name__ == "__main__":
+    response = get_inference_client().query(model_name, payload, token=HUGGING_FACE_TOKEN)
+
+    if response.status_code == 200:
+        output = response.json()[0]['generated_text']
+        print(output)
+    else:
+        print(f"Error: {response.status_code}")
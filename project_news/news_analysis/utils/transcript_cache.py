@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import threading
+import time
+
+from . import metrics
+from .compression import DEFAULT_CODEC, compress_text, decompress_text
+from .config import get_setting
+
+# Videos without a transcript are remembered as well, but asked about again
+# after this long in case captions were added.
+MISSING_TTL_SECONDS = 7 * 24 * 3600
+
+LOOKUPS = metrics.counter(
+    "transcript_cache_lookups_total", "Transcript cache lookups by result (hit, missing, miss)."
+)
+
+
+def _safe(part):
+    return re.sub(r"[^A-Za-z0-9_+-]", "_", part)
+
+
+class TranscriptCache:
+    """
+    Fetched transcripts on disk: one compressed file per (video ID, language)
+    holding the segment list with timestamps.
+
+    Files live in ``<path>/<first two characters of the ID>/`` and are named
+    ``<video_id>.<language>.<codec>``; a video known to have no transcript
+    gets a small ``<video_id>.<language>.missing`` file instead. Writes go
+    through a temporary file and os.replace(), so several processes can share
+    the directory and readers never see a partial file.
+    """
+
+    def __init__(self, path, missing_ttl=MISSING_TTL_SECONDS, clock=time.time):
+        self.path = str(path)
+        self.missing_ttl = missing_ttl
+        self._clock = clock
+
+    def _file(self, video_id, language, suffix):
+        video_id, language = _safe(video_id), _safe(language)
+        return os.path.join(self.path, video_id[:2], f"{video_id}.{language}.{suffix}")
+
+    def _write(self, file, data):
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        tmp = f"{file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, file)
+
+    def _missing_reason(self, video_id, language):
+        file = self._file(video_id, language, "missing")
+        try:
+            with open(file) as f:
+                missing = json.load(f)
+            # Files written before "at" was recorded fall back to their mtime.
+            at = missing.get("at") or os.path.getmtime(file)
+        except (OSError, ValueError):
+            return None
+        if self._clock() - at > self.missing_ttl:
+            return None
+        return missing.get("reason", "")
+
+    def get(self, video_id, language="en"):
+        """
+        Look up a transcript.
+
+        Returns:
+            dict or None: {"segments": [...]} when cached, {"missing": reason}
+            when the video is known to have no transcript, None when unknown.
+        """
+        for codec in dict.fromkeys((DEFAULT_CODEC, "zstd", "zlib")):
+            try:
+                with open(self._file(video_id, language, codec), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            LOOKUPS.inc(result="hit")
+            return {"segments": json.loads(decompress_text(data, codec))["segments"]}
+        reason = self._missing_reason(video_id, language)
+        LOOKUPS.inc(result="miss" if reason is None else "missing")
+        return None if reason is None else {"missing": reason}
+
+    def has(self, video_id, language="en"):
+        """Whether a lookup would be answered without the network (no file is decompressed)."""
+        return any(
+            os.path.exists(self._file(video_id, language, codec)) for codec in ("zstd", "zlib")
+        ) or self._missing_reason(video_id, language) is not None
+
+    def put(self, video_id, language, segments):
+        payload = json.dumps(
+            {"video_id": video_id, "language": language, "fetched_at": self._clock(), "segments": segments},
+            separators=(",", ":"),
+        )
+        self._write(self._file(video_id, language, DEFAULT_CODEC), compress_text(payload, DEFAULT_CODEC))
+        try:
+            os.remove(self._file(video_id, language, "missing"))
+        except FileNotFoundError:
+            pass
+
+    def put_missing(self, video_id, language, reason=""):
+        self._write(
+            self._file(video_id, language, "missing"), json.dumps({"reason": reason, "at": self._clock()}).encode()
+        )
+
+    def delete(self, video_id, language="en"):
+        for suffix in ("zstd", "zlib", "missing"):
+            try:
+                os.remove(self._file(video_id, language, suffix))
+            except FileNotFoundError:
+                pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    """Return the process-wide TranscriptCache, or None when TRANSCRIPT_CACHE_DIR is empty."""
+    global _cache
+    path = get_setting("TRANSCRIPT_CACHE_DIR", "")
+    if not path:
+        return None
+    if _cache is None or _cache.path != str(path):
+        with _cache_lock:
+            if _cache is None or _cache.path != str(path):
+                _cache = TranscriptCache(path)
+    return _cache
@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+
+import numpy as np
+from filelock import FileLock
+
+# Rows are scored in blocks so a brute-force scan never materializes more
+# than BLOCK_ROWS x dim floats at once, however large the store is.
+BLOCK_ROWS = 8192
+INITIAL_CAPACITY = 1024
+
+
+def normalize(vectors):
+    """L2-normalize rows so a dot product is the cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(ids, scores, k):
+    """Best k (id, score) pairs, one per id, highest score first."""
+    if len(scores) > k * 4:
+        keep = np.argpartition(-scores, k * 4)[:k * 4]
+        ids, scores = ids[keep], scores[keep]
+    best = {}
+    for i in np.argsort(-scores):
+        best.setdefault(int(ids[i]), float(scores[i]))
+        if len(best) == k:
+            break
+    return list(best.items())
+
+
+def stored_dim(path):
+    """Dimension of the vectors already stored at ``path``, or None for a new store."""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            return json.load(f)["dim"]
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+class VectorStore:
+    """
+    Append-only store of unit-length embeddings in memory-mapped .npy files.
+
+    Vectors (float16 or float32) and their integer ids live in ``path`` and
+    are paged in by the OS on demand, so the store can be far larger than the
+    memory a process wants to spend on it. Appends from several processes are
+    serialized with a file lock; readers pick up new rows on their next query.
+
+    Search is exact brute force by default. After build_ivf(), queries only
+    scan the ``nprobe`` inverted lists closest to the query (approximate,
+    much faster on large stores); vectors added later are assigned to their
+    nearest list as they arrive.
+    """
+
+    def __init__(self, path, dim, dtype="float16"):
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        os.makedirs(path, exist_ok=True)
+        self._file_lock = FileLock(os.path.join(path, "store.lock"))
+        self._lock = threading.Lock()
+        self._meta = None
+        self._arrays = {}
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    # -- metadata and files --------------------------------------------------
+
+    def _read_meta(self):
+        try:
+            with open(self._file("meta.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "capacity": 0, "dim": self.dim, "dtype": self.dtype.name, "nlist": 0}
+        if meta["dim"] != self.dim or meta["dtype"] != self.dtype.name:
+            raise ValueError(
+                f"Vector store at {self.path} holds {meta['dim']}-d {meta['dtype']} vectors, "
+                f"not {self.dim}-d {self.dtype.name}; rebuild it"
+            )
+        return meta
+
+    def _write_meta(self, meta):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def _open(self, mode="r"):
+        """Refresh metadata and (re)open the memory maps if the store changed."""
+        meta = self._read_meta()
+        if meta != self._meta or mode != "r":
+            self._arrays = {}
+            if meta["capacity"]:
+                for name in ("vectors", "ids", "lists"):
+                    if name != "lists" or meta["nlist"]:
+                        self._arrays[name] = np.load(self._file(f"{name}.npy"), mmap_mode=mode)
+                if meta["nlist"]:
+                    self._arrays["centroids"] = np.load(self._file("centroids.npy"))
+            self._meta = meta
+        return meta
+
+    def _grow(self, meta, needed):
+        capacity = max(INITIAL_CAPACITY, meta["capacity"])
+        while capacity < needed:
+            capacity *= 2
+        if capacity == meta["capacity"]:
+            return
+        specs = {"vectors": ((capacity, self.dim), self.dtype), "ids": ((capacity,), np.int64)}
+        if meta["nlist"]:
+            specs["lists"] = ((capacity,), np.int32)
+        count = meta["count"]
+        for name, (shape, dtype) in specs.items():
+            tmp = self._file(f"{name}.npy.tmp")
+            grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+            if count:
+                grown[:count] = np.load(self._file(f"{name}.npy"), mmap_mode="r")[:count]
+            grown.flush()
+            del grown
+            os.replace(tmp, self._file(f"{name}.npy"))
+        meta["capacity"] = capacity
+        # Readers still holding the old maps keep reading the old files.
+        self._write_meta(meta)
+
+    def __len__(self):
+        with self._lock:
+            return self._open()["count"]
+
+    # -- writes --------------------------------------------------------------
+
+    def add(self, ids, vectors):
+        """Append vectors (normalized here) under the given integer ids."""
+        vectors = normalize(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if not len(ids):
+            return
+        with self._lock, self._file_lock:
+            meta = self._read_meta()
+            start = meta["count"]
+            self._grow(meta, start + len(ids))
+            self._meta = None
+            self._open(mode="r+")
+            self._arrays["vectors"][start:start + len(ids)] = vectors.astype(self.dtype)
+            self._arrays["ids"][start:start + len(ids)] = ids
+            if meta["nlist"]:
+                self._arrays["lists"][start:start + len(ids)] = self._assign(vectors)
+            for array in self._arrays.values():
+                if isinstance(array, np.memmap):
+                    array.flush()
+            meta["count"] = start + len(ids)
+            self._write_meta(meta)
+            self._meta = None
+            self._arrays = {}
+
+    def build_ivf(self, nlist=None, iterations=10, sample_size=50000, seed=0):
+        """
+        Cluster the stored vectors into ``nlist`` inverted lists (spherical
+        k-means on a sample, default nlist = 4 * sqrt(count)).
+        """
+        with self._lock, self._file_lock:
+            meta = self._open()
+            count = meta["count"]
+            if not count:
+                return 0
+            nlist = min(count, nlist or int(4 * np.sqrt(count)))
+            vectors = self._arrays["vectors"]
+            rng = np.random.default_rng(seed)
+            sample = vectors[np.sort(rng.choice(count, min(count, sample_size), replace=False))].astype(np.float32)
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                empty = ~sums.any(axis=1)
+                sums[empty] = centroids[empty]
+                centroids = normalize(sums)
+
+            np.save(self._file("centroids.npy"), centroids)
+            lists = np.lib.format.open_memmap(
+                self._file("lists.npy"), mode="w+", dtype=np.int32, shape=(meta["capacity"],)
+            )
+            self._arrays["centroids"] = centroids
+            for start in range(0, count, BLOCK_ROWS):
+                lists[start:start + BLOCK_ROWS] = self._assign(vectors[start:start + BLOCK_ROWS])
+            lists.flush()
+            del lists
+            meta["nlist"] = nlist
+            self._write_meta(meta)
+            self._meta = None
+            self._arrays = {}
+            return nlist
+
+    def _assign(self, vectors):
+        return np.argmax(np.asarray(vectors, dtype=np.float32) @ self._arrays["centroids"].T, axis=1)
+
+    # -- queries -------------------------------------------------------------
+
+    def ids(self):
+        """All stored ids, in insertion order."""
+        with self._lock:
+            meta = self._open()
+            if not meta["count"]:
+                return np.empty(0, dtype=np.int64)
+            return np.array(self._arrays["ids"][:meta["count"]])
+
+    def get(self, id):
+        """Return the most recently added vector for ``id`` (float32), or None."""
+        with self._lock:
+            meta = self._open()
+            if not meta["count"]:
+                return None
+            rows = np.flatnonzero(self._arrays["ids"][:meta["count"]] == id)
+            return self._arrays["vectors"][rows[-1]].astype(np.float32) if len(rows) else None
+
+    def search(self, query, k=10, nprobe=8, exclude=()):
+        """
+        Return up to ``k`` (id, cosine similarity) pairs, best first.
+
+        Args:
+            query: Query vector (normalized here).
+            k (int): Number of results.
+            nprobe (int): Inverted lists scanned when an IVF index exists;
+                None forces an exact scan.
+            exclude: Ids to leave out (e.g. the query video itself).
+        """
+        query = normalize(query)[0]
+        with self._lock:
+            meta = self._open()
+            count = meta["count"]
+            if not count:
+                return []
+            vectors, ids = self._arrays["vectors"], self._arrays["ids"]
+            exclude = np.asarray(list(exclude), dtype=np.int64)
+
+            if meta["nlist"] and nprobe:
+                probes = np.argsort(-(self._arrays["centroids"] @ query))[:nprobe]
+                rows = np.flatnonzero(np.isin(self._arrays["lists"][:count], probes))
+                candidates = [(ids[rows], vectors[rows].astype(np.float32) @ query)]
+            else:
+                candidates = [
+                    (ids[start:min(count, start + BLOCK_ROWS)],
+                     vectors[start:min(count, start + BLOCK_ROWS)].astype(np.float32) @ query)
+                    for start in range(0, count, BLOCK_ROWS)
+                ]
+
+        result_ids = np.concatenate([c[0] for c in candidates])
+        scores = np.concatenate([c[1] for c in candidates])
+        if len(exclude):
+            keep = ~np.isin(result_ids, exclude)
+            result_ids, scores = result_ids[keep], scores[keep]
+        return _top_k(result_ids, scores, k)
+
+    def clear(self):
+        with self._lock, self._file_lock:
+            for name in ("meta.json", "vectors.npy", "ids.npy", "lists.npy", "centroids.npy"):
+                try:
+                    os.remove(self._file(name))
+                except FileNotFoundError:
+                    pass
+            self._meta = None
+            self._arrays = {}
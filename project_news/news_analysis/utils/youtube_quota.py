@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from filelock import FileLock
+
+# YouTube Data API v3 unit costs, see
+# https://developers.google.com/youtube/v3/determine_quota_cost
+QUOTA_COSTS = {
+    "videos.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "commentThreads.list": 1,
+    "search.list": 100,
+}
+DEFAULT_DAILY_QUOTA = 10000
+
+# Quotas reset at midnight Pacific Time.
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+
+class QuotaExhausted(Exception):
+    """Raised when no API key has enough quota left for a call."""
+
+
+def _now():
+    return datetime.now(QUOTA_TIMEZONE)
+
+
+class QuotaUsage:
+    """
+    Per-key usage of the current quota day, kept in this process.
+
+    update(day, func) calls func with {key ID: {"used", "calls",
+    "cooldown_until"}} for ``day``; usage of earlier days is dropped.
+    """
+
+    def __init__(self):
+        self._day = None
+        self._usage = {}
+        self._lock = threading.Lock()
+
+    def update(self, day, func):
+        with self._lock:
+            if day != self._day:
+                self._day, self._usage = day, {}
+            return func(self._usage)
+
+
+class QuotaUsageFile:
+    """
+    Per-key usage in a JSON file shared by every process that uses it
+    (ingest, workers, the web and Streamlit processes), so together they
+    stay within the daily quota and a restart does not forget what was
+    spent. Each update reads and rewrites the file under a file lock.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file_lock = FileLock(f"{self.path}.lock")
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def update(self, day, func):
+        with self._file_lock:
+            data = self._read()
+            usage = data.get("keys", {}) if data.get("day") == day.isoformat() else {}
+            result = func(usage)
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"day": day.isoformat(), "keys": usage}, f)
+            os.replace(tmp, self.path)
+            return result
+
+
+class QuotaScheduler:
+    """
+    Thread-safe router of YouTube API calls across several keys.
+
+    Every call reserves its unit cost on the key with the most headroom left
+    today. Keys that hit quotaExceeded are put on cooldown until the next
+    daily reset. Usage is kept in ``usage``: per process by default, or a
+    QuotaUsageFile to share it between processes. Keys are stored as a
+    short hash, never in clear.
+    """
+
+    def __init__(self, keys, daily_quota=DEFAULT_DAILY_QUOTA, costs=QUOTA_COSTS, clock=_now, usage=None):
+        if not keys:
+            raise ValueError("QuotaScheduler needs at least one API key")
+        self.keys = list(keys)
+        self.daily_quota = daily_quota
+        self.costs = dict(costs)
+        self._clock = clock
+        self._usage = usage if usage is not None else QuotaUsage()
+        self._ids = {key: hashlib.sha256(key.encode()).hexdigest()[:16] for key in self.keys}
+        self._lock = threading.Lock()
+
+    def cost(self, method):
+        return self.costs.get(method, 1)
+
+    def next_reset(self):
+        today = self._clock()
+        midnight = today.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + timedelta(days=1)
+
+    def _update(self, func):
+        """Call func(now, {key: usage entry}) on today's usage."""
+        with self._lock:
+            now = self._clock()
+
+            def call(usage):
+                entries = {
+                    key: usage.setdefault(self._ids[key], {"used": 0, "calls": {}, "cooldown_until": None})
+                    for key in self.keys
+                }
+                return func(now, entries)
+
+            return self._usage.update(now.date(), call)
+
+    def _headroom(self, entry):
+        return self.daily_quota - entry["used"]
+
+    @staticmethod
+    def _cooling_down(entry, now):
+        return entry["cooldown_until"] is not None and datetime.fromisoformat(entry["cooldown_until"]) > now
+
+    def acquire(self, method):
+        """
+        Reserve the cost of ``method`` on the key with the most headroom.
+
+        Returns:
+            str: The API key to use.
+
+        Raises:
+            QuotaExhausted: If no key can afford the call before the next reset.
+        """
+        cost = self.cost(method)
+
+        def reserve(now, entries):
+            available = [
+                key for key, entry in entries.items()
+                if not self._cooling_down(entry, now) and self._headroom(entry) >= cost
+            ]
+            if not available:
+                return None
+            key = max(available, key=lambda key: self._headroom(entries[key]))
+            entries[key]["used"] += cost
+            entries[key]["calls"][method] = entries[key]["calls"].get(method, 0) + 1
+            return key
+
+        key = self._update(reserve)
+        if key is None:
+            raise QuotaExhausted(
+                f"No YouTube API key has {cost} units left for {method}; "
+                f"quota resets at {self.next_reset().isoformat()}"
+            )
+        return key
+
+    def mark_exhausted(self, key):
+        """Put a key on cooldown until the next daily reset."""
+        reset = self.next_reset().isoformat()
+
+        def exhaust(now, entries):
+            entries[key]["used"] = self.daily_quota
+            entries[key]["cooldown_until"] = reset
+
+        self._update(exhaust)
+
+    def remaining(self):
+        """Total units left today across keys that are not cooling down."""
+        return self._update(lambda now, entries: sum(
+            max(0, self._headroom(entry)) for entry in entries.values()
+            if not self._cooling_down(entry, now)
+        ))
+
+    def usage_stats(self):
+        """Per-key usage for today. Keys are shortened so stats can be displayed."""
+        return self._update(lambda now, entries: {
+            f"{key[:6]}...": {
+                "used": entry["used"],
+                "remaining": max(0, self._headroom(entry)),
+                "cooldown_until": entry["cooldown_until"],
+                "calls": dict(entry["calls"]),
+            }
+            for key, entry in entries.items()
+        })
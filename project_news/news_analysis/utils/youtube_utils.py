@@ -1,29 +1,148 @@
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import (
+    AgeRestricted,
+    InvalidVideoId,
+    NoTranscriptFound,
+    RequestBlocked,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+    YouTubeRequestFailed,
+    YouTubeTranscriptApi,
+)
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed, wait,
+)
+import logging
+import queue
+import random
 import re
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from . import metrics
+from .rate_limit import TokenBucket
+from .transcript_cache import get_transcript_cache
+from .config import get_setting
+from .youtube_quota import DEFAULT_DAILY_QUOTA, QuotaExhausted, QuotaScheduler, QuotaUsageFile
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 YOUTUBE_API_KEYS = os.getenv("YOUTUBE_API_KEYS")
 
 if not YOUTUBE_API_KEYS:
     raise ValueError("Missing YOUTUBE_API_KEYS in environment variables")
 
-API_KEYS_LIST = [key.strip() for key in YOUTUBE_API_KEYS.split(",")]
+API_KEYS_LIST = [key.strip() for key in YOUTUBE_API_KEYS.split(",") if key.strip()]
+
+# Routes every Data API call to the key with the most quota left today.
+# Usage is shared through YOUTUBE_QUOTA_FILE by every process on the machine.
+_quota_file = get_setting("YOUTUBE_QUOTA_FILE", "")
+quota_scheduler = QuotaScheduler(
+    API_KEYS_LIST,
+    daily_quota=int(os.getenv("YOUTUBE_DAILY_QUOTA", DEFAULT_DAILY_QUOTA)),
+    usage=QuotaUsageFile(_quota_file) if _quota_file else None,
+)
+
+# videos.list accepts up to 50 comma-separated IDs for the same quota cost
+VIDEOS_PER_REQUEST = 50
+
+# commentThreads.list returns at most 100 threads per page, for one unit each
+COMMENTS_PER_PAGE = 100
+COMMENTS_MAX = int(os.getenv("YOUTUBE_COMMENTS_MAX", 1000))
+
+# Per-call timeouts (seconds) for fetch_video_data
+METADATA_TIMEOUT = float(os.getenv("YOUTUBE_METADATA_TIMEOUT", 10))
+TRANSCRIPT_TIMEOUT = float(os.getenv("YOUTUBE_TRANSCRIPT_TIMEOUT", 20))
+
+API_CALLS = metrics.counter(
+    "youtube_api_calls_total", "YouTube Data API calls by method, key and outcome."
+)
+API_SECONDS = metrics.histogram("youtube_api_seconds", "YouTube Data API call latency by method.")
+FETCH_FAILURES = metrics.counter(
+    "youtube_fetch_failures_total", "Failed or timed out fetch_video_data parts."
+)
+TRANSCRIPT_THROTTLED = metrics.counter(
+    "youtube_transcript_throttled_total", "Transcript requests YouTube rejected as too frequent."
+)
+
+# Transcript downloads do not use the Data API quota, but YouTube blocks IPs
+# that request them too fast. Every thread of a process draws from one token
+# bucket (TRANSCRIPT_RATE per second, bursts of TRANSCRIPT_BURST); a throttling
+# error pauses the bucket for an exponentially growing, jittered delay.
+TRANSCRIPT_RATE = float(os.getenv("YOUTUBE_TRANSCRIPT_RATE", 2))
+TRANSCRIPT_BURST = int(os.getenv("YOUTUBE_TRANSCRIPT_BURST", 5))
+TRANSCRIPT_MAX_ATTEMPTS = int(os.getenv("YOUTUBE_TRANSCRIPT_MAX_ATTEMPTS", 5))
+TRANSCRIPT_BACKOFF = float(os.getenv("YOUTUBE_TRANSCRIPT_BACKOFF", 5))
+TRANSCRIPT_BACKOFF_MAX = 300
 
-# Create clients for all keys once, store in a list
-YOUTUBE_CLIENTS = [build("youtube", "v3", developerKey=key) for key in API_KEYS_LIST]
+transcript_rate_limiter = TokenBucket(TRANSCRIPT_RATE, TRANSCRIPT_BURST)
 
-# Simple round-robin index stored in Streamlit session state or global
-_api_key_index = 0
+# Answers that a retry would not change; remembered in the transcript cache.
+NO_TRANSCRIPT_ERRORS = (
+    TranscriptsDisabled, NoTranscriptFound, VideoUnavailable, VideoUnplayable, InvalidVideoId, AgeRestricted,
+)
 
-def get_youtube_client():
-    global _api_key_index
-    client = YOUTUBE_CLIENTS[_api_key_index]
-    _api_key_index = (_api_key_index + 1) % len(YOUTUBE_CLIENTS)
-    return client
+# The googleapiclient/httplib2 clients are not thread-safe, so every thread
+# builds its own client per key, lazily.
+_thread_clients = threading.local()
+
+# Shared pool for the independent network calls in fetch_video_data
+_fetch_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("YOUTUBE_FETCH_WORKERS", 12)),
+    thread_name_prefix="youtube-fetch",
+)
+
+def _client_for_key(key):
+    clients = getattr(_thread_clients, "clients", None)
+    if clients is None:
+        clients = _thread_clients.clients = {}
+    if key not in clients:
+        clients[key] = build("youtube", "v3", developerKey=key)
+    return clients[key]
+
+def get_youtube_client(method="videos.list"):
+    """Return a client for the key with the most headroom, charging one ``method`` call."""
+    return _client_for_key(quota_scheduler.acquire(method))
+
+def _is_quota_error(error):
+    return error.resp.status == 403 and (
+        b"quotaExceeded" in error.content or b"dailyLimitExceeded" in error.content
+    )
+
+def execute_api_call(method, make_request):
+    """
+    Run a Data API call through the quota scheduler.
+
+    Args:
+        method (str): API method name used for costing, e.g. "videos.list".
+        make_request (callable): Takes a client and returns the request to execute.
+
+    If a key turns out to be out of quota (403 quotaExceeded) it is put on
+    cooldown until the daily reset and the call is retried on another key.
+    """
+    for _ in range(len(API_KEYS_LIST)):
+        key = quota_scheduler.acquire(method)
+        outcome = "error"
+        try:
+            with API_SECONDS.time(method=method):
+                response = make_request(_client_for_key(key)).execute()
+            outcome = "ok"
+            return response
+        except HttpError as e:
+            if not _is_quota_error(e):
+                raise
+            outcome = "quota_exceeded"
+            logger.warning("API key %s... is out of quota, cooling down until reset", key[:6])
+            quota_scheduler.mark_exhausted(key)
+        finally:
+            API_CALLS.inc(method=method, key=f"{key[:6]}...", outcome=outcome)
+    raise QuotaExhausted(f"All YouTube API keys are out of quota for {method}")
 
 def extract_video_id(url):
     patterns = [
@@ -37,72 +156,347 @@ def extract_video_id(url):
             return match.group(1)
     return None
 
+def _parse_metadata(item):
+    snippet = item.get("snippet", {})
+    stats = item.get("statistics", {})
+
+    return {
+        "title": snippet.get("title", "N/A"),
+        "channel_title": snippet.get("channelTitle", "N/A"),
+        "published_at": snippet.get("publishedAt", "N/A"),
+        "view_count": stats.get("viewCount", "N/A"),
+        "like_count": stats.get("likeCount", "N/A")
+    }
+
+def fetch_video_metadata_many(video_ids):
+    """
+    Fetch metadata for many videos, 50 IDs per videos.list request.
+
+    A videos.list call costs the same quota whether it names 1 or 50 IDs.
+
+    Returns:
+        dict: video_id -> metadata, for the IDs YouTube returned.
+    """
+    video_ids = list(dict.fromkeys(video_ids))
+    metadata = {}
+    for start in range(0, len(video_ids), VIDEOS_PER_REQUEST):
+        batch = video_ids[start:start + VIDEOS_PER_REQUEST]
+        response = execute_api_call("videos.list", lambda youtube: youtube.videos().list(
+            part="snippet,statistics",
+            id=",".join(batch),
+            maxResults=VIDEOS_PER_REQUEST
+        ))
+        for item in response.get("items", []):
+            metadata[item["id"]] = _parse_metadata(item)
+    return metadata
+
+class MetadataCoalescer:
+    """
+    Groups concurrent single-video metadata lookups into batched requests.
+
+    submit() returns a Future; a background thread waits up to ``max_wait``
+    seconds for more IDs (or until ``max_batch`` are pending) and resolves
+    them all with one fetch_video_metadata_many() call.
+    """
+
+    def __init__(self, max_batch=VIDEOS_PER_REQUEST, max_wait=0.02):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, video_id):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="metadata-coalescer", daemon=True
+                )
+                self._thread.start()
+        future = Future()
+        self._queue.put((video_id, future))
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                metadata = fetch_video_metadata_many([video_id for video_id, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for video_id, future in batch:
+                    future.set_result(metadata.get(video_id))
+
+_metadata_coalescer = MetadataCoalescer()
+
 def fetch_video_metadata(video_id):
     try:
-        youtube = get_youtube_client()
-        response = youtube.videos().list(
-            part="snippet,statistics",
-            id=video_id
-        ).execute()
-
-        if not response.get("items"):
-            print(f"No metadata found for video ID: {video_id}")
-            return None
-
-        item = response["items"][0]
-        snippet = item.get("snippet", {})
-        stats = item.get("statistics", {})
-
-        return {
-            "title": snippet.get("title", "N/A"),
-            "channel_title": snippet.get("channelTitle", "N/A"),
-            "published_at": snippet.get("publishedAt", "N/A"),
-            "view_count": stats.get("viewCount", "N/A"),
-            "like_count": stats.get("likeCount", "N/A")
-        }
+        with metrics.stage_timer("metadata"):
+            metadata = _metadata_coalescer.submit(video_id).result(timeout=METADATA_TIMEOUT)
+        if metadata is None:
+            logger.warning("No metadata found for video ID: %s", video_id)
+        return metadata
     except Exception as e:
-        print(f"Error fetching metadata for {video_id}: {e}")
+        logger.warning("Error fetching metadata for %s: %s", video_id, e)
         return None
 
-def fetch_transcript(video_id):
+def _is_throttled(error):
+    if isinstance(error, RequestBlocked):
+        return True
+    return isinstance(error, YouTubeRequestFailed) and "429" in str(error)
+
+def _download_segments(video_id, languages, deadline=None):
+    """
+    Download transcript segments, rate limited, backing off while YouTube
+    throttles us. With a ``deadline`` (a time.monotonic() value), raises
+    TimeoutError instead of waiting past it for the rate limiter or a backoff.
+    """
+    for attempt in range(1, TRANSCRIPT_MAX_ATTEMPTS + 1):
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if transcript_rate_limiter.acquire(timeout=timeout) is None:
+            raise TimeoutError(f"transcript rate limit wait would pass the {TRANSCRIPT_TIMEOUT:g}s deadline")
+        try:
+            return YouTubeTranscriptApi.get_transcript(video_id, languages=list(languages))
+        except Exception as e:
+            if not _is_throttled(e) or attempt == TRANSCRIPT_MAX_ATTEMPTS:
+                raise
+            TRANSCRIPT_THROTTLED.inc()
+            delay = min(TRANSCRIPT_BACKOFF_MAX, TRANSCRIPT_BACKOFF * 2 ** (attempt - 1)) * random.uniform(0.5, 1)
+            logger.warning("Transcript requests throttled (%s); pausing %.1fs", type(e).__name__, delay)
+            # Pausing the shared bucket holds back every thread, not just this one.
+            transcript_rate_limiter.penalize(delay)
+
+def fetch_transcript_segments(video_id, languages=("en",), deadline=None):
+    """
+    Return a video's transcript as [{"text", "start", "duration"}] segments,
+    or None if it has no transcript in ``languages``. See _download_segments
+    for ``deadline``.
+
+    Answers come from the transcript cache when it has one; downloaded
+    transcripts and "no transcript" answers are added to it. Network and
+    throttling errors are raised and not cached.
+    """
+    cache = get_transcript_cache()
+    language = "+".join(languages)
+    if cache is not None:
+        entry = cache.get(video_id, language)
+        if entry is not None:
+            return entry.get("segments")
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
-        return " ".join([t["text"] for t in transcript])
-    except Exception as e:
-        print(f"Transcript error for {video_id}: {e}")
+        with metrics.stage_timer("transcript_download"):
+            raw = _download_segments(video_id, languages, deadline)
+    except NO_TRANSCRIPT_ERRORS as e:
+        if cache is not None:
+            cache.put_missing(video_id, language, type(e).__name__)
         return None
+    segments = [
+        {"text": s["text"], "start": float(s["start"]), "duration": float(s.get("duration", 0.0))}
+        for s in raw
+    ]
+    if cache is not None:
+        cache.put(video_id, language, segments)
+    return segments
 
-def fetch_top_comments(video_id, max_results=10):
-    comments = []
+def _fetch_segments(video_id):
+    # Someone is waiting for this one: give up at TRANSCRIPT_TIMEOUT rather
+    # than keep a fetch thread backing off for minutes after the caller left.
+    deadline = time.monotonic() + TRANSCRIPT_TIMEOUT
     try:
-        youtube = get_youtube_client()
-        response = youtube.commentThreads().list(
+        with metrics.stage_timer("transcript"):
+            segments = fetch_transcript_segments(video_id, deadline=deadline)
+    except Exception as e:
+        logger.warning("Transcript error for %s: %s", video_id, e)
+        return None
+    if not segments:
+        logger.warning("No transcript available for %s", video_id)
+        return None
+    return segments
+
+def join_segments(segments):
+    return " ".join(segment["text"] for segment in segments)
+
+def fetch_transcript(video_id):
+    segments = _fetch_segments(video_id)
+    return join_segments(segments) if segments else None
+
+def download_transcripts(video_ids, languages=("en",), workers=4, on_result=None):
+    """
+    Fill the transcript cache for many videos.
+
+    Videos already in the cache are skipped without touching the network.
+    The rest are downloaded by at most ``workers`` threads, all drawing from
+    the shared rate limiter. ``on_result(video_id, status)`` is called as each
+    video finishes, with status "cached", "downloaded", "missing" or "failed".
+
+    Returns:
+        dict: Number of videos per status.
+    """
+    cache = get_transcript_cache()
+    if cache is None:
+        raise RuntimeError("Set TRANSCRIPT_CACHE_DIR to download transcripts in bulk")
+    language = "+".join(languages)
+    counts = dict.fromkeys(("cached", "downloaded", "missing", "failed"), 0)
+
+    def finish(video_id, status):
+        counts[status] += 1
+        if on_result:
+            on_result(video_id, status)
+
+    def download(video_id):
+        try:
+            return "downloaded" if fetch_transcript_segments(video_id, languages) is not None else "missing"
+        except Exception as e:
+            logger.warning("Transcript download for %s failed: %s", video_id, e)
+            return "failed"
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcript-download") as pool:
+        pending = {}
+        for video_id in dict.fromkeys(video_ids):
+            if cache.has(video_id, language):
+                finish(video_id, "cached")
+                continue
+            # Keep a bounded window in flight so huge ID lists are not all queued at once.
+            while len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(pending.pop(future), future.result())
+            pending[pool.submit(download, video_id)] = video_id
+        for future in as_completed(pending):
+            finish(pending[future], future.result())
+    return counts
+
+def comments_quota_cost(max_comments=COMMENTS_MAX):
+    """Most quota units iter_comments() can spend on one video."""
+    pages = -(-max_comments // COMMENTS_PER_PAGE)
+    return pages * quota_scheduler.cost("commentThreads.list")
+
+def iter_comments(video_id, max_comments=COMMENTS_MAX, order="relevance"):
+    """
+    Yield a video's top-level comments, following nextPageToken pagination.
+
+    Pages are requested one at a time as the caller consumes them, so only
+    one page (at most 100 comments) is held in memory, and at most
+    comments_quota_cost(max_comments) units are spent.
+
+    Yields:
+        dict: {"text": str, "like_count": int}
+    """
+    page_token = None
+    remaining = max_comments
+    while remaining > 0:
+        response = execute_api_call("commentThreads.list", lambda youtube: youtube.commentThreads().list(
             part="snippet",
             videoId=video_id,
-            maxResults=max_results,
+            maxResults=min(COMMENTS_PER_PAGE, remaining),
+            order=order,
+            pageToken=page_token,
             textFormat="plainText"
-        ).execute()
+        ))
+        items = response.get("items", [])
+        for item in items[:remaining]:
+            snippet = item["snippet"]["topLevelComment"]["snippet"]
+            yield {"text": snippet.get("textDisplay", ""), "like_count": int(snippet.get("likeCount", 0))}
+        remaining -= len(items)
+        page_token = response.get("nextPageToken")
+        if not page_token or not items:
+            return
+
+def fetch_playlist_video_ids(playlist_id, max_videos=None):
+    """Return the video IDs in a playlist, following pagination (50 per page)."""
+    video_ids = []
+    page_token = None
+    while True:
+        response = execute_api_call("playlistItems.list", lambda youtube: youtube.playlistItems().list(
+            part="contentDetails",
+            playlistId=playlist_id,
+            maxResults=50,
+            pageToken=page_token
+        ))
 
         for item in response.get("items", []):
-            comment = item["snippet"]["topLevelComment"]["snippet"]["textDisplay"]
-            comments.append(comment)
-    except Exception as e:
-        print(f"Comments error for {video_id}: {e}")
-    return comments
+            video_ids.append(item["contentDetails"]["videoId"])
+            if max_videos and len(video_ids) >= max_videos:
+                return video_ids
+
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return video_ids
 
-def fetch_video_data(video_url):
+def fetch_channel_video_ids(channel_id, max_videos=None):
+    """Return the video IDs uploaded by a channel, newest first."""
+    response = execute_api_call("channels.list", lambda youtube: youtube.channels().list(
+        part="contentDetails",
+        id=channel_id
+    ))
+
+    if not response.get("items"):
+        logger.warning("No channel found for ID: %s", channel_id)
+        return []
+
+    uploads = response["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+    return fetch_playlist_video_ids(uploads, max_videos=max_videos)
+
+def fetch_video_data(video_url, metadata=None):
+    """
+    Fetch metadata and transcript for a video concurrently.
+
+    The calls are independent, so they run in parallel and the total
+    latency is roughly the slowest call. Each call has its own timeout; a
+    call that fails or times out leaves its field empty (None) and is
+    listed under "errors", while the other results are still returned.
+
+    Pass ``metadata`` when it was already fetched in bulk with
+    fetch_video_metadata_many() to skip the metadata call.
+
+    "transcript" is the joined text and "segments" the timed transcript
+    segments it was joined from (None without a transcript).
+    """
     video_id = extract_video_id(video_url)
     if not video_id:
-        print("Invalid video URL or video ID not found.")
+        logger.warning("Invalid video URL or video ID not found: %s", video_url)
         return None
 
-    metadata = fetch_video_metadata(video_id)
-    transcript = fetch_transcript(video_id)
-    comments = fetch_top_comments(video_id)
+    calls = {
+        "metadata": (fetch_video_metadata, METADATA_TIMEOUT, None),
+        "transcript": (_fetch_segments, TRANSCRIPT_TIMEOUT, None),
+    }
+    if metadata is not None:
+        del calls["metadata"]
+    started = time.monotonic()
+    futures = {
+        name: _fetch_pool.submit(func, video_id)
+        for name, (func, _, _) in calls.items()
+    }
 
-    return {
-        "video_id": video_id,
-        "metadata": metadata,
-        "transcript": transcript,
-        "comments": comments
-    }
\ No newline at end of file
+    result = {"video_id": video_id, "metadata": metadata, "errors": {}}
+    for name, (_, timeout, default) in calls.items():
+        remaining = max(0.0, started + timeout - time.monotonic())
+        try:
+            result[name] = futures[name].result(timeout=remaining)
+        except Exception as e:
+            # The worker thread cannot be interrupted; its result is dropped.
+            futures[name].cancel()
+            reason = "timed out" if isinstance(e, FutureTimeoutError) else str(e)
+            logger.warning("%s fetch for %s failed: %s", name, video_id, reason)
+            FETCH_FAILURES.inc(part=name, reason="timeout" if isinstance(e, FutureTimeoutError) else "error")
+            result[name] = default
+            result["errors"][name] = reason
+    result["segments"] = result["transcript"]
+    result["transcript"] = join_segments(result["segments"]) if result["segments"] else None
+    metrics.STAGE_SECONDS.observe(time.monotonic() - started, stage="fetch")
+    return result
@@ -0,0 +1,45 @@
+import hashlib
+import json
+
+
+def analysis_config(sentiment_backend=None):
+    """
+    Everything that changes the scores an analysis gets: models, labels,
+    prompts, chunking. ``sentiment_backend`` overrides the configured one,
+    for scores that came from the LLM fallback.
+    """
+    from .utils import bias_utils, sentiment_utils
+
+    sentiment_backend = sentiment_backend or sentiment_utils.current_backend()
+    if sentiment_backend == "llm":
+        sentiment = {
+            "backend": "llm",
+            "model": sentiment_utils.MODEL_NAME,
+            "prompt": sentiment_utils.SENTIMENT_PROMPT,
+            "parameters": sentiment_utils.SENTIMENT_PARAMETERS,
+        }
+    else:
+        sentiment = {
+            "backend": sentiment_backend,
+            "model": sentiment_utils.local_model_name(),
+            "chunk_tokens": sentiment_utils.SENTIMENT_CHUNK_TOKENS,
+            "max_chunks": sentiment_utils.SENTIMENT_MAX_CHUNKS,
+        }
+    return {
+        "bias": {
+            "model": bias_utils.BIAS_MODEL_NAME,
+            "backend": bias_utils.current_backend(),
+            "labels": bias_utils.CANDIDATE_LABELS,
+            "template": bias_utils.HYPOTHESIS_TEMPLATE,
+            "chunk_tokens": bias_utils.CHUNK_TOKENS,
+            "chunk_overlap": bias_utils.CHUNK_OVERLAP,
+            "max_chunks": bias_utils.MAX_CHUNKS,
+        },
+        "sentiment": sentiment,
+    }
+
+
+def analysis_version(sentiment_backend=None):
+    """Short hash of analysis_config(), stamped on every VideoAnalysis row."""
+    payload = json.dumps(analysis_config(sentiment_backend), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
@@ -1,34 +1,208 @@
-from django.shortcuts import render, get_object_or_404
-from .models import VideoAnalysis
-from django.db.models import Avg
+import hmac
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.paginator import Paginator
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotAllowed, StreamingHttpResponse,
+)
+from django.middleware.csrf import CsrfViewMiddleware
+from django.shortcuts import render
+from django.utils import timezone
+from .export import FORMATS, parse_columns, parse_date_filter, stream_export
+from .models import ChannelStats, VideoAnalysis
+from .streaming import MAX_URLS, analysis_events, job_events, parse_video_ids
+from .utils import metrics as metrics_registry
+
+CHANNELS_PER_PAGE = 50
+VIDEOS_PER_PAGE = 25
+
 
 def dashboard(request):
-    # Distinct channel names
-    channels = (
-        VideoAnalysis.objects
-        .values('channel_name')
-        .distinct()
-    )
-    return render(request, 'news_analysis/dashboard.html', {'channels': channels})
+    # Channel list comes from the per-channel stats table, not a DISTINCT scan
+    channels = ChannelStats.objects.only('channel_name', 'video_count').order_by('channel_name')
+    page = Paginator(channels, CHANNELS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'news_analysis/dashboard.html', {'channels': page, 'page': page})
 
 
 def channel_detail(request, channel_name):
-    videos = VideoAnalysis.objects.filter(channel_name=channel_name)
-
-    bias_scores = videos.aggregate(
-        left_avg=Avg('bias_left') * 100,
-        right_avg=Avg('bias_right') * 100,
-        center_avg=Avg('bias_center') * 100,
-        biased_avg=Avg('bias_biased') * 100,
-        neutral_avg=Avg('bias_neutral') * 100,
+    stats = ChannelStats.objects.filter(channel_name=channel_name).first()
+
+    bias_scores = {
+        'left_avg': stats.avg_bias_left * 100 if stats else None,
+        'right_avg': stats.avg_bias_right * 100 if stats else None,
+        'center_avg': stats.avg_bias_center * 100 if stats else None,
+        'biased_avg': stats.avg_bias_biased * 100 if stats else None,
+        'neutral_avg': stats.avg_bias_neutral * 100 if stats else None,
+    }
+
+    # Only the columns the list renders; transcripts stay in the database
+    videos = (
+        VideoAnalysis.objects
+        .filter(channel_name=channel_name)
+        .only('video_id', 'video_title', 'published_at')
+        .order_by('-published_at', '-id')
     )
+    page = Paginator(videos, VIDEOS_PER_PAGE).get_page(request.GET.get('page'))
 
     return render(request, 'news_analysis/channel_detail.html', {
         'channel_name': channel_name,
-        'videos': videos,
+        'stats': stats,
+        'videos': page,
+        'page': page,
         'bias_scores': bias_scores,
     })
 
 
+@staff_member_required
+def export_analyses(request):
+    """
+    Stream analyses as CSV, JSONL or Parquet.
+
+    Query parameters: format, columns (comma separated), channel (repeatable),
+    since and until (YYYY-MM-DD, inclusive).
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in FORMATS:
+        return HttpResponseBadRequest(f"Unknown format '{export_format}'")
+    try:
+        columns = parse_columns(request.GET.get('columns'))
+        since, until = parse_date_filter(request.GET.get('since')), parse_date_filter(request.GET.get('until'))
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    content_type, extension = FORMATS[export_format]
+    response = StreamingHttpResponse(
+        stream_export(
+            export_format,
+            columns=columns,
+            channels=request.GET.getlist('channel'),
+            since=since,
+            until=until,
+        ),
+        content_type=content_type,
+    )
+    filename = f"analyses-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _has_bearer_token(request, token):
+    """Whether the request carries "Authorization: Bearer <token>" (never true for an empty token)."""
+    header = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+
+
+def metrics(request):
+    """
+    Counters and timings of every process, in the Prometheus text format.
+
+    Shows key prefixes, model names and traffic, so it needs a staff session
+    or, for scrapers, "Authorization: Bearer <METRICS_TOKEN>".
+    """
+    is_staff = request.user.is_active and request.user.is_staff
+    if not (is_staff or _has_bearer_token(request, getattr(settings, 'METRICS_TOKEN', ''))):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics_registry.render(metrics_registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
 def analyze_video(request):
-    return render(request, 'news_analysis/analyze.html')  # placeholder if you want a form later
+    return render(request, 'news_analysis/analyze.html', {'max_urls': MAX_URLS})
+
+
+def _request_urls(request):
+    if request.content_type == 'application/json':
+        body = json.loads(request.body or b'{}')
+        urls = body.get('urls') or ([body['url']] if body.get('url') else [])
+        if not isinstance(urls, list):
+            raise ValueError('"urls" must be a list')
+        return [str(url) for url in urls]
+    return request.POST.getlist('url')
+
+
+async def _server_sent_events(events):
+    async for event, data in events:
+        if event is None:
+            yield ': keep-alive\n\n'
+        else:
+            yield f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+def _is_logged_in(request):
+    return request.user.is_authenticated and request.user.is_active
+
+
+def _csrf_failure(request):
+    """The CSRF middleware's verdict on a request to a csrf_exempt view (None: passed)."""
+    return CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+
+
+def _job_ids(request):
+    try:
+        return list(dict.fromkeys(int(job_id) for job_id in request.GET.getlist('job')))
+    except ValueError:
+        raise ValueError('"job" must be an integer')
+
+
+async def analyze_stream(request):
+    """
+    Analyse videos and stream the progress as server-sent events.
+
+    POST a JSON body {"urls": [...]} or form fields ``url`` (at most
+    MAX_URLS) to analyse videos: stored ones are answered at once, new ones
+    queued for the analysis workers. This needs a logged-in user, with the
+    CSRF token like any form, or "Authorization: Bearer <ANALYZE_TOKEN>".
+    GET with repeated ``job`` IDs (e.g. from EventSource) follows jobs that
+    already exist, and never queues anything; it needs the same login or
+    token. See streaming.analysis_events for the events.
+    """
+    if request.method not in ('GET', 'POST'):
+        return HttpResponseNotAllowed(['GET', 'POST'])
+    if not _has_bearer_token(request, getattr(settings, 'ANALYZE_TOKEN', '')):
+        if not await sync_to_async(_is_logged_in)(request):
+            return HttpResponseForbidden("Log in to analyse videos.")
+        if request.method == 'POST':
+            failure = _csrf_failure(request)
+            if failure is not None:
+                return failure
+
+    if request.method == 'GET':
+        try:
+            job_ids = _job_ids(request)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        if not job_ids:
+            return HttpResponseBadRequest("Give at least one job ID; POST URLs to start an analysis.")
+        if len(job_ids) > MAX_URLS:
+            return HttpResponseBadRequest(f"At most {MAX_URLS} jobs per request.")
+        events = job_events(job_ids)
+    else:
+        try:
+            urls = [url.strip() for url in _request_urls(request) if url.strip()]
+        except (ValueError, AttributeError) as e:
+            return HttpResponseBadRequest(f"Invalid request body: {e}")
+        if not urls:
+            return HttpResponseBadRequest("Give at least one video URL.")
+        if len(urls) > MAX_URLS:
+            return HttpResponseBadRequest(f"At most {MAX_URLS} URLs per request.")
+        video_ids, invalid = parse_video_ids(urls)
+        if not video_ids:
+            return HttpResponseBadRequest("No YouTube video ID found in the given URLs.")
+        events = analysis_events(video_ids, invalid)
+
+    response = StreamingHttpResponse(_server_sent_events(events), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # let nginx pass events through unbuffered
+    return response
+
+
+# Set directly: csrf_exempt() in Django 4.2 wraps views in a sync function.
+# The view runs the CSRF check itself for logged-in users; requests with the
+# bearer token carry no cookies, so they need none.
+analyze_stream.csrf_exempt = True
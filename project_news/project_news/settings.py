@@ -122,6 +122,124 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Inference
+# Bias classifier backend: "pytorch", "pytorch-int8", "onnx" or "onnx-int8".
+# The onnx backends need the optional optimum[onnxruntime] package.
+
+BIAS_BACKEND = os.getenv('BIAS_BACKEND', 'pytorch')
+BIAS_ONNX_DIR = BASE_DIR / 'onnx_models'
+
+# Sentiment backend: "local" (CPU RoBERTa classifier) or "llm" (hosted
+# Llama-3.3-70B). With SENTIMENT_LLM_FALLBACK=1 the LLM is used when the local
+# model cannot run.
+
+SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'local')
+SENTIMENT_LLM_FALLBACK = os.getenv('SENTIMENT_LLM_FALLBACK', '0') == '1'
+
+# Transcript embeddings (news_analysis.similarity). Vectors are stored in
+# memory-mapped files under EMBEDDING_DIR. With EMBEDDINGS_ENABLED on, every
+# saved analysis is embedded (a sentence-transformer pass per transcript) so
+# similar-video lookups cover new videos; manage.py build_embedding_index
+# embeds stored videos on demand. With REUSE_DUPLICATE_ANALYSES on (which
+# implies embeddings), a new video whose transcript has cosine similarity
+# >= DUPLICATE_THRESHOLD to a stored one reuses that analysis instead of
+# running the models again.
+# float16 halves the store size but makes exact (non-IVF) scans ~3x slower.
+
+EMBEDDINGS_ENABLED = os.getenv('EMBEDDINGS_ENABLED', '0') == '1'
+EMBEDDING_DIR = BASE_DIR / 'embeddings'
+EMBEDDING_DTYPE = os.getenv('EMBEDDING_DTYPE', 'float32')
+REUSE_DUPLICATE_ANALYSES = os.getenv('REUSE_DUPLICATE_ANALYSES', '0') == '1'
+DUPLICATE_THRESHOLD = float(os.getenv('DUPLICATE_THRESHOLD', 0.95))
+
+# YouTube Data API quota used per key today (quota days end at midnight
+# Pacific time). Kept in YOUTUBE_QUOTA_FILE, so ingest, the workers and the web
+# processes on one machine share one budget and restarts do not reset it. Set
+# it to '' to count per process.
+
+YOUTUBE_QUOTA_FILE = os.getenv('YOUTUBE_QUOTA_FILE', str(BASE_DIR / 'youtube_quota.json'))
+
+# Transcripts fetched from YouTube are kept compressed under
+# TRANSCRIPT_CACHE_DIR (segments with timestamps), so re-runs and retries of
+# failed analyses never download them again. Set it to '' to disable.
+# manage.py download_transcripts fills it in bulk, rate limited.
+
+TRANSCRIPT_CACHE_DIR = os.getenv('TRANSCRIPT_CACHE_DIR', str(BASE_DIR / 'transcript_cache'))
+
+# Comment analysis (news_analysis.comments). New videos, analysed one by one
+# or with manage.py ingest, also get up to COMMENT_ANALYSIS_MAX top-level
+# comments scored, 100 per YouTube API call (one quota unit each).
+# manage.py analyze_comments backfills older videos.
+
+COMMENT_ANALYSIS_ENABLED = os.getenv('COMMENT_ANALYSIS_ENABLED', '1') != '0'
+COMMENT_ANALYSIS_MAX = int(os.getenv('COMMENT_ANALYSIS_MAX', 1000))
+
+# Timelines (news_analysis.timeline). New videos also get bias and sentiment
+# per TIMELINE_WINDOW_SECONDS of transcript; long videos get wider windows so
+# there are at most TIMELINE_MAX_WINDOWS. manage.py build_timelines backfills.
+
+TIMELINE_ENABLED = os.getenv('TIMELINE_ENABLED', '1') != '0'
+TIMELINE_WINDOW_SECONDS = float(os.getenv('TIMELINE_WINDOW_SECONDS', 60))
+TIMELINE_MAX_WINDOWS = int(os.getenv('TIMELINE_MAX_WINDOWS', 120))
+
+# Search
+# Dotted path of the search backend. Empty picks by database:
+# news_analysis.search.SQLiteFTSBackend (needs FTS5) on SQLite,
+# news_analysis.search.SimpleSearchBackend on any other.
+
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', '')
+
+# Cache used by the JSON API (news_analysis.api) for channel versions and
+# response bodies, under its own "api" alias. Every process that writes
+# analyses invalidates it, so it must be shared: the default file cache works
+# for all processes on one box; point API_CACHE_BACKEND/API_CACHE_LOCATION at
+# Redis or Memcached for several boxes. Versions are kept until the data
+# changes; bodies expire after API_CACHE_SECONDS. API_MAX_AGE is the
+# Cache-Control max-age (0: clients revalidate with ETag / If-Modified-Since).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.getenv('API_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', str(BASE_DIR / 'api_cache')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', 10000))},
+    },
+}
+API_CACHE_SECONDS = int(os.getenv('API_CACHE_SECONDS', 300))
+API_MAX_AGE = int(os.getenv('API_MAX_AGE', 0))
+
+# Streaming analysis endpoint (/analyze/stream/, news_analysis.streaming).
+# Serve it with an ASGI server (e.g. uvicorn project_news.asgi:application)
+# so one process can hold many open streams; the analysis itself runs in
+# manage.py run_analysis_worker processes. Up to ANALYSIS_STREAM_FETCHES
+# transcript downloads run at once per process; streams give up waiting after
+# ANALYSIS_STREAM_TIMEOUT seconds. Starting an analysis needs a logged-in
+# user (with the CSRF token) or "Authorization: Bearer <ANALYZE_TOKEN>".
+
+ANALYSIS_STREAM_POLL_SECONDS = float(os.getenv('ANALYSIS_STREAM_POLL_SECONDS', 1.0))
+ANALYSIS_STREAM_TIMEOUT = float(os.getenv('ANALYSIS_STREAM_TIMEOUT', 600))
+ANALYSIS_STREAM_FETCHES = int(os.getenv('ANALYSIS_STREAM_FETCHES', 8))
+ANALYZE_TOKEN = os.getenv('ANALYZE_TOKEN', '')
+
+# Analysis job queue (news_analysis.jobs). Workers refresh the heartbeat of
+# the job they run every ANALYSIS_JOB_HEARTBEAT_SECONDS; run_analysis_worker
+# requeues running jobs whose heartbeat is older than --stale-minutes.
+
+ANALYSIS_JOB_HEARTBEAT_SECONDS = float(os.getenv('ANALYSIS_JOB_HEARTBEAT_SECONDS', 30))
+
+# Metrics (news_analysis.utils.metrics)
+# With METRICS_DIR set, every process (web, Streamlit, workers, ingest)
+# writes its counters and timings there every METRICS_FLUSH_SECONDS and
+# /metrics serves their sum in the Prometheus text format. Unset, metrics
+# stay per process and no flusher thread runs. /metrics needs a staff session
+# or "Authorization: Bearer <METRICS_TOKEN>".
+
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', 10))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 